@@ -2,31 +2,97 @@
 import os
 import argparse
 import copy
+import functools
+import itertools
 import logging
-from satsolver import dimacs, dpll, puzzle, verify_model, model_to_system
-from satsolver import strategy2, strategy3
+import sys
+import time
+from satsolver import dimacs, dpll, puzzle, verify_model
+from satsolver import strategy2, strategy3, cdcl, strategy_template, watched
+from satsolver import restarts, renumber, preprocess, lookahead, portfolio, cube
+from satsolver import sharing, enumeration, components, incremental
 
 # DIR = os.path.dirname(os.path.abspath(__file__))
 
 
 def main():
     parser = argparse.ArgumentParser(
-        description="General SAT solver which implements 3 different strategies"
+        description="General SAT solver which implements 5 different strategies"
     )
 
     parser.add_argument(
         "inputfile",
         type=str,
-        help="file which contains all required rules followed by a puzzle (sudoku rules + given puzzle)",
+        help="file which contains all required rules followed by a puzzle (sudoku rules + given puzzle), optionally compressed with gzip, bzip2 or xz",
     )
     parser.add_argument(
         "-S", "--strategy", type=int, default=1, help="which solving strategy to use"
     )
+    parser.add_argument(
+        "--portfolio",
+        action="store_true",
+        help="race several strategies in parallel processes (instead of --strategy), using the first answer",
+    )
+    parser.add_argument(
+        "--cube-and-conquer",
+        action="store_true",
+        help="split the system into cubes (with lookahead) and solve them in parallel processes (instead of --strategy)",
+    )
+    parser.add_argument(
+        "--share-clauses",
+        action="store_true",
+        help="run parallel CDCL workers which exchange learned clauses through shared memory (instead of --strategy)",
+    )
+    parser.add_argument(
+        "--cpus",
+        type=int,
+        help="number of processes to use with --cube-and-conquer, --share-clauses or --components (defaults to the number of cpus, or 1 for --components)",
+    )
+    parser.add_argument(
+        "--components",
+        action="store_true",
+        help="solve each independent component of the system separately (in parallel if --cpus > 1)",
+    )
+    parser.add_argument(
+        "-r",
+        "--restart",
+        type=str,
+        choices=restarts.POLICIES,
+        help="optional restart policy to use (for any strategy)",
+    )
+    parser.add_argument(
+        "--no-preprocess",
+        action="store_true",
+        help="disable preprocessing (e.g. subsumption, variable elimination, equivalent literals) of the system before solving",
+    )
+    parser.add_argument(
+        "--no-cardinality",
+        action="store_true",
+        help="don't detect at-most-one constraints (encoded as pairwise binary clauses) in the input files, which strategy 4 otherwise propagates natively",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="always parse the input files, rather than loading them from (or saving them to) a binary cache next to each file",
+    )
+    parser.add_argument(
+        "--icnf",
+        action="store_true",
+        help="read an incremental (iCNF) stream of clauses followed by queries 'a <literals> 0' from the inputfile ('-' for stdin), or from --input2 (with the clauses of the inputfile as the base formula), answering each query as it's read (with one incremental CDCL solver)",
+    )
+    parser.add_argument(
+        "--unique",
+        action="store_true",
+        help="also check whether the solution found is the only solution (e.g. of a sudoku puzzle)",
+    )
     parser.add_argument(
         "-d", "--debug", action="store_true", help="enable verbose debug logging"
     )
     parser.add_argument(
-        "-i", "--input2", type=str, help="optional path to second input file"
+        "-i",
+        "--input2",
+        type=str,
+        help="optional path to second input file (optionally compressed)",
     )
     parser.add_argument(
         "--sudoku",
@@ -48,6 +114,10 @@ def main():
     if args.output:
         outputfile = args.output
 
+    if args.icnf:
+        solve_icnf(args)
+        exit(0)
+
     # parse input file
     if not os.path.isfile(args.inputfile):
         print(f"ERROR: input file not found '{args.inputfile}'")
@@ -57,24 +127,61 @@ def main():
         exit(1)
 
     print("parsing file...")
-    system = dimacs.parse_file(args.inputfile)
+    # (only the CDCL solver supports native at-most-one constraints)
+    cardinality = (
+        args.strategy == 4
+        and not (args.portfolio or args.cube_and_conquer or args.share_clauses)
+        and not args.components
+        and not args.no_cardinality
+    )
+    cache = not args.no_cache
+    system = dimacs.parse_file(args.inputfile, cardinality=cardinality, cache=cache)
     if args.input2:
-        system += dimacs.parse_file(args.input2)
+        system += dimacs.parse_file(args.input2, cache=cache)
 
     orig_system = copy.deepcopy(system)
     model = {}
-    print(f"running strategy {args.strategy} on system...\n")
-    if args.strategy == 1:
-        res, stats = dpll.solver(system, model)
+    desc = f"strategy {args.strategy}"
+    if args.portfolio:
+        desc = "portfolio of strategies"
+    elif args.cube_and_conquer:
+        desc = "cube and conquer"
+    elif args.share_clauses:
+        desc = "parallel clause sharing"
+    print(f"running {desc} on system...\n")
+    if args.portfolio:
+        solver = portfolio.solver
+    elif args.cube_and_conquer:
+        solver = functools.partial(cube.solver, cpus=args.cpus)
+    elif args.share_clauses:
+        solver = functools.partial(sharing.solver, cpus=args.cpus)
+    elif args.strategy == 1:
+        solver = functools.partial(dpll.solver, restart=args.restart)
     elif args.strategy == 2:
-        res, stats = strategy2.solver(system, model)
+        solver = strategy_template.strategy_template(
+            watched.CountingSimplify(),
+            strategy2.select_lowest_purity,
+            restart=args.restart,
+        )
     elif args.strategy == 3:
-        res, stats = strategy3.solver(system, model)
+        solver = strategy_template.strategy_template(
+            watched.CountingSimplify(), strategy3.dlis_split, restart=args.restart
+        )
+    elif args.strategy == 4:
+        solver = functools.partial(cdcl.solver, restart=args.restart)
+    elif args.strategy == 5:
+        solver = functools.partial(lookahead.solver, restart=args.restart)
     else:
         print(
-            f"ERROR: provided strategy ({args.strategy}) must be an int in range [1,3]"
+            f"ERROR: provided strategy ({args.strategy}) must be an int in range [1,5]"
         )
         exit(1)
+    if args.components:
+        solver = components.decomposed_solver(solver, cpus=args.cpus or 1)
+    if not args.no_preprocess:
+        solver = preprocess.preprocessed_solver(solver)
+    # solve with the variables renumbered to 1..n (the model is mapped back to the original variables)
+    res, stats = renumber.dense_solver(solver)(system, model)
 
     print(f"stats = {stats}\n")
     if not res:
@@ -90,10 +197,49 @@ def main():
         exit(1)
 
     print(f"found a valid solution!")
+    if args.unique:
+        if enumeration.is_unique(orig_system):
+            print("the solution is unique")
+        else:
+            print("the system has more than one solution")
     with open(outputfile, "w") as f:
-        f.write(dimacs.to_dimacs(model_to_system(model)))
+        dimacs.write_model(model, f)
     print(f"\nwrote result to '{outputfile}'")
 
 
+def solve_icnf(args: argparse.Namespace):
+    """Answer each query of an iCNF stream (see dimacs.parse_icnf()), printing each answer as it's found."""
+    fname = args.input2 or args.inputfile
+    for path in [args.inputfile, args.input2]:
+        if path and path != "-" and not os.path.isfile(path):
+            print(f"ERROR: input file not found '{path}'")
+            exit(1)
+    f = sys.stdin if fname == "-" else dimacs.open_file(fname)
+    blocks = dimacs.parse_icnf(f)
+    if args.input2:
+        # (the base formula is parsed once, or loaded from its cache)
+        base = dimacs.parse_file(args.inputfile, compact=True, cache=not args.no_cache)
+        blocks = itertools.chain([base], blocks)
+
+    start = time.time()
+    count = solved = 0
+    answers = incremental.solve_queries(
+        blocks, restart=args.restart, cardinality=not args.no_cardinality
+    )
+    for assumptions, model in answers:
+        count += 1
+        if model is None:
+            print("s UNSATISFIABLE", flush=True)
+            continue
+        solved += 1
+        print("s SATISFIABLE")
+        print("v " + " ".join(str(v if model[v] else -v) for v in sorted(model)) + " 0")
+        if args.sudoku != None:
+            print(puzzle.visualize_sudoku_model(model, board_size=args.sudoku))
+        sys.stdout.flush()
+    elapsed = time.time() - start
+    print(f"c answered {count} queries ({solved} satisfiable) in {elapsed:.2f}s")
+
+
 if __name__ == "__main__":
     main()
@@ -5,6 +5,7 @@ from collections.abc import Callable
 import copy
 import csv
 import ctypes
+import functools
 from datetime import datetime
 import json
 import logging
@@ -15,6 +16,8 @@ import os
 import random
 from satsolver import Conjunction, dimacs, puzzle, verify_model, Model, model_to_system
 from satsolver import dpll, strategy2, strategy3, strategy_random, strategy_template
+from satsolver import watched, cdcl, vsids, preprocess, lookahead, incremental
+from satsolver import portfolio, cube, sharing, components
 import statistics
 import subprocess
 from tests.test_dpll import sudoku_tester
@@ -24,7 +27,9 @@ from typing import List, Dict, Optional, Tuple
 SCRIPT_DIR = os.path.abspath(os.path.dirname(__file__))
 
 RULES_4X4 = dimacs.parse_file(os.path.join(SCRIPT_DIR, "rules/sudoku-rules-4x4.cnf"))
-RULES_9X9 = dimacs.parse_file(os.path.join(SCRIPT_DIR, "rules/sudoku-rules-9x9.cnf"))
+RULES_9X9 = dimacs.parse_file(
+    os.path.join(SCRIPT_DIR, "rules/sudoku-rules-9x9.cnf"), cache=True
+)
 
 
 # DIR = os.path.dirname(os.path.abspath(__file__))
@@ -44,6 +49,39 @@ FILES_9X9 = list(
 
 FILE_4X4 = os.path.join(SCRIPT_DIR, f"datasets/4x4.txt")
 
+# solvers which can be selected by name with --solvers
+SOLVERS = {
+    "dpll": dpll.solver,
+    "strategy2": strategy2.solver,
+    "strategy3": strategy3.solver,
+    "random": strategy_random.solver,
+    "cdcl": cdcl.solver,
+    "lookahead": lookahead.solver,
+    # (races dpll, strategy2, strategy3, random and cdcl in parallel processes)
+    "portfolio": portfolio.solver,
+    # (splits each puzzle into cubes solved in parallel processes)
+    "cube_and_conquer": cube.solver,
+    # (parallel cdcl workers exchanging learned clauses through shared memory)
+    "cdcl_sharing": sharing.solver,
+    # (strategy2 on each independent component of the puzzle, after propagating the clues)
+    "strategy2_components": components.decomposed_solver(strategy2.solver),
+    "vsids": strategy_template.strategy_template(
+        watched.CountingSimplify(), vsids.VSIDS()
+    ),
+    # with restarts:
+    "random_luby": strategy_template.strategy_template(
+        watched.CountingSimplify(), strategy_random.select_random, restart="luby"
+    ),
+    "cdcl_luby": functools.partial(cdcl.solver, restart="luby"),
+    "cdcl_geometric": functools.partial(cdcl.solver, restart="geometric"),
+    "cdcl_glucose": functools.partial(cdcl.solver, restart="glucose"),
+    # (loads the rules once per process, then solves each puzzle with its clues as assumptions)
+    "cdcl_incremental": incremental.cached_solver(),
+}
+# solvers which keep state between the systems they're given (so those systems aren't preprocessed,
+# which would give every puzzle different rules)
+STATEFUL_SOLVERS = {"cdcl_incremental"}
+
 
 def main():
     parser = argparse.ArgumentParser(
@@ -69,6 +107,24 @@ def main():
         "--shuffle", action="store_true", help="whether to shuffle dataset before using"
     )
     parser.add_argument("--seed", type=int, help="random seed to use")
+    parser.add_argument(
+        "--no-preprocess",
+        action="store_true",
+        help="disable preprocessing (e.g. subsumption, variable elimination, equivalent literals) before each solve",
+    )
+    parser.add_argument(
+        "--speedup",
+        type=int,
+        help="instead of comparing solvers, measure the speedup of clause sharing (cdcl_sharing) with 1 to SPEEDUP workers",
+    )
+    parser.add_argument(
+        "-s",
+        "--solvers",
+        type=str,
+        nargs="+",
+        choices=SOLVERS.keys(),
+        help="names of solvers to compare (defaults to 4 variations of purity selection)",
+    )
     args = parser.parse_args()
 
     FORMAT = "[%(filename)s:%(lineno)s - %(funcName)20s() ] %(message)s"
@@ -111,14 +167,28 @@ def main():
         (dpll.solver, "base algo"),
         # (strategy3.solver, "strategy3"),
         # (strategy_random.solver, "random splitting"),
+        # (cdcl.solver, "cdcl"),
     ]
     """
     solvers = get_purity_solvers()
+    if args.solvers:
+        solvers = [(SOLVERS[name], name) for name in args.solvers]
 
     fnames = FILES_9X9
     outpath = os.path.join(outdir, "stats.json")
     MAX_PUZZLES = args.count
     logging.info(f"max_Puzzles = {MAX_PUZZLES}")
+    if args.speedup:
+        stats = speedup_experiment(
+            RULES_9X9,
+            fnames,
+            args.speedup,
+            max_puzzles=MAX_PUZZLES,
+            outpath=outpath,
+            shuffle=args.shuffle,
+        )
+        visualize_speedup(stats, outdir)
+        exit(0)
     stats = generic_experiment(
         RULES_9X9,
         fnames,
@@ -127,6 +197,7 @@ def main():
         max_puzzles=MAX_PUZZLES,
         outpath=outpath,
         shuffle=args.shuffle,
+        preprocessing=not args.no_preprocess,
     )
 
     GIT_HASH = (
@@ -150,20 +221,20 @@ def get_purity_solvers():
         (strategy2.solver, "lowest_purity"),
         (
             strategy_template.strategy_template(
-                strategy_template.simplify, strategy2.select_lowest_purity__reversed
+                watched.CountingSimplify(), strategy2.select_lowest_purity__reversed
             ),
             "lowest_purity__reversed",
         ),
         (
             strategy_template.strategy_template(
-                strategy_template.simplify,
+                watched.CountingSimplify(),
                 strategy2.select_highest_purity,
             ),
             "highest_purity",
         ),
         (
             strategy_template.strategy_template(
-                strategy_template.simplify,
+                watched.CountingSimplify(),
                 strategy2.select_highest_purity__reversed,
             ),
             "highest_purity__reversed",
@@ -188,16 +259,12 @@ def all_9x9():
         sudoku_tester(RULES_9X9, fname, 9, report_stats=True)
 
 
-def generic_experiment(
-    rules: Conjunction,
+def load_puzzles(
     fnames: List[str],
-    solvers: List[Tuple[Callable, str]],
-    cpus: int,  # number of processes to use
     max_puzzles: Optional[int] = None,
-    outpath: Optional[str] = None,
     shuffle: Optional[bool] = False,
-) -> Dict:
-    # gather list of puzzle (systems) across files
+) -> List[Conjunction]:
+    """Gather list of puzzle (systems) across files."""
     all_puzzles = []
     for fname in fnames:
         with open(fname, "r") as f:
@@ -213,13 +280,74 @@ def generic_experiment(
     if max_puzzles is not None:
         logging.info(f"limiting to {max_puzzles} puzzles (of {len(all_puzzles)} total)")
         all_puzzles = all_puzzles[:max_puzzles]
+    return all_puzzles
+
 
+def speedup_experiment(
+    rules: Conjunction,
+    fnames: List[str],
+    max_cpus: int,
+    max_puzzles: Optional[int] = None,
+    outpath: Optional[str] = None,
+    shuffle: Optional[bool] = False,
+) -> Dict:
+    """
+    Solve each puzzle with clause sharing (sharing.solver) using 1 to max_cpus workers,
+    recording the wall time (and clause exchange stats) of each solve.
+    """
+    all_puzzles = load_puzzles(fnames, max_puzzles=max_puzzles, shuffle=shuffle)
+    stats: Dict = {
+        "cpus": list(range(1, max_cpus + 1)),
+        "wall_times": [],  # (for each number of cpus) wall time per puzzle
+        "exported": [],  # (for each number of cpus) total clauses exported, imported and useful
+        "imported": [],
+        "useful": [],
+    }
+    for cpus in stats["cpus"]:
+        logging.info(
+            f"\n*** solving {len(all_puzzles)} puzzles with {cpus} workers ***"
+        )
+        wall_times = []
+        totals = {"exported": 0, "imported": 0, "useful": 0}
+        for system in all_puzzles:
+            wall_time = time.time()
+            res, solve_stats = sharing.solver(system + rules, {}, cpus=cpus)
+            wall_times.append(time.time() - wall_time)
+            assert res
+            for key in totals:
+                totals[key] += solve_stats[key]
+        stats["wall_times"].append(wall_times)
+        for key in totals:
+            stats[key].append(totals[key])
+
+    if outpath is not None:
+        with open(outpath, "w") as f:
+            json.dump(stats, f, indent=2)
+            logging.info(f"wrote stats to: {os.path.abspath(outpath)}")
+    return stats
+
+
+def generic_experiment(
+    rules: Conjunction,
+    fnames: List[str],
+    solvers: List[Tuple[Callable, str]],
+    cpus: int,  # number of processes to use
+    max_puzzles: Optional[int] = None,
+    outpath: Optional[str] = None,
+    shuffle: Optional[bool] = False,
+    preprocessing: bool = True,  # whether to preprocess each system before solving
+) -> Dict:
+    all_puzzles = load_puzzles(fnames, max_puzzles=max_puzzles, shuffle=shuffle)
     all_stats: List[Dict] = []
 
     STATS_TEMPLATE = {
         "cpu_times": [],  # time per puzzle
         "outcome": [],  # result of puzzle solve (True if solved else False)
         "backtracks": [],  # backtracks per puzzle
+        # (when preprocessing) stats about the preprocessing of each puzzle:
+        "preprocess_times": [],
+        "clauses_removed": [],
+        "vars_removed": [],
     }
 
     def write_stats():
@@ -234,7 +362,14 @@ def generic_experiment(
         logging.info(f"\n*** solver {i+1}/{len(solvers)} starting... ***")
 
         solver, desc = solvers[i]
-        systems = copy.deepcopy([system + rules for system in all_puzzles])
+        if desc in STATEFUL_SOLVERS:
+            # (the clauses of the rules are shared by every system rather than copied, so the solver can
+            # recognise them and keep them loaded between puzzles, see incremental.cached_solver())
+            systems = [copy.deepcopy(system) + rules for system in all_puzzles]
+        else:
+            if preprocessing:
+                solver = preprocess.preprocessed_solver(solver)
+            systems = copy.deepcopy([system + rules for system in all_puzzles])
         if cpus == 1:
             # (skip extra overhead of using multiprocessing)
             all_stats.append(copy.deepcopy(STATS_TEMPLATE))
@@ -317,13 +452,17 @@ def _worker(
             logging.info(f"at puzzle {p+1}/{len(systems)}")
             if write_stats is not None:
                 write_stats()  # just to help track progress
-        cpu_time = time.process_time()
         orig_system = copy.deepcopy(system)
+        cpu_time = time.process_time()
         res, stats = solver(system, model)
         cpu_time = time.process_time() - cpu_time
 
         cur_stats["cpu_times"].append(cpu_time)
         cur_stats["backtracks"].append(stats["backtracks"])
+        if "preprocess" in stats:
+            cur_stats["preprocess_times"].append(stats["preprocess"]["time"])
+            cur_stats["clauses_removed"].append(stats["preprocess"]["clauses_removed"])
+            cur_stats["vars_removed"].append(stats["preprocess"]["vars_removed"])
 
         valid, reason = verify_model(orig_system, model)
         # assert valid
@@ -333,6 +472,35 @@ def _worker(
     logging.info("worker done!")
 
 
+def visualize_speedup(stats: Dict, outdir: str):
+    """Plot the speedup curve (total wall time with 1 worker / total wall time with n workers)."""
+    totals = [sum(wall_times) for wall_times in stats["wall_times"]]
+    speedups = [totals[0] / total for total in totals]
+    for cpus, total, speedup, exported, imported, useful in zip(
+        stats["cpus"],
+        totals,
+        speedups,
+        stats["exported"],
+        stats["imported"],
+        stats["useful"],
+    ):
+        print(
+            f"{cpus} workers: {total:.3f}s (speedup {speedup:.2f}), "
+            f"clauses exported {exported}, imported {imported}, useful {useful}"
+        )
+
+    plt.clf()
+    plt.plot(stats["cpus"], speedups, marker="o", label="clause sharing")
+    plt.plot(stats["cpus"], stats["cpus"], linestyle="--", label="linear")
+    plt.xlabel("Workers (processes)")
+    plt.ylabel("Speedup (wall time)")
+    plt.xticks(stats["cpus"])
+    plt.legend()
+    fname = os.path.join(outdir, "speedup.pdf")
+    plt.savefig(fname)
+    print(f"wrote: {fname}")
+
+
 # https://matplotlib.org/stable/gallery/statistics/boxplot_demo.html#boxplots
 def visualize_stats(stats: Dict, outdir: str):
     logging.info(f"processing stats...\n")
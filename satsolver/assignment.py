@@ -0,0 +1,110 @@
+from collections.abc import MutableMapping
+from array import array
+from typing import Iterator, List, Optional
+
+# value of a literal in Assignment.vals
+UNASSIGNED = 0
+TRUE = 1
+FALSE = 2
+
+
+class Assignment(MutableMapping):
+    """
+    Assignment of (dense) variables 1..num_vars backed by a bytearray, along with the trail of assigned literals
+    (in order of assignment) and the decision level each variable was assigned at.
+
+    The value of every literal is stored (not just every variable), indexed by the literal itself:
+    vals[t] is TRUE, FALSE, or UNASSIGNED, where a negative literal -v is stored at index len(vals) - v
+    (so python's negative indexing does the mapping).
+    So evaluating a literal is a single indexed load (rather than abs(t) in model then model[abs(t)]).
+
+    Also acts as a Mapping of var -> bool (of the assigned variables, iterated in order of assignment),
+    so it can be used wherever a Model is expected (e.g. verify_model()).
+    """
+
+    def __init__(self, num_vars: int = 0):
+        self.num_vars = num_vars
+        self.vals = bytearray(2 * num_vars + 1)
+        self.level = array("i", bytes(4 * (num_vars + 1)))  # (indexed by var)
+        self.trail: List[int] = []  # assigned literals (in order of assignment)
+        # index into trail where each decision level starts
+        self.trail_lim: List[int] = []
+
+    def grow(self, num_vars: int):
+        """Ensure variables up to num_vars can be assigned."""
+        if num_vars <= self.num_vars:
+            return
+        n = self.num_vars
+        vals = bytearray(2 * num_vars + 1)
+        vals[: n + 1] = self.vals[: n + 1]
+        if n > 0:
+            vals[-n:] = self.vals[-n:]
+        self.vals = vals
+        self.level.extend(array("i", bytes(4 * (num_vars - n))))
+        self.num_vars = num_vars
+
+    @property
+    def decision_level(self) -> int:
+        return len(self.trail_lim)
+
+    def new_level(self):
+        self.trail_lim.append(len(self.trail))
+
+    def assign(self, lit: int):
+        """Assign a literal to be true (at the current decision level)."""
+        vals = self.vals
+        vals[lit] = TRUE
+        vals[-lit] = FALSE
+        self.level[abs(lit)] = len(self.trail_lim)
+        self.trail.append(lit)
+
+    def value(self, lit: int) -> Optional[bool]:
+        """The value of a literal (None if unassigned)."""
+        val = self.vals[lit]
+        return None if val == UNASSIGNED else val == TRUE
+
+    def cancel_until(self, level: int) -> List[int]:
+        """Undo all assignments above the given decision level, returning the literals which were unassigned."""
+        if self.decision_level <= level:
+            return []
+        start = self.trail_lim[level]
+        undone = self.trail[start:]
+        vals = self.vals
+        for lit in undone:
+            vals[lit] = UNASSIGNED
+            vals[-lit] = UNASSIGNED
+        del self.trail[start:]
+        del self.trail_lim[level:]
+        return undone
+
+    def __getitem__(self, var: int) -> bool:
+        if var not in self:
+            raise KeyError(var)
+        return self.vals[var] == TRUE
+
+    def __setitem__(self, var: int, val: bool):
+        if var in self:
+            del self[var]
+        self.grow(var)
+        self.assign(var if val else -var)
+
+    def __delitem__(self, var: int):
+        if var not in self:
+            raise KeyError(var)
+        lit = var if self.vals[var] == TRUE else -var
+        index = self.trail.index(lit)
+        del self.trail[index]
+        for i in range(len(self.trail_lim)):
+            if self.trail_lim[i] > index:
+                self.trail_lim[i] -= 1
+        self.vals[var] = UNASSIGNED
+        self.vals[-var] = UNASSIGNED
+
+    def __contains__(self, var) -> bool:
+        return 0 < var <= self.num_vars and self.vals[var] != UNASSIGNED
+
+    def __iter__(self) -> Iterator[int]:
+        return (abs(lit) for lit in self.trail)
+
+    def __len__(self) -> int:
+        return len(self.trail)
@@ -0,0 +1,138 @@
+from satsolver import Conjunction
+from satsolver.clausedb import ClauseDB
+from array import array
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+
+class CardinalityDB:
+    """
+    A system of clauses along with (native) at-most-one and exactly-one constraints.
+
+    In CNF an at-most-one constraint over n literals needs n * (n - 1) / 2 binary clauses
+    e.g. each cell of a 16x16 sudoku needs 120 clauses {-x, -y} (and rows, columns and boxes the same),
+    whereas here it's stored once as the list of its n literals (and propagated natively, see cdcl.Solver).
+    An exactly-one constraint is an at-most-one constraint whose literals also form a clause (at least one is true).
+
+    Iterating over a CardinalityDB yields the equivalent CNF clauses (the clauses, followed by the pairwise
+    expansion of each constraint), so it can still be read like a Conjunction (e.g. by verify_model()).
+    """
+
+    def __init__(self):
+        self.clauses = ClauseDB()
+        # literals of each at-most-one constraint
+        self.amos = ClauseDB()
+        # 1 if the corresponding at-most-one constraint is an exactly-one constraint
+        self.exactly = bytearray()
+
+    @classmethod
+    def from_system(
+        cls, system: Iterable[Iterable[int]], min_size: int = 3
+    ) -> "CardinalityDB":
+        """
+        Detect the at-most-one constraints encoded pairwise in a system:
+            - a clause whose literals are pairwise exclusive (by binary clauses {-x, -y}) becomes an exactly-one
+                constraint (e.g. the sudoku rule that each cell has exactly one value)
+            - the remaining binary clauses are greedily grouped into cliques of pairwise exclusive literals,
+                and each clique (of at least min_size literals) becomes an at-most-one constraint
+        The binary clauses covered by a constraint are dropped.
+        """
+        # map each literal to the literals which can't be true at the same time (from the binary clauses)
+        exclusive: Dict[int, Set[int]] = {}
+        binaries: List[Tuple[int, int]] = []
+        others: List[List[int]] = []
+        for clause in system:
+            lits = list(dict.fromkeys(clause))
+            if len(lits) == 2 and lits[0] != -lits[1]:
+                a, b = -lits[0], -lits[1]
+                exclusive.setdefault(a, set()).add(b)
+                exclusive.setdefault(b, set()).add(a)
+                binaries.append((a, b))
+            else:
+                others.append(lits)
+
+        res = cls()
+        covered: Set[Tuple[int, int]] = set()
+        for lits in others:
+            if len(lits) >= min_size and all(
+                lits[j] in exclusive.get(lits[i], ())
+                for i in range(len(lits))
+                for j in range(i + 1, len(lits))
+            ):
+                res.add_amo(lits, exactly=True)
+                _cover(covered, lits)
+            else:
+                res.append(lits)
+
+        for u in sorted(exclusive, key=abs):
+            for v in sorted(exclusive[u], key=abs):
+                if _pair(u, v) in covered:
+                    continue
+                clique = [u, v]
+                for w in sorted(exclusive[u] & exclusive[v], key=abs):
+                    if all(w in exclusive[x] for x in clique[2:]):
+                        clique.append(w)
+                if len(clique) >= min_size:
+                    res.add_amo(clique)
+                    _cover(covered, clique)
+
+        for a, b in binaries:
+            if _pair(a, b) not in covered:
+                covered.add(_pair(a, b))  # (in case of duplicate clauses)
+                res.append([-a, -b])
+        return res
+
+    def append(self, clause: Iterable[int]) -> int:
+        """Add a clause, returning its index in self.clauses."""
+        return self.clauses.append(clause)
+
+    def add_amo(self, lits: Iterable[int], exactly: bool = False) -> int:
+        """Add an at-most-one (or exactly-one) constraint, returning its index in self.amos."""
+        self.exactly.append(int(exactly))
+        return self.amos.append(lits)
+
+    def __iadd__(self, system: Iterable[Iterable[int]]) -> "CardinalityDB":
+        """Add the clauses of a system (and its constraints if it's also a CardinalityDB)."""
+        if isinstance(system, CardinalityDB):
+            for k, lits in enumerate(system.amos):
+                self.add_amo(lits, bool(system.exactly[k]))
+            system = system.clauses
+        for clause in system:
+            self.append(clause)
+        return self
+
+    def __iter__(self) -> Iterator[array]:
+        yield from self.clauses
+        for k, lits in enumerate(self.amos):
+            if self.exactly[k]:
+                yield lits
+            for i in range(len(lits)):
+                for j in range(i + 1, len(lits)):
+                    yield array("i", [-lits[i], -lits[j]])
+
+    def to_system(self) -> Conjunction:
+        """Convert to the equivalent Conjunction (list of sets) with the constraints expanded to clauses."""
+        return [set(clause) for clause in self]
+
+    def num_clauses(self) -> int:
+        """Number of clauses in the equivalent CNF system (see __iter__())."""
+        res = len(self.clauses)
+        for k in range(len(self.amos)):
+            start, end = self.amos.bounds(k)
+            n = end - start
+            res += n * (n - 1) // 2 + self.exactly[k]
+        return res
+
+    def nbytes(self) -> int:
+        """Number of bytes used to store the clauses and constraints."""
+        return self.clauses.nbytes() + self.amos.nbytes() + len(self.exactly)
+
+
+def _pair(a: int, b: int) -> Tuple[int, int]:
+    return (a, b) if a < b else (b, a)
+
+
+def _cover(covered: Set[Tuple[int, int]], lits: List[int]):
+    """Mark every pair of literals in a constraint as covered."""
+    for i in range(len(lits)):
+        for j in range(i + 1, len(lits)):
+            covered.add(_pair(lits[i], lits[j]))
@@ -0,0 +1,423 @@
+from satsolver import Disjunction, Conjunction, Model
+from satsolver import restarts
+from satsolver.assignment import Assignment, UNASSIGNED, TRUE, FALSE
+from satsolver.cardinality import CardinalityDB
+from satsolver.clausedb import ClauseDB
+from satsolver.vsids import ActivityHeap
+from typing import List, Dict, Tuple, Optional, Iterable, Sequence, Union
+import logging
+
+# reason for an implied literal (or a conflict): the index of a clause, or the clause itself
+Reason = Union[int, List[int]]
+
+
+class Solver:
+    """
+    Conflict driven clause learning (CDCL) SAT solver.
+
+    Unlike the (chronological) DPLL strategies, when a conflict is found the implication graph is analyzed to learn
+    a new clause (the first unique implication point (UIP) cut), and the search backjumps directly to the
+    second highest decision level in that clause (which is then unit, so it immediately propagates).
+    Unit propagation uses two watched literals per clause.
+    At-most-one constraints (see cardinality.py) are propagated natively: when one of their literals becomes
+    true all the others are made false (with the binary clause {-x, -y} as the reason).
+    The clauses (including learned clauses) are stored in a compact ClauseDB, and the assignment in a
+    (literal indexed) bytearray, so the solver is fastest when the variables are dense (see renumber.py).
+
+    Optionally the search restarts (keeping its learned clauses and heuristic state) according to the
+    named restart policy (see restarts.POLICIES).
+    """
+
+    def __init__(self, system: Iterable[Iterable[int]], restart: Optional[str] = None):
+        self.clauses = ClauseDB()
+        # map each literal to the list of indices of the clauses watching it
+        self.watches: Dict[int, List[int]] = {}
+        # (partial) assignment, along with the level each variable was assigned at
+        self.assigns = Assignment()
+        # at-most-one constraints, and map each literal to the indices of the constraints it occurs in
+        self.amos = ClauseDB()
+        self.amo_occurs: Dict[int, List[int]] = {}
+        # index of the clause which implied each variable (None for decisions),
+        # or the (binary) reason clause itself for literals implied by an at-most-one constraint
+        self.reason: List[Optional[Reason]] = [None]
+        self.trail = self.assigns.trail  # assigned literals (in order of assignment)
+        # index into trail where each decision level starts
+        self.trail_lim = self.assigns.trail_lim
+        self.qhead = 0  # index into trail of the next literal to propagate
+
+        # decision heuristic state (unassigned variables are kept in a heap ordered by activity)
+        self.order = ActivityHeap(decay=0.95)
+        self.phase: Dict[int, bool] = {}  # last value each variable was assigned
+        self.restart_policy = restarts.make_policy(restart)
+
+        self.ok = True  # False once the system is known to be inconsistent
+        self.stats: Dict = {
+            "backtracks": 0,
+            "conflicts": 0,
+            "decisions": 0,
+            "propagations": 0,
+            "learned_clauses": 0,
+            "backjump_distance": 0,  # total number of levels skipped by backjumps
+            "max_backjump_distance": 0,
+            "restarts": 0,
+        }
+
+        if isinstance(system, CardinalityDB):
+            for clause in system.clauses:
+                self.add_clause(clause)
+            for k, lits in enumerate(system.amos):
+                self.add_amo(lits, exactly=bool(system.exactly[k]))
+        else:
+            for clause in system:
+                self.add_clause(clause)
+
+    @property
+    def decision_level(self) -> int:
+        return len(self.trail_lim)
+
+    def add_var(self, var: int):
+        if var > self.assigns.num_vars:
+            num_vars = max(var, 2 * self.assigns.num_vars)
+            self.reason.extend([None] * (num_vars - self.assigns.num_vars))
+            self.assigns.grow(num_vars)
+        if var not in self.phase:
+            self.order.push(var)
+            self.phase[var] = False
+
+    def add_clause(self, clause: Iterable[int]) -> bool:
+        """
+        Add a clause to the system (backtracking to decision level 0 first, e.g. after a call to solve()).
+        Returns False if the system is now known to be inconsistent.
+        """
+        if self.decision_level > 0:
+            self.cancel_until(0)
+        lits = set(clause)
+        phase = self.phase
+        for t in lits:
+            if abs(t) not in phase:
+                self.add_var(abs(t))
+
+        # simplify using the variables already assigned at level 0
+        vals = self.assigns.vals
+        remaining = []
+        for t in lits:
+            if -t in lits:
+                return True  # tautology e.g. {111, -111, 114}
+            val = vals[t]
+            if val == TRUE:
+                return True  # clause is already true
+            if val == UNASSIGNED:
+                remaining.append(t)
+
+        if len(remaining) == 0:
+            self.ok = False
+        elif len(remaining) == 1:
+            self.enqueue(remaining[0], None)
+        else:
+            self.attach(remaining)
+        return self.ok
+
+    def add_amo(self, lits: Iterable[int], exactly: bool = False) -> bool:
+        """
+        Add an at-most-one (or exactly-one) constraint to the system (backtracking to decision level 0 first).
+        Returns False if the system is now known to be inconsistent.
+        """
+        if self.decision_level > 0:
+            self.cancel_until(0)
+        lits = list(dict.fromkeys(lits))
+        if exactly and not self.add_clause(lits):
+            return False
+        for t in lits:
+            if abs(t) not in self.phase:
+                self.add_var(abs(t))
+
+        vals = self.assigns.vals
+        true_lits = [t for t in lits if vals[t] == TRUE]
+        if len(true_lits) > 1:
+            self.ok = False
+            return False
+        remaining = [t for t in lits if vals[t] == UNASSIGNED]
+        if true_lits:
+            for t in remaining:
+                self.enqueue(-t, None)
+        elif len(remaining) == 2:
+            self.add_clause([-remaining[0], -remaining[1]])
+        elif len(remaining) > 2:
+            k = self.amos.append(remaining)
+            for t in remaining:
+                self.amo_occurs.setdefault(t, []).append(k)
+        return self.ok
+
+    def attach(self, lits: List[int]) -> int:
+        """Add a clause to the clause database, watching its first 2 literals."""
+        ci = self.clauses.append(lits)
+        self.watches.setdefault(lits[0], []).append(ci)
+        self.watches.setdefault(lits[1], []).append(ci)
+        return ci
+
+    def enqueue(self, lit: int, reason: Optional[Reason]):
+        """Assign a literal to be true (at the current decision level)."""
+        self.assigns.assign(lit)
+        self.reason[abs(lit)] = reason
+
+    def lit_value(self, lit: int) -> Optional[bool]:
+        return self.assigns.value(lit)
+
+    def propagate(self) -> Optional[Reason]:
+        """
+        Propagate all enqueued assignments, returning the conflicting clause (if one is found)
+        as a clause index (or the clause itself for a conflicting at-most-one constraint).
+        Note: the implied literal of a reason clause is always at index 0 of that clause.
+        """
+        trail = self.trail
+        lits = self.clauses.lits
+        offsets = self.clauses.offsets
+        watches = self.watches
+        vals = self.assigns.vals
+        amo_lits = self.amos.lits
+        amo_offsets = self.amos.offsets
+        amo_occurs = self.amo_occurs
+
+        while self.qhead < len(trail):
+            false_lit = -trail[self.qhead]
+            self.qhead += 1
+            self.stats["propagations"] += 1
+
+            for k in amo_occurs.get(-false_lit, ()):
+                # every other literal of the constraint must be false
+                for i in range(amo_offsets[k], amo_offsets[k + 1]):
+                    t = amo_lits[i]
+                    val = vals[t]
+                    if val == UNASSIGNED:
+                        self.enqueue(-t, [-t, false_lit])
+                    elif val == TRUE and t != -false_lit:
+                        self.qhead = len(trail)
+                        return [-t, false_lit]
+
+            ws = watches.get(false_lit)
+            if not ws:
+                continue
+            i = j = 0
+            while i < len(ws):
+                ci = ws[i]
+                i += 1
+                start = offsets[ci]
+                # ensure the false literal is the second literal of the clause
+                first = lits[start]
+                if first == false_lit:
+                    first = lits[start + 1]
+                    lits[start] = first
+                    lits[start + 1] = false_lit
+                if vals[first] == TRUE:
+                    ws[j] = ci  # clause is already true
+                    j += 1
+                    continue
+
+                # look for a new literal to watch
+                for k in range(start + 2, offsets[ci + 1]):
+                    t = lits[k]
+                    if vals[t] != FALSE:
+                        lits[start + 1] = t
+                        lits[k] = false_lit
+                        watches.setdefault(t, []).append(ci)
+                        break
+                else:
+                    ws[j] = ci
+                    j += 1
+                    if vals[first] == FALSE:
+                        # conflict (every literal in the clause is false)
+                        while i < len(ws):
+                            ws[j] = ws[i]
+                            i += 1
+                            j += 1
+                        del ws[j:]
+                        self.qhead = len(trail)
+                        return ci
+                    self.enqueue(first, ci)  # clause is unit
+            del ws[j:]
+        return None
+
+    def reason_clause(self, reason: Reason) -> Sequence[int]:
+        return self.clauses[reason] if isinstance(reason, int) else reason
+
+    def analyze(self, confl: Reason) -> Tuple[List[int], int]:
+        """
+        Analyze a conflict, returning the learned (first UIP) clause and the level to backjump to.
+        The first literal of the learned clause is the (negated) UIP, which becomes unit after backjumping.
+        """
+        level = self.assigns.level
+        seen = set()
+        learnt: List[int] = [0]  # (placeholder for the asserting literal)
+        # number of literals from the current decision level left to resolve on
+        counter = 0
+        p = None
+        index = len(self.trail) - 1
+        clause = self.reason_clause(confl)
+
+        while True:
+            for t in clause if p is None else clause[1:]:
+                var = abs(t)
+                if var not in seen and level[var] > 0:
+                    seen.add(var)
+                    self.order.bump(var)
+                    if level[var] == self.decision_level:
+                        counter += 1
+                    else:
+                        learnt.append(t)
+
+            # walk back along the trail to the next literal to resolve on
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            p = self.trail[index]
+            index -= 1
+            counter -= 1
+            if counter == 0:
+                break
+            clause = self.reason_clause(self.reason[abs(p)])
+
+        learnt[0] = -p
+        bt_level = 0
+        if len(learnt) > 1:
+            # ensure the literal with the highest level (other than the UIP) is watched
+            max_i = max(range(1, len(learnt)), key=lambda i: level[abs(learnt[i])])
+            learnt[1], learnt[max_i] = learnt[max_i], learnt[1]
+            bt_level = level[abs(learnt[1])]
+        return learnt, bt_level
+
+    def cancel_until(self, level: int):
+        """Backtrack (undo all assignments) to the given decision level."""
+        for lit in self.assigns.cancel_until(level):
+            var = abs(lit)
+            self.phase[var] = lit > 0
+            self.order.push(var)
+        self.qhead = len(self.trail)
+
+    def pick_branch_lit(self) -> Optional[int]:
+        """Pick the unassigned variable with the highest activity (returning None if all variables are assigned)."""
+        order = self.order
+        vals = self.assigns.vals
+        while len(order) > 0:
+            var = order.pop()
+            if vals[var] == UNASSIGNED:
+                return var if self.phase[var] else -var
+        return None
+
+    def solve(self, assumptions: Iterable[int] = ()) -> bool:
+        """
+        Run the search, returning True if the system is satisfiable (see model()).
+
+        Optionally the given literals are assumed to be true (e.g. the clues of a sudoku puzzle), by deciding them
+        (in order) before any other variable. If no model satisfies the assumptions, False is returned but (unlike
+        for an inconsistent system) the solver can be used again with other assumptions.
+        solve() may be called repeatedly (with clauses added in between), keeping the learned clauses and
+        heuristic state (as they don't depend on the assumptions).
+        """
+        if not self.ok:
+            return False
+        if self.decision_level > 0:
+            self.cancel_until(0)
+        assumptions = list(assumptions)
+        for t in assumptions:
+            self.add_var(abs(t))
+        stats = self.stats
+        vals = self.assigns.vals
+
+        while True:
+            confl = self.propagate()
+            if confl is not None:
+                stats["conflicts"] += 1
+                stats["backtracks"] += 1
+                if self.decision_level == 0:
+                    self.ok = False
+                    return False
+
+                learnt, bt_level = self.analyze(confl)
+                lbd = len(set(self.assigns.level[abs(t)] for t in learnt))
+                distance = self.decision_level - bt_level
+                stats["backjump_distance"] += distance
+                stats["max_backjump_distance"] = max(
+                    stats["max_backjump_distance"], distance
+                )
+                logging.debug(
+                    f"learned clause {learnt}, backjumping {distance} level(s) to level {bt_level}"
+                )
+                self.cancel_until(bt_level)
+                stats["learned_clauses"] += 1
+                if len(learnt) == 1:
+                    self.enqueue(learnt[0], None)
+                else:
+                    self.enqueue(learnt[0], self.attach(learnt))
+                self.order.decay()
+                self.on_learn(learnt, lbd)
+
+                policy = self.restart_policy
+                if policy and policy.on_conflict(lbd):
+                    logging.debug(
+                        f"restarting search after {policy.conflicts} conflicts"
+                    )
+                    self.cancel_until(0)
+                    policy.on_restart()
+                    stats["restarts"] += 1
+                    self.on_restart()
+                    if not self.ok:
+                        return False
+                continue
+
+            lit = None
+            while self.decision_level < len(assumptions):
+                t = assumptions[self.decision_level]
+                if vals[t] == FALSE:
+                    return False  # (the assumptions are inconsistent with the system)
+                if vals[t] == UNASSIGNED:
+                    lit = t
+                    break
+                # (already implied, so use a dummy decision level to keep the levels in line with the assumptions)
+                self.trail_lim.append(len(self.trail))
+            if lit is None:
+                lit = self.pick_branch_lit()
+                if lit is None:
+                    return True  # every variable is assigned
+                stats["decisions"] += 1
+            self.trail_lim.append(len(self.trail))
+            self.enqueue(lit, None)
+
+    def decisions(self) -> List[int]:
+        """
+        The literals decided at each decision level (including the assumptions) of the current assignment.
+        As every other assigned literal is implied by these (and the clauses), after solve() returns True the
+        clause of their negations blocks exactly the model found (see enumeration.py).
+        """
+        trail = self.trail
+        return list(
+            dict.fromkeys(
+                trail[start] for start in self.trail_lim if start < len(trail)
+            )
+        )
+
+    def on_learn(self, learnt: List[int], lbd: int):
+        """Called after each clause is learned (for subclasses, see sharing.py)."""
+
+    def on_restart(self):
+        """Called after each restart, at decision level 0 (for subclasses, see sharing.py)."""
+
+    def model(self) -> Model:
+        """The (complete) model found by the latest call to solve()."""
+        return dict(self.assigns)
+
+
+def solver(
+    system: Conjunction, model: Model, restart: Optional[str] = None
+) -> Tuple[bool, Dict]:
+    """
+    Runs the CDCL algorithm, returning a boolean indicating if a solution is found, and a dictionary of stats.
+    The system may also be a ClauseDB, or a CardinalityDB (whose constraints are propagated natively).
+    Any variables already in the model are treated as unit clauses. The model is updated in place.
+    Optionally restart the search using the named restart policy (see restarts.POLICIES).
+    """
+    s = Solver(system, restart=restart)
+    for var, val in model.items():
+        s.add_clause([var if val else -var])
+    res = s.solve()
+    if res:
+        model.update(s.model())
+    return res, s.stats
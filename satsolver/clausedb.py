@@ -0,0 +1,101 @@
+from satsolver import Conjunction
+from array import array
+from typing import Dict, Iterable, Iterator, Sequence, Tuple
+
+
+class ClauseDB:
+    """
+    Compact clause database.
+    Rather than storing each clause as a set (200+ bytes even for a binary clause), the literals of every clause
+    are stored contiguously in one flat array of (32 bit) ints, with the offset of the start of each clause stored
+    in a second array. So clause i is lits[offsets[i]:offsets[i + 1]].
+
+    Iterating over a ClauseDB yields each clause (as an array of literals), so it can be read like a Conjunction
+    (e.g. by verify_model() and dimacs.to_dimacs()).
+    Clauses may be appended (e.g. learned clauses) and the literals within a clause may be reordered in place
+    (e.g. by two watched literal propagation), but clauses are never removed.
+    """
+
+    def __init__(self, clauses: Iterable[Iterable[int]] = ()):
+        self.lits = array("i")
+        self.offsets = array("i", [0])
+        for clause in clauses:
+            self.append(clause)
+
+    @classmethod
+    def from_system(cls, system: Conjunction) -> "ClauseDB":
+        return cls(system)
+
+    @classmethod
+    def from_buffers(cls, lits: Sequence[int], offsets: Sequence[int]) -> "ClauseDB":
+        """
+        Construct a ClauseDB from existing buffers of (32 bit) literals and clause offsets, without copying them
+        (e.g. read only memoryviews of a memory mapped file, see cnfcache.py).
+        Read only buffers are copied to arrays the first time a clause is appended.
+        """
+        db = cls()
+        db.lits = lits  # type: ignore
+        db.offsets = offsets  # type: ignore
+        return db
+
+    def to_system(self) -> Conjunction:
+        """Convert back to a Conjunction (list of sets)."""
+        return [set(clause) for clause in self]
+
+    def append(self, clause: Iterable[int]) -> int:
+        """Add a clause (ignoring any duplicate literals), returning its index."""
+        if not isinstance(self.lits, array):
+            self.lits, self.offsets = _to_array(self.lits), _to_array(self.offsets)
+        # (dict preserves the order of the literals)
+        self.lits.extend(dict.fromkeys(clause))
+        self.offsets.append(len(self.lits))
+        return len(self.offsets) - 2
+
+    def __getstate__(self) -> Dict:
+        # (so read only buffers are copied to arrays when a ClauseDB is pickled or deep copied)
+        return {"lits": _to_array(self.lits), "offsets": _to_array(self.offsets)}
+
+    def bounds(self, i: int) -> Tuple[int, int]:
+        """Return the (start, end) of clause i within self.lits."""
+        return self.offsets[i], self.offsets[i + 1]
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> array:
+        if i < 0:
+            i += len(self)
+        return self.lits[self.offsets[i] : self.offsets[i + 1]]
+
+    def __iter__(self) -> Iterator[array]:
+        lits = self.lits
+        offsets = self.offsets
+        for i in range(len(offsets) - 1):
+            yield lits[offsets[i] : offsets[i + 1]]
+
+    def occurrences(self) -> Dict[int, array]:
+        """Map each literal to the (increasing) indices of the clauses it occurs in."""
+        occurs: Dict[int, array] = {}
+        lits = self.lits
+        offsets = self.offsets
+        for i in range(len(offsets) - 1):
+            for k in range(offsets[i], offsets[i + 1]):
+                t = lits[k]
+                if t not in occurs:
+                    occurs[t] = array("i")
+                occurs[t].append(i)
+        return occurs
+
+    def nbytes(self) -> int:
+        """Number of bytes used to store the clauses."""
+        lits, offsets = self.lits, self.offsets
+        return lits.itemsize * len(lits) + offsets.itemsize * len(offsets)
+
+
+def _to_array(buf: Sequence[int]) -> array:
+    """Copy a buffer of (32 bit) ints to an array (if it isn't one already)."""
+    if isinstance(buf, array):
+        return buf
+    res = array("i")
+    res.frombytes(memoryview(buf).cast("B"))  # type: ignore
+    return res
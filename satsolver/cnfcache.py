@@ -0,0 +1,131 @@
+from satsolver.cardinality import CardinalityDB
+from satsolver.clausedb import ClauseDB
+from typing import Optional, Union
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import sys
+import tempfile
+
+# suffix of the cache files written next to each (source) .cnf file
+SUFFIX = ".cnfcache"
+# source files smaller than this (in bytes) aren't worth caching (see dimacs.parse_file())
+MIN_SIZE = 1 << 16
+MAGIC = b"SATCNF01"
+# magic, little endian flag, cardinality flag, source size, source mtime (ns), source sha256,
+# then the lengths of each section: clauses, literals, at-most-one constraints, at-most-one literals
+_HEADER = struct.Struct("<8s??6xqq32sqqqq")
+
+
+def cache_path(fname: str, cardinality: bool = False) -> str:
+    """Path of the cache of a source file (of a ClauseDB, or a CardinalityDB if cardinality is True)."""
+    return fname + (".amo" if cardinality else "") + SUFFIX
+
+
+def load(
+    fname: str, cardinality: bool = False
+) -> Optional[Union[ClauseDB, CardinalityDB]]:
+    """
+    Load the cached clauses of a source .cnf file (see save()) as a ClauseDB (or a CardinalityDB if cardinality
+    is True), or return None if there's no cache or it's out of date (i.e. the source has changed since the cache
+    was written).
+
+    The cache is memory mapped, and the literals and offsets of the returned ClauseDBs are (read only) views
+    of the mapped file, so nothing is parsed or copied when it's loaded
+    (and pages of the file are only read from disk as they're accessed).
+    """
+    path = cache_path(fname, cardinality)
+    try:
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):  # (ValueError if the file is empty)
+        return None
+    if len(mm) < _HEADER.size:
+        return None
+    magic, little, card, size, mtime, digest, *lengths = _HEADER.unpack_from(mm)
+    num_clauses, num_lits, num_amos, num_amo_lits = lengths
+    if magic != MAGIC or little != (sys.byteorder == "little") or card != cardinality:
+        return None
+    sizes = [4 * (num_clauses + 1), 4 * num_lits]
+    if cardinality:
+        sizes += [4 * (num_amos + 1), 4 * num_amo_lits, num_amos]
+    if len(mm) != _HEADER.size + sum(sizes):
+        return None
+
+    st = os.stat(fname)
+    if (st.st_size, st.st_mtime_ns) != (size, mtime):
+        # (e.g. the source was touched or copied, but may not have changed)
+        if st.st_size != size or _digest(fname) != digest:
+            logging.debug(f"cache of '{fname}' is out of date")
+            return None
+
+    # split the mapped file into a view of each section
+    view = memoryview(mm)
+    sections = []
+    start = _HEADER.size
+    for n in sizes:
+        sections.append(view[start : start + n])
+        start += n
+    clauses = ClauseDB.from_buffers(sections[1].cast("i"), sections[0].cast("i"))
+    if not cardinality:
+        return clauses
+    db = CardinalityDB()
+    db.clauses = clauses
+    db.amos = ClauseDB.from_buffers(sections[3].cast("i"), sections[2].cast("i"))
+    # (tiny, so copied rather than having to handle a read only view when a constraint is added)
+    db.exactly = bytearray(sections[4])
+    return db
+
+
+def save(system: Union[ClauseDB, CardinalityDB], fname: str):
+    """
+    Write the clauses of a source .cnf file (parsed as a ClauseDB or CardinalityDB) to a binary cache next to it
+    (see cache_path()), which is a header identifying the source (by its size, mtime and hash), followed by the
+    offsets and literals of each ClauseDB as native 32 bit ints (and the exactly flags of a CardinalityDB).
+    The cache is written to a temporary file and then renamed, so a cache is never partially written.
+    """
+    cardinality = isinstance(system, CardinalityDB)
+    if isinstance(system, CardinalityDB):
+        dbs = [system.clauses, system.amos]
+    else:
+        dbs = [system]
+    amos = dbs[1] if cardinality else ClauseDB()
+    st = os.stat(fname)
+    header = _HEADER.pack(
+        MAGIC,
+        sys.byteorder == "little",
+        cardinality,
+        st.st_size,
+        st.st_mtime_ns,
+        _digest(fname),
+        len(dbs[0]),
+        len(dbs[0].lits),
+        len(amos),
+        len(amos.lits),
+    )
+    path = cache_path(fname, cardinality)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=SUFFIX)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            for db in dbs:
+                f.write(memoryview(db.offsets).cast("B"))
+                f.write(memoryview(db.lits).cast("B"))
+            if isinstance(system, CardinalityDB):
+                f.write(system.exactly)
+        os.chmod(tmp, 0o644)  # (rather than the 0o600 of a temporary file)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _digest(fname: str) -> bytes:
+    """sha256 of the contents of a file."""
+    h = hashlib.sha256()
+    with open(fname, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.digest()
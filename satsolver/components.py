@@ -0,0 +1,228 @@
+from satsolver import Conjunction, Model
+from satsolver import strategy_template
+from multiprocessing import Process, Queue
+from typing import Dict, Iterable, List, Optional, Tuple
+from collections.abc import Callable
+import logging
+import queue
+
+
+def components(system: Iterable[Iterable[int]]) -> List[Conjunction]:
+    """
+    Split a system into its independent components: clauses which (transitively) share a variable are in the same
+    component, so no clause of one component constrains the variables of another.
+    Uses union-find over the variables of each clause. Components are returned in order of their first clause.
+    """
+    parent: Dict[int, int] = {}
+
+    def find(v: int) -> int:
+        while parent[v] != v:
+            parent[v] = parent[parent[v]]  # (path halving)
+            v = parent[v]
+        return v
+
+    clauses = [set(clause) for clause in system]
+    for clause in clauses:
+        root = None
+        for t in clause:
+            var = abs(t)
+            if var not in parent:
+                parent[var] = var
+            if root is None:
+                root = find(var)
+            else:
+                other = find(var)
+                if other != root:
+                    parent[other] = root
+
+    res: Dict[int, Conjunction] = {}
+    for clause in clauses:
+        if clause:
+            res.setdefault(find(abs(next(iter(clause)))), []).append(clause)
+    return list(res.values())
+
+
+def decomposed_solver(
+    solver: Callable, cpus: int = 1, split_depth: int = 1, min_split: int = 50
+) -> Callable:
+    """
+    Wraps a solver function so each independent component of the system (see components()) is solved separately,
+    after propagating the unit clauses (e.g. the clues of a puzzle, which often disconnect the rest of the system).
+    So a conflict in one component never backtracks over the decisions made in another,
+    and an inconsistent component ends the search immediately.
+
+    Components are re-checked lazily as the search splits them: a component with at least min_split clauses is split
+    on its most frequent variable (up to split_depth times along any branch), and each branch is propagated and
+    decomposed again, before its components are handed to the wrapped solver.
+    If cpus > 1 the top level components are solved in parallel (in forked processes).
+
+    The component models are merged into the model (updated in place), and the stats returned include
+    the number of top level "components", the "largest_component" (in variables), the number of "splits" made,
+    and the total "backtracks" of the wrapped solver over every component.
+    Note: the system itself isn't modified.
+    """
+
+    def solve(system: Conjunction, model: Model) -> Tuple[bool, Dict]:
+        stats: Dict = {
+            "backtracks": 0,
+            "components": 0,
+            "largest_component": 0,
+            "splits": 0,
+        }
+        vars = _vars(system)
+        if any(len(clause) == 0 for clause in system):
+            return False, stats
+        comps = _propagate([set(clause) for clause in system], model)
+        if comps is None:
+            return False, stats
+        stats["components"] = len(comps)
+        if comps:
+            stats["largest_component"] = max(len(_vars(comp)) for comp in comps)
+        logging.debug(f"system has {len(comps)} independent components")
+
+        if cpus > 1 and len(comps) > 1:
+            res = _solve_parallel(
+                solver, comps, model, stats, cpus, split_depth, min_split
+            )
+        else:
+            res = all(
+                _solve_component(solver, comp, model, stats, split_depth, min_split)
+                for comp in comps
+            )
+        if res:
+            for var in vars:
+                # (any value works for variables which were left unassigned)
+                model.setdefault(var, False)
+        return res, stats
+
+    return solve
+
+
+def _vars(system: Iterable[Iterable[int]]) -> set:
+    return set(abs(t) for clause in system for t in clause)
+
+
+def _propagate(system: Conjunction, model: Model) -> Optional[List[Conjunction]]:
+    """
+    Propagate the unit clauses of a system (updating model in place), returning the components of the remaining
+    clauses (or None if the system is inconsistent).
+    """
+    valid, _ = strategy_template.simplify(system, model, tautologies=False)
+    if not valid:
+        return None
+    return components(system)
+
+
+def _solve_component(
+    solver: Callable,
+    comp: Conjunction,
+    model: Model,
+    stats: Dict,
+    split_depth: int,
+    min_split: int,
+) -> bool:
+    if split_depth == 0 or len(comp) < min_split:
+        comp_model = {var: model[var] for var in _vars(comp) if var in model}
+        res, comp_stats = solver(comp, comp_model)
+        stats["backtracks"] += comp_stats.get("backtracks", 0)
+        if res:
+            model.update(comp_model)
+        return res
+
+    # split on the most frequent variable, and decompose each branch again
+    counts: Dict[int, int] = {}
+    for clause in comp:
+        for t in clause:
+            counts[abs(t)] = counts.get(abs(t), 0) + 1
+    var = max(counts, key=counts.get)
+    stats["splits"] += 1
+    for val in (True, False):
+        branch_model: Model = {var: val}
+        comps = _propagate([set(clause) for clause in comp], branch_model)
+        if comps is None:
+            stats["backtracks"] += 1
+            continue
+        if all(
+            _solve_component(solver, c, branch_model, stats, split_depth - 1, min_split)
+            for c in comps
+        ):
+            model.update(branch_model)
+            return True
+        stats["backtracks"] += 1
+    return False
+
+
+def _solve_parallel(
+    solver: Callable,
+    comps: List[Conjunction],
+    model: Model,
+    stats: Dict,
+    cpus: int,
+    split_depth: int,
+    min_split: int,
+) -> bool:
+    """Solve components with cpus forked workers, stopping early if one is found to be inconsistent."""
+    tasks: Queue = Queue()
+    results: Queue = Queue()
+    for i in range(len(comps)):
+        tasks.put(i)
+    procs = []
+    for _ in range(min(cpus, len(comps))):
+        tasks.put(None)  # (tells a worker to stop)
+        procs.append(
+            Process(
+                target=_worker,
+                args=(solver, comps, model, split_depth, min_split, tasks, results),
+                daemon=True,
+            )
+        )
+        procs[-1].start()
+
+    res = True
+    done = 0
+    try:
+        while done < len(comps):
+            try:
+                comp_res, comp_model, comp_stats = results.get(timeout=0.5)
+            except queue.Empty:
+                # (a worker which died took its component with it, so its result would never arrive)
+                if any(p.exitcode not in (None, 0) for p in procs):
+                    raise RuntimeError("a component worker died")
+                continue
+            done += 1
+            for key in ["backtracks", "splits"]:
+                stats[key] += comp_stats[key]
+            if not comp_res:
+                res = False
+                break
+            model.update(comp_model)
+    finally:
+        for p in procs:
+            if p.is_alive():
+                p.terminate()
+            p.join()
+        tasks.close()
+        results.close()
+    return res
+
+
+def _worker(
+    solver: Callable,
+    comps: List[Conjunction],
+    model: Model,
+    split_depth: int,
+    min_split: int,
+    tasks: Queue,
+    results: Queue,
+):
+    """Solve components from the tasks queue (until None is received), putting (res, model, stats) on results."""
+    while True:
+        i = tasks.get()
+        if i is None:
+            return
+        comp_model = dict(model)
+        comp_stats = {"backtracks": 0, "splits": 0}
+        res = _solve_component(
+            solver, comps[i], comp_model, comp_stats, split_depth, min_split
+        )
+        results.put((res, comp_model if res else {}, comp_stats))
@@ -0,0 +1,153 @@
+from satsolver import Conjunction, Model
+from satsolver import incremental
+from satsolver.lookahead import Lookahead
+from satsolver.trail import Trail
+from multiprocessing import Process, Queue, cpu_count
+from typing import Dict, List, Optional, Tuple
+import copy
+import logging
+import math
+import queue
+import time
+
+
+def make_cubes(
+    system: Conjunction, depth: int
+) -> Tuple[List[List[int]], Optional[Model]]:
+    """
+    Split a system into cubes (lists of literals to assume), by running the lookahead search (see lookahead.py)
+    down to the given depth: each branch which isn't refuted by the lookahead (e.g. by failed literals) before
+    reaching that depth gives one cube (the decisions made along it).
+    So the cubes cover every model of the system, and there are at most 2 ** depth of them.
+
+    Returns the cubes, and the model found if a branch was solved by the lookahead alone
+    (in which case the remaining branches aren't explored). No cubes (and no model) means the system is inconsistent.
+    """
+    lookahead = Lookahead()
+    # (the lookahead attaches itself to the trail on its first call)
+    trail = Trail(copy.deepcopy(system), {})
+    cubes: List[List[int]] = []
+
+    # (the recursion depth is bounded by depth)
+    def split(cube: List[int]) -> Optional[Model]:
+        valid, literal_stats = lookahead(
+            trail.system, trail.model, tautologies=len(cube) == 0
+        )
+        if not valid:
+            return None
+        if not literal_stats:
+            return dict(trail.model)
+        if len(cube) == depth:
+            cubes.append(cube)
+            return None
+        var, guess = lookahead.select(literal_stats)
+        for val in (guess, not guess):
+            trail.new_level()
+            trail.model[var] = val
+            model = split(cube + [var if val else -var])
+            trail.backtrack()
+            if model is not None:
+                return model
+        return None
+
+    model = split([])
+    if model is not None:
+        # (variables which were never assigned can take any value)
+        for var in set(abs(t) for clause in system for t in clause):
+            model.setdefault(var, False)
+    return cubes, model
+
+
+def solver(
+    system: Conjunction,
+    model: Model,
+    cpus: Optional[int] = None,
+    depth: Optional[int] = None,
+) -> Tuple[bool, Dict]:
+    """
+    Cube and conquer: splits a (single, hard) system into cubes with make_cubes(), and then solves the cubes in
+    parallel with a pool of worker processes (each with an incremental CDCL solver, which keeps its learned clauses
+    between cubes). Workers pull the next cube from a shared queue as soon as they finish one, and the search stops
+    at the first cube found to be satisfiable (or once every cube is refuted).
+
+    params:
+        cpus: number of worker processes (defaults to the number of cpus).
+        depth: the depth to split to (defaults to giving about 8 cubes per worker, so the workers stay busy).
+
+    Returns a boolean indicating if a solution is found, and a dictionary of stats (backtracks are totalled over
+    every cube solved). The model is updated in place (the system isn't), and any variables already in it are
+    treated as unit clauses.
+    """
+    cpus = cpus or cpu_count()
+    if depth is None:
+        depth = math.ceil(math.log2(8 * cpus))
+    system = list(system) + [set([var if val else -var]) for var, val in model.items()]
+    stats: Dict = {
+        "backtracks": 0,
+        "cubes": 0,
+        "cubes_refuted": 0,
+        "cube_time": 0.0,
+        "workers": cpus,
+    }
+
+    start = time.process_time()
+    cubes, cube_model = make_cubes(system, depth)
+    stats["cube_time"] = time.process_time() - start
+    stats["cubes"] = len(cubes)
+    logging.info(f"split system into {len(cubes)} cubes (depth {depth})")
+    if cube_model is not None:
+        model.update(cube_model)
+        return True, stats
+    if not cubes:
+        return False, stats
+
+    # (loaded once here, then inherited by each worker when it's forked)
+    s = incremental.Solver(system)
+    tasks: Queue = Queue()
+    results: Queue = Queue()
+    for cube in cubes:
+        tasks.put(cube)
+    procs = []
+    for _ in range(min(cpus, len(cubes))):
+        tasks.put(None)  # (tells a worker to stop)
+        procs.append(Process(target=_worker, args=(s, tasks, results), daemon=True))
+        procs[-1].start()
+
+    res = False
+    try:
+        while stats["cubes_refuted"] < len(cubes):
+            try:
+                cube_res, cube_model, backtracks = results.get(timeout=0.5)
+            except queue.Empty:
+                # (a worker which died took its cube with it, so that cube would never be refuted)
+                if any(p.exitcode not in (None, 0) for p in procs):
+                    raise RuntimeError("a cube and conquer worker died")
+                continue
+            stats["backtracks"] += backtracks
+            if cube_res:
+                res = True
+                model.update(cube_model)
+                break
+            stats["cubes_refuted"] += 1
+    finally:
+        for p in procs:
+            if p.is_alive():
+                p.terminate()
+            p.join()
+        tasks.close()
+        results.close()
+    return res, stats
+
+
+def _worker(s: incremental.Solver, tasks: Queue, results: Queue):
+    """Solve cubes from the tasks queue (until None is received), putting (res, model, backtracks) on results."""
+    solve = incremental.assumption_solver(s)
+    while True:
+        cube = tasks.get()
+        if cube is None:
+            return
+        model: Model = {}
+        res, stats = solve([set([t]) for t in cube], model)
+        results.put((res, model, stats["backtracks"]))
+        if res:
+            return
@@ -1,53 +1,336 @@
+import bz2
+import gc
+import gzip
+import io
+import itertools
+import logging
+import operator
 import os
-from satsolver import Conjunction
+import re
+from array import array
+from satsolver import Conjunction, Model
+from satsolver.assignment import Assignment, TRUE, UNASSIGNED
+from satsolver import cnfcache
+from satsolver.cardinality import CardinalityDB
+from satsolver.clausedb import ClauseDB
+from typing import Iterable, Iterator, List, Optional, TextIO, Tuple, Union
 
 
-def parse_string(contents: str) -> Conjunction:
-    """Convert a DIMACS string (with newlines) to a Disjunction."""
+# number of characters read from a file at a time when parsing
+CHUNK_SIZE = 1 << 16
+# number of lines written to a file at a time
+WRITE_BATCH = 4096
+_COMMENT = re.compile(r"^[ \t]*c.*$", re.MULTILINE)
+_PROBLEM = re.compile(r"^[ \t]*p\b.*$", re.MULTILINE)
+_HEADER = re.compile(r"[ \t]*p[ \t]+cnf[ \t]+(\d+)[ \t]+(\d+)[ \t\r]*$")
+_CNF = re.compile(r"[ \t]*p[ \t]+cnf\b")
+# most clauses preallocated (for a "p cnf" header) if the size of the input isn't known
+MAX_PREALLOCATE = 1 << 16
 
-    res: Conjunction = []
-    for line in contents.split("\n"):
-        line = line.strip()  # ignore extra whitespace
-        if not line:  # blank line
+
+def parse_string(
+    contents: str, compact: bool = False, cardinality: bool = False
+) -> Union[Conjunction, ClauseDB, CardinalityDB]:
+    """
+    Convert a DIMACS string (with newlines) to a Conjunction.
+    If compact is True, the clauses are instead stored in a (much smaller) ClauseDB.
+    If cardinality is True, at-most-one constraints encoded as pairwise binary clauses are detected,
+    and a CardinalityDB is returned (see CardinalityDB.from_system()).
+    """
+    return parse_stream(io.StringIO(contents), compact=compact, cardinality=cardinality)
+
+
+def parse_file(
+    fname: str, compact: bool = False, cardinality: bool = False, cache: bool = False
+) -> Union[Conjunction, ClauseDB, CardinalityDB]:
+    """
+    Parse a .cnf file (optionally compressed, see open_file()) and return a conjunction
+    (or a ClauseDB if compact is True, or a CardinalityDB if cardinality is True).
+    If cache is True (and the file isn't tiny), the clauses (and constraints) are loaded from a binary cache
+    next to the file if it's up to date, otherwise the file is parsed and the cache is (re)written (see cnfcache.py).
+    """
+    assert os.path.exists(fname)
+    if cache and os.path.getsize(fname) >= cnfcache.MIN_SIZE:
+        db = cnfcache.load(fname, cardinality=cardinality)
+        if db is None:
+            db = parse_file(fname, compact=True, cardinality=cardinality)
+            try:
+                cnfcache.save(db, fname)
+            except OSError as e:
+                logging.warning(f"unable to write cache of '{fname}': {e}")
+        return db if compact or cardinality else db.to_system()
+
+    with open_file(fname) as f:
+        return parse_stream(f, compact=compact, cardinality=cardinality)
+
+
+def open_file(fname: str) -> TextIO:
+    """
+    Open a (.cnf) file for reading as text, which may be compressed with gzip, bzip2 or xz
+    (detected from its first bytes rather than its extension), in which case it's decompressed as it's read
+    (so there's no need to decompress it to disk first).
+    """
+    with open(fname, "rb") as f:
+        magic = f.read(6)
+    if magic.startswith(b"\x1f\x8b"):
+        return gzip.open(fname, "rt")
+    if magic.startswith(b"BZh"):
+        return bz2.open(fname, "rt")
+    if magic.startswith(b"\xfd7zXZ\x00"):
+        import lzma  # (optional module, which may be missing if python was built without liblzma)
+
+        return lzma.open(fname, "rt")
+    return open(fname, "r")
+
+
+def parse_stream(
+    f: TextIO, compact: bool = False, cardinality: bool = False
+) -> Union[Conjunction, ClauseDB, CardinalityDB]:
+    """
+    Parse DIMACS from a (text) file object, see parse_string().
+
+    The input is read in chunks of CHUNK_SIZE characters (so the whole file is never held in memory),
+    and the tokens of each chunk are converted to ints in bulk, and added straight to the result
+    (e.g. into the flat arrays of a ClauseDB) without a python loop over each literal (or line).
+    A clause may span several lines, as it's ended by a 0 (not a newline).
+    The number of clauses given in the "p cnf" header (if any) is only a hint used to preallocate the result
+    (limited by the size of the input, as each clause takes at least 2 characters).
+    """
+    if cardinality:
+        return CardinalityDB.from_system(parse_stream(f, compact=True))
+
+    # (the cyclic garbage collector is paused while parsing, as otherwise it repeatedly scans every clause parsed
+    # so far, though the parser never creates any reference cycles to collect)
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _parse_stream(f, compact)
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _parse_stream(f: TextIO, compact: bool) -> Union[Conjunction, ClauseDB]:
+    db = ClauseDB() if compact else None
+    system: Conjunction = []
+    count = 0
+    for chunk in _iter_chunks(f):
+        if isinstance(chunk[0], int):  # (the header)
+            num_clauses = min(chunk[1], _max_clauses(f)) if count == 0 else 0
+            if db is not None:
+                db.offsets.extend(array("i", bytes(4 * num_clauses)))
+            else:
+                system.extend([set()] * num_clauses)
             continue
-        tokens = line.split(" ")
-        if tokens[0] == "c":
-            continue  # ignore comments
-        if tokens[0] == "p":
-            continue  # ignore this line for now
-        tokens = [t for t in tokens if t != ""]
+
+        vals, ends = chunk
+        # the slice of vals (excluding the 0) of each clause in this chunk
+        starts = map(operator.add, itertools.chain([-1], ends), itertools.repeat(1))
+        slices = list(map(slice, starts, ends))
+        n = len(slices)
+        if db is not None:
+            clauses = list(map(vals.__getitem__, slices))
+            lengths = list(map(len, clauses))
+            sizes = map(len, map(set, clauses))
+            for k in itertools.compress(
+                itertools.count(), map(operator.ne, sizes, lengths)
+            ):
+                # (rare) drop the duplicate literals of this clause
+                clauses[k] = array("i", dict.fromkeys(clauses[k]))
+                lengths[k] = len(clauses[k])
+            offsets = array("i", itertools.accumulate(lengths, initial=len(db.lits)))
+            db.lits.extend(array("i", itertools.chain.from_iterable(clauses)))
+            if count + 1 + n <= len(db.offsets):
+                db.offsets[count + 1 : count + 1 + n] = offsets[1:]
+            else:
+                del db.offsets[count + 1 :]
+                db.offsets.extend(offsets[1:])
+        else:
+            clauses = map(set, map(vals.__getitem__, slices))
+            if count + n <= len(system):
+                system[count : count + n] = clauses
+            else:
+                del system[count:]
+                system.extend(clauses)
+        count += n
+
+    # (drop any of the preallocated space which wasn't used, if the header overestimated the number of clauses)
+    if db is not None:
+        del db.offsets[count + 1 :]
+        return db
+    del system[count:]
+    return system
+
+
+def _max_clauses(f: TextIO) -> int:
+    """Upper bound on the number of clauses a file object could contain (from its size, if that's known)."""
+    if isinstance(f, io.StringIO):
+        return len(f.getvalue()) // 2
+    try:
+        return os.fstat(f.fileno()).st_size // 2
+    except (AttributeError, OSError, ValueError):
+        # (e.g. a pipe, or a stream with no file descriptor)
+        return MAX_PREALLOCATE
+
+
+def _iter_chunks(
+    f: TextIO,
+) -> Iterator[Union[Tuple[array, List[int]], Tuple[int, int]]]:
+    """
+    Generate the clauses read from a DIMACS file object, a chunk at a time, as (vals, ends) where vals is an array
+    of the literals of several (complete) clauses, each followed by a 0, and ends are the indices of those 0s in vals.
+    This is preceded by the (num_vars, num_clauses) of the "p cnf" header if the file has one.
+    """
+    rest = ""  # (the last incomplete line read)
+    carry = array("i")  # (the literals read of an unfinished clause)
+    while True:
+        chunk = f.read(CHUNK_SIZE)
+        data = rest + chunk
+        if chunk:
+            # only parse up to the end of the last complete line (the rest is parsed with the next chunk)
+            end = data.rfind("\n") + 1
+            data, rest = data[:end], data[end:]
+        else:
+            rest = ""
+        if "c" in data:
+            data = _COMMENT.sub("", data)
+        if "p" in data:
+            for line in _PROBLEM.findall(data):
+                header = _HEADER.match(line)
+                if header is not None:
+                    yield int(header.group(1)), int(header.group(2))
+                elif _CNF.match(line):
+                    raise ValueError(f"invalid header line: '{line.strip()[:100]}'")
+                # (other problem lines e.g. "p inccnf" are ignored)
+            data = _PROBLEM.sub("", data)
 
         try:
-            tokens = [int(t) for t in tokens]
-            assert tokens[-1] == 0
-            tokens = tokens[:-1]  # throw away 0 at end
-        except ValueError as e:
-            print(f"ERROR parsing line: '{line}'")
-            raise e
-        if 0 in tokens:
-            raise ValueError(f"0 shouldn't appear prior to the end of a line: '{line}'")
-        res.append(set(tokens))
+            vals = carry + array("i", map(int, data.split()))
+        except ValueError:
+            raise ValueError(f"invalid literal in: '{data.strip()[:100]}'")
+        ends = list(itertools.compress(itertools.count(), map(operator.not_, vals)))
+        # (the unfinished clause after the last 0 is parsed along with the next chunk)
+        last = ends[-1] + 1 if ends else 0
+        carry = vals[last:]
+        del vals[last:]
+        if ends:
+            yield vals, ends
+        if not chunk:
+            if carry:
+                raise ValueError(f"clause isn't ended by a 0: {list(carry)[:100]}")
+            return
 
-    return res
 
+def parse_icnf(f: TextIO) -> Iterator[Union[ClauseDB, List[int]]]:
+    """
+    Parse an incremental DIMACS (iCNF) file object: a (base) formula, followed by queries "a <literals> 0",
+    each asking whether the formula is satisfiable when the given literals are assumed to be true
+    (e.g. the sudoku rules followed by the clues of many puzzles). Clauses may also follow a query,
+    in which case they're added to the formula for the later queries.
 
-def parse_file(fname: str) -> Conjunction:
-    """Parse a .cnf file and return a conjunction."""
-    assert os.path.exists(fname)
-    with open(fname, "r") as f:
-        lines = [line for line in f.readlines()]
-    return parse_string("".join(lines))
+    Generates (in the order they're read) the clauses read since the previous query (as a ClauseDB),
+    and the literals of each query (as a list), so each query can be answered as soon as it's read
+    (before the rest of the file, which may be a pipe such as stdin).
+    The lines of clauses are gathered and then parsed in bulk (see parse_stream()), up to CHUNK_SIZE
+    characters at a time.
+    """
+    pending: List[str] = []  # lines of the clauses read since the previous query
+    size = 0
+    for line in f:
+        start = line.lstrip()[:1]
+        if start == "a":
+            if pending:
+                yield parse_string("".join(pending), compact=True)
+                pending, size = [], 0
+            tokens = line.split()[1:]
+            if not tokens or tokens[-1] != "0":
+                raise ValueError(f"query isn't ended by a 0: '{line.strip()}'")
+            try:
+                yield [int(t) for t in tokens[:-1]]
+            except ValueError:
+                raise ValueError(f"invalid literal in query: '{line.strip()}'")
+        elif start != "c" and start != "p" and start:
+            pending.append(line)
+            size += len(line)
+            # (flush once a clause is ended, after enough lines have been gathered)
+            if size >= CHUNK_SIZE and line.split()[-1] == "0":
+                yield parse_string("".join(pending), compact=True)
+                pending, size = [], 0
+    if pending:
+        yield parse_string("".join(pending), compact=True)
 
 
-def to_dimacs(system: Conjunction) -> str:
+def to_dimacs(system: Iterable[Iterable[int]]) -> str:
     """Convert a logic system to a (newline delimited) DIMACS string."""
-    content = ""
-    vars = set()
-    for clause in system:
-        vars = vars.union(set([abs(t) for t in clause]))
-        # sort tokens by absolute value (increasing)
-        str_tokens = [str(t) for t in sorted(list(clause), key=lambda v: abs(v))]
-        content += " ".join(str_tokens) + " 0\n"
-
-    content = f"p cnf {len(vars)} {len(system)}\n" + content
-    return content
+    f = io.StringIO()
+    write_dimacs(system, f)
+    return f.getvalue()
+
+
+def write_dimacs(
+    system: Iterable[Iterable[int]], f: TextIO, num_vars: Optional[int] = None
+):
+    """
+    Write a logic system (e.g. a Conjunction or ClauseDB) to a (text) file object in DIMACS format,
+    with the literals of each clause sorted by absolute value (increasing).
+    The clauses are formatted and written WRITE_BATCH at a time, so the whole output is never held in memory.
+    num_vars is the number of variables given in the header, which if not given is counted
+    (as the number of distinct variables in the system) in one pass over the system before writing it.
+    """
+    if num_vars is None:
+        if isinstance(system, ClauseDB):
+            num_vars = len(set(map(abs, system.lits)))
+        else:
+            vars: set = set()
+            for clause in system:
+                vars.update(map(abs, clause))
+            num_vars = len(vars)
+    if isinstance(system, CardinalityDB):
+        num_clauses = system.num_clauses()
+    else:
+        num_clauses = len(system)  # type: ignore
+    f.write(f"p cnf {num_vars} {num_clauses}\n")
+    _write_lines(f, map(_format_clause, system))
+
+
+def write_model(model: Model, f: TextIO):
+    """
+    Write a model to a (text) file object in DIMACS format, as a unit clause for each variable (in increasing order),
+    like write_dimacs(model_to_system(model), f) but without building the system.
+    The values of an Assignment are read directly from its store.
+    """
+    if isinstance(model, Assignment):
+        vals = model.vals
+        lits = [
+            v if vals[v] == TRUE else -v
+            for v in range(1, model.num_vars + 1)
+            if vals[v] != UNASSIGNED
+        ]
+    else:
+        lits = [v if model[v] else -v for v in sorted(model)]
+    f.write(f"p cnf {len(lits)} {len(lits)}\n")
+    _write_lines(f, map("{} 0\n".format, lits))
+
+
+def write_icnf(
+    system: Iterable[Iterable[int]], queries: Iterable[Iterable[int]], f: TextIO
+):
+    """
+    Write a system followed by a query for each list of assumptions to a (text) file object
+    in incremental DIMACS (iCNF) format (see parse_icnf()).
+    """
+    f.write("p inccnf\n")
+    _write_lines(f, map(_format_clause, system))
+    _write_lines(f, ("a " + " ".join(map(str, query)) + " 0\n" for query in queries))
+
+
+def _format_clause(clause: Iterable[int]) -> str:
+    return " ".join(map(str, sorted(clause, key=abs))) + " 0\n"
+
+
+def _write_lines(f: TextIO, lines: Iterator[str]):
+    while True:
+        batch = "".join(itertools.islice(lines, WRITE_BATCH))
+        if not batch:
+            return
+        f.write(batch)
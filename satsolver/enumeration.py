@@ -0,0 +1,54 @@
+from satsolver import Model
+from satsolver import incremental
+from typing import Iterable, Iterator, Optional
+
+
+def solve_all(
+    system: Iterable[Iterable[int]],
+    limit: Optional[int] = None,
+    vars: Optional[Iterable[int]] = None,
+    assumptions: Iterable[int] = (),
+) -> Iterator[Model]:
+    """
+    Generate the models of a system (up to limit of them), e.g. to check that a sudoku has exactly one solution.
+
+    The system is loaded into a single incremental solver, and after each model is found a blocking clause is added
+    (keeping the learned clauses) so the next solve finds a different model:
+        - by default the blocking clause is the negation of just the decisions which led to the model
+            (rather than of every variable) as the rest of the model is implied by them
+        - if vars is given, models are only distinguished by those (relevant) variables, so one model is
+            generated for each distinct assignment of vars (the blocking clause is the negation of that assignment)
+    Optionally the given literals are assumed to be true.
+    Note: the system isn't modified.
+    """
+    s = incremental.Solver(system)
+    assumptions = list(assumptions)
+    vars = None if vars is None else sorted(set(abs(v) for v in vars))
+    count = 0
+    while limit is None or count < limit:
+        if not s.solve(assumptions):
+            return
+        model = s.model()
+        count += 1
+        yield model
+
+        if vars is None:
+            block = [-t for t in s.decisions()]
+        else:
+            block = [-v if model[v] else v for v in vars]
+        if not block or not s.add_clause(block):
+            return  # (no other models)
+
+
+def count_models(
+    system: Iterable[Iterable[int]],
+    limit: Optional[int] = None,
+    vars: Optional[Iterable[int]] = None,
+) -> int:
+    """Count the models of a system (stopping at limit), see solve_all()."""
+    return sum(1 for _ in solve_all(system, limit=limit, vars=vars))
+
+
+def is_unique(system: Iterable[Iterable[int]]) -> bool:
+    """Returns True if the system has exactly one model (costing about two solves)."""
+    return count_models(system, limit=2) == 1
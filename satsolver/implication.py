@@ -0,0 +1,203 @@
+from satsolver import Conjunction, Model
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# binary implication graph (mapping each literal to the literals it implies)
+Graph = Dict[int, Set[int]]
+
+
+def build_graph(system: Iterable[Iterable[int]]) -> Graph:
+    """
+    Build the binary implication graph of a system:
+    each binary clause {a, b} gives the edges -a -> b and -b -> a (other clauses are ignored).
+    e.g. the sudoku rule -111 -112 gives 111 -> -112 and 112 -> -111.
+    """
+    graph: Graph = {}
+    for clause in system:
+        if len(clause) != 2:
+            continue
+        a, b = clause
+        if a == -b:
+            continue  # tautology
+        graph.setdefault(-a, set()).add(b)
+        graph.setdefault(-b, set()).add(a)
+    return graph
+
+
+def strongly_connected_components(graph: Graph) -> List[List[int]]:
+    """
+    Find the strongly connected components of a graph (Tarjan's algorithm).
+    The literals in a component all imply each other, so are equivalent.
+    Note: iterative (rather than recursive) so large graphs don't exceed the recursion limit.
+    """
+    index: Dict[int, int] = {}
+    low: Dict[int, int] = {}
+    stack: List[int] = []
+    on_stack: Set[int] = set()
+    sccs: List[List[int]] = []
+
+    nodes = set(graph)
+    for targets in graph.values():
+        nodes.update(targets)
+    for root in sorted(nodes):
+        if root in index:
+            continue
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(graph.get(root, ())))]
+        while work:
+            v, edges = work[-1]
+            for w in edges:
+                if w not in index:
+                    index[w] = low[w] = len(index)
+                    stack.append(w)
+                    on_stack.add(w)
+                    work.append((w, iter(graph.get(w, ()))))
+                    break
+                if w in on_stack:
+                    low[v] = min(low[v], index[w])
+            else:
+                # (all edges of v have been visited)
+                work.pop()
+                if work:
+                    u = work[-1][0]
+                    low[u] = min(low[u], low[v])
+                if low[v] == index[v]:
+                    scc = []
+                    while True:
+                        w = stack.pop()
+                        on_stack.discard(w)
+                        scc.append(w)
+                        if w == v:
+                            break
+                    sccs.append(scc)
+    return sccs
+
+
+def equivalences(graph: Graph) -> Optional[Dict[int, int]]:
+    """
+    Map each literal which is equivalent to another literal, to the representative literal of its component
+    (the literal whose variable is lowest), or return None if a literal is equivalent to its own negation
+    (so the system is inconsistent).
+    Note: the representative of -t is always the negation of the representative of t.
+    """
+    res: Dict[int, int] = {}
+    for scc in strongly_connected_components(graph):
+        if len(scc) == 1:
+            continue
+        members = set(scc)
+        if any(-t in members for t in scc):
+            return None
+        rep = min(scc, key=abs)
+        for t in scc:
+            if t != rep:
+                res[t] = rep
+    return res
+
+
+def failed_literals(graph: Graph, max_visits: int = 1000) -> List[int]:
+    """
+    Find the (failed) literals which imply both some literal and its negation, so must be false.
+    (Only the first max_visits literals reachable from each literal are explored).
+    """
+    failed = []
+    for lit in sorted(graph):
+        seen = set([lit])
+        queue = [lit]
+        is_failed = False
+        for u in queue:
+            if is_failed or len(seen) > max_visits:
+                break
+            for w in graph.get(u, ()):
+                if -w in seen:
+                    is_failed = True
+                    break
+                if w not in seen:
+                    seen.add(w)
+                    queue.append(w)
+        if is_failed:
+            failed.append(lit)
+    return failed
+
+
+def transitive_reduction(
+    graph: Graph, max_steps: int = 200_000
+) -> List[Tuple[int, int]]:
+    """
+    Find (and remove from the graph) the binary clauses which are implied by the other binary clauses,
+    i.e. edges u -> v where v can also be reached from u via another literal (u -> x -> v).
+    Returns the redundant clauses (as (-u, v) pairs).
+    Note: only paths of length 2 are checked (longer paths are rare in practice, and much slower to search),
+    and the search stops after about max_steps successors have been checked (so the reduction may be partial).
+    """
+    redundant = []
+    steps = 0
+    for u in sorted(graph):
+        if steps > max_steps:
+            break
+        succ = graph[u]
+        for v in sorted(succ):
+            if -u > v or v not in succ:
+                continue  # (each clause {-u, v} is also the edge -v -> -u, so only check it once)
+            steps += len(succ)
+            if any(x != v and v in graph.get(x, ()) for x in succ):
+                succ.discard(v)
+                graph[-v].discard(-u)
+                redundant.append((-u, v))
+    return redundant
+
+
+def substitute(
+    clause: Iterable[int], substitution: Dict[int, int]
+) -> Optional[Set[int]]:
+    """Replace each variable in a clause by its equivalent literal, returning None if the clause becomes a tautology."""
+    res = set()
+    for t in clause:
+        if abs(t) in substitution:
+            t = substitution[abs(t)] if t > 0 else -substitution[abs(t)]
+        if -t in res:
+            return None
+        res.add(t)
+    return res
+
+
+def reduce(system: Conjunction) -> Tuple[Optional[Conjunction], Dict[int, int]]:
+    """
+    Reduce a system using its binary implication graph by:
+        - substituting each literal by the representative of its equivalence class
+        - asserting (the negation of) failed literals as unit clauses
+        - removing binary clauses implied by other binary clauses (transitive reduction)
+
+    Returns the reduced system (or None if it's inconsistent), and the substitution which maps each removed
+    variable to its equivalent literal (see extend_model()).
+    """
+    equiv = equivalences(build_graph(system))
+    if equiv is None:
+        return None, {}
+    substitution = {t: rep for t, rep in equiv.items() if t > 0}
+    for t, rep in equiv.items():
+        if t < 0:
+            substitution[-t] = -rep
+
+    reduced: Conjunction = []
+    seen = set()
+    for clause in system:
+        clause = substitute(clause, substitution)
+        if clause is not None and frozenset(clause) not in seen:
+            seen.add(frozenset(clause))
+            reduced.append(clause)
+
+    graph = build_graph(reduced)
+    units = [-t for t in failed_literals(graph)]
+    redundant = set(frozenset(pair) for pair in transitive_reduction(graph))
+    reduced = [clause for clause in reduced if frozenset(clause) not in redundant]
+    reduced += [set([t]) for t in units]
+    return reduced, substitution
+
+
+def extend_model(model: Model, substitution: Dict[int, int]):
+    """Extend (in place) a model of a reduced system with the values of the substituted variables."""
+    for var, t in substitution.items():
+        if abs(t) not in model:
+            model[abs(t)] = False  # (any value works if the solver left it unassigned)
+        model[var] = model[abs(t)] == (t > 0)
@@ -0,0 +1,173 @@
+from satsolver import Conjunction, Model
+from satsolver import cdcl
+from satsolver.cardinality import CardinalityDB
+from satsolver.clausedb import ClauseDB
+from satsolver.renumber import Renumbering
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from collections.abc import Callable
+import operator
+
+
+class Solver:
+    """
+    Incremental solver, which loads a (fixed) system once and then solves it repeatedly under different
+    assumptions, e.g. the sudoku rules under the clues of each puzzle:
+        s = Solver(rules)
+        for clues in puzzles:
+            if s.solve(assumptions=clues):
+                model = s.model()
+
+    The system is converted to native at-most-one constraints (see cardinality.py) and renumbered to dense
+    variables (see renumber.py) once, and the underlying CDCL solver (along with its learned clauses, level 0
+    assignments and heuristic state) is kept between calls to solve().
+    """
+
+    def __init__(
+        self,
+        system: Iterable[Iterable[int]],
+        restart: Optional[str] = None,
+        cardinality: bool = True,
+    ):
+        """
+        params:
+            system: the clauses to load (e.g. the sudoku rules), which aren't modified.
+            restart: optional name of the restart policy to use (see restarts.POLICIES).
+            cardinality: whether to detect at-most-one constraints in the system (see CardinalityDB.from_system()).
+        """
+        if cardinality and not isinstance(system, CardinalityDB):
+            system = CardinalityDB.from_system(system)
+        self.renumbering = Renumbering.from_system(system)
+        self.solver = cdcl.Solver(self.renumbering.encode(system), restart=restart)
+        self.assumed: Model = {}  # assumptions on variables which aren't in the system
+
+    @property
+    def stats(self) -> Dict:
+        """Stats of the underlying CDCL solver (accumulated over every call to solve())."""
+        return self.solver.stats
+
+    def solve(self, assumptions: Iterable[int] = ()) -> bool:
+        """
+        Returns True if the system is satisfiable when the given literals are assumed to be true (see model()).
+        Note: the assumptions only apply to this call, the system itself is unchanged.
+        """
+        dense = self.renumbering.dense
+        self.assumed = {}
+        dense_assumptions = []
+        for t in assumptions:
+            if abs(t) in dense:
+                dense_assumptions.append(self.renumbering.encode_lit(t))
+            elif self.assumed.get(abs(t), t > 0) != (t > 0):
+                return False  # (contradictory assumptions)
+            else:
+                self.assumed[abs(t)] = t > 0
+        return self.solver.solve(dense_assumptions)
+
+    def add_clause(self, clause: Iterable[int]) -> bool:
+        """
+        Permanently add a clause (over variables of the system) to the system.
+        Returns False if the system is now known to be inconsistent.
+        """
+        dense = self.renumbering.dense
+        clause = list(clause)
+        for t in clause:
+            if abs(t) not in dense:
+                raise ValueError(f"variable {abs(t)} isn't in the system")
+        return self.solver.add_clause(self.renumbering.encode_lit(t) for t in clause)
+
+    def decisions(self) -> List[int]:
+        """The literals decided to find the latest model (see cdcl.Solver.decisions())."""
+        return [self.renumbering.decode_lit(t) for t in self.solver.decisions()]
+
+    def model(self) -> Model:
+        """The (complete) model found by the latest call to solve(), including the assumptions."""
+        model = self.renumbering.decode_model(self.solver.model())
+        model.update(self.assumed)
+        return model
+
+
+def assumption_solver(s: Solver) -> Callable:
+    """
+    Wraps an incremental solver as a solver function, which solves the system loaded in the incremental solver
+    along with a given system of unit clauses (e.g. the clues of a puzzle), which are passed as assumptions.
+    The model is updated in place, and the stats returned are those of this call only.
+    """
+
+    def solve(system: Conjunction, model: Model) -> Tuple[bool, Dict]:
+        assumptions = [var if val else -var for var, val in model.items()]
+        for clause in system:
+            if len(clause) != 1:
+                raise ValueError(f"expected a unit clause (assumption), got: {clause}")
+            assumptions.extend(clause)
+        before = dict(s.stats)
+        res = s.solve(assumptions)
+        if res:
+            model.update(s.model())
+        stats = {key: val - before[key] for key, val in s.stats.items()}
+        stats["max_backjump_distance"] = s.stats["max_backjump_distance"]
+        return res, stats
+
+    return solve
+
+
+def cached_solver(restart: Optional[str] = None) -> Callable:
+    """
+    Returns a solver function, which splits each system it's given into its unit clauses (e.g. the clues of a puzzle)
+    and the rest (e.g. the sudoku rules), and solves the rest under the unit clauses as assumptions
+    (see assumption_solver()). The incremental Solver of the rest is kept between calls, and only rebuilt when
+    the rest changes, so a series of puzzles sharing the same rules only loads the rules once (per process).
+    The rest is recognised by the identity of its clauses (rather than copying and comparing them on every call),
+    so each system should share the same (unmodified) clause objects for the rules, e.g. clues + rules.
+    The model is updated in place, and the stats returned are those of this call only.
+    """
+    cache: Dict = {"base": [], "solve": None}
+
+    def solve(system: Conjunction, model: Model) -> Tuple[bool, Dict]:
+        units = []
+        base = []
+        for clause in system:
+            (units if len(clause) == 1 else base).append(clause)
+        cached = cache["base"]
+        if (
+            cache["solve"] is None
+            or len(base) != len(cached)
+            or not all(map(operator.is_, base, cached))
+        ):
+            # (keeping the clauses alive, so their ids can't be reused by other clauses)
+            cache["base"] = base
+            cache["solve"] = assumption_solver(Solver(base, restart=restart))
+        return cache["solve"](units, model)
+
+    return solve
+
+
+def solve_queries(
+    blocks: Iterable[Union[ClauseDB, List[int]]],
+    restart: Optional[str] = None,
+    cardinality: bool = True,
+) -> Iterator[Tuple[List[int], Optional[Model]]]:
+    """
+    Answer the queries of an incremental system (e.g. parsed by dimacs.parse_icnf()), i.e. clauses interleaved
+    with queries (lists of literals to assume), with a single incremental Solver.
+    Generates (assumptions, model) for each query as it's answered (where model is None if it's unsatisfiable).
+    The solver is built at the first query, and clauses read after it are added to it
+    (though it's rebuilt if they contain variables which weren't in the system before).
+    """
+    system = ClauseDB()
+    s: Optional[Solver] = None
+    for block in blocks:
+        if isinstance(block, ClauseDB):
+            if len(system) == 0:
+                system = block
+            else:
+                for clause in block:
+                    system.append(clause)
+            if s is not None:
+                try:
+                    for clause in block:
+                        s.add_clause(clause)
+                except ValueError:
+                    s = None  # (rebuilt for the next query, with the new variables)
+            continue
+        if s is None:
+            s = Solver(system, restart=restart, cardinality=cardinality)
+        yield block, (s.model() if s.solve(block) else None)
@@ -0,0 +1,172 @@
+from satsolver import Conjunction, Model
+from satsolver import strategy_template
+from satsolver.trail import Trail
+from satsolver.watched import CountingSimplify
+from typing import Dict, Optional, Tuple
+import heapq
+import logging
+import time
+
+
+class Lookahead(CountingSimplify):
+    """
+    Lookahead (failed literal probing) for use with strategy_template, as both the simplify function and
+    (via select()) the heuristic.
+
+    After unit propagation, each candidate variable is tentatively assigned both values in turn (and propagated):
+        - if both values lead to a conflict, the current node is inconsistent
+        - if one value leads to a conflict (a failed literal), the other value is asserted (and we probe again)
+        - otherwise the number of assignments each value implies is recorded, and the variable with the highest
+            score (pos * neg + pos + neg, which favours variables that reduce the system a lot in both branches)
+            is split on.
+    Only the max_candidates variables occuring most in short clauses are probed at each node.
+
+    (Non failing) probe results are cached per literal, and reused while fewer than max_stale variables have been
+    assigned since the probe was made (and the search hasn't backtracked past it).
+    Note: a cached result may be out of date, so is only used for ranking the candidates.
+    """
+
+    def __init__(self, max_candidates: int = 200, max_stale: int = 10):
+        super().__init__()
+        self.max_candidates = max_candidates
+        self.max_stale = max_stale
+        # (pos, neg) number of assignments implied by each value of the probed variables (at the current node)
+        self.scores: Dict[int, Tuple[int, int]] = {}
+        # map literal -> (len(trail.assigned) when probed, number of assignments implied)
+        self.cache: Dict[int, Tuple[int, int]] = {}
+        self.max_stamp = 0  # highest len(trail.assigned) of any cached result
+        self.probe_stats: Dict = {
+            "probes": 0,
+            "cached_probes": 0,
+            "failed_literals": 0,
+            "probe_time": 0.0,
+        }
+
+    def attach(self, trail: Trail):
+        super().attach(trail)
+        self.cache = {}
+        self.max_stamp = 0
+        trail.listeners.append(self._invalidate)
+
+    def __call__(
+        self,
+        system: Conjunction,
+        model: Model,
+        tautologies: bool = True,
+        unit_clauses: bool = True,
+    ) -> Tuple[bool, Dict]:
+        valid, literal_stats = super().__call__(
+            system, model, tautologies, unit_clauses
+        )
+        if not valid:
+            return False, {}
+        start = time.process_time()
+        while True:
+            forced = self._look_ahead(literal_stats)
+            if forced is None:
+                self.probe_stats["probe_time"] += time.process_time() - start
+                return False, {}
+            literal_stats = self.literal_stats(model)
+            if forced == 0:
+                break
+        self.probe_stats["probe_time"] += time.process_time() - start
+        return True, literal_stats
+
+    def select(self, literal_stats: Dict) -> Tuple[int, bool]:
+        """Heuristic which splits on the best scoring probed variable (trying the value which implies more first)."""
+        scores = self.scores
+        candidates = [var for var in scores if var in literal_stats]
+        if not candidates:
+            return max(literal_stats, key=lambda v: _weight(literal_stats[v])), True
+        var = max(candidates, key=lambda v: _score(*scores[v]))
+        pos, neg = scores[var]
+        logging.debug(f"lookahead split on {var} (pos, neg) = {(pos, neg)}")
+        return var, pos >= neg
+
+    def _look_ahead(self, literal_stats: Dict) -> Optional[int]:
+        """
+        Probe the candidate variables, returning the number of failed literals found (whose negation is now assigned),
+        or None if the current node is inconsistent.
+        """
+        model = self.trail.model
+        candidates = heapq.nlargest(
+            self.max_candidates, literal_stats, key=lambda v: _weight(literal_stats[v])
+        )
+        self.scores = {}
+        forced = 0
+        for var in candidates:
+            if var in model:
+                continue  # (assigned by a failed literal found earlier)
+            pos = self._probe(var)
+            neg = self._probe(-var)
+            if pos is None and neg is None:
+                return None
+            if pos is None or neg is None:
+                logging.debug(f"failed literal: {var if pos is None else -var}")
+                self.probe_stats["failed_literals"] += 1
+                model[var] = pos is not None
+                if not self.propagate(model):
+                    return None
+                forced += 1
+                continue
+            self.scores[var] = (pos, neg)
+        return forced
+
+    def _probe(self, lit: int) -> Optional[int]:
+        """Return the number of assignments implied by a literal (or None if it leads to a conflict)."""
+        trail = self.trail
+        num_assigned = len(trail.assigned)
+        cached = self.cache.get(lit)
+        if cached is not None and num_assigned - cached[0] <= self.max_stale:
+            self.probe_stats["cached_probes"] += 1
+            return cached[1]
+
+        self.probe_stats["probes"] += 1
+        trail.new_level()
+        trail.model[abs(lit)] = lit > 0
+        valid = self.propagate(trail.model)
+        implied = len(trail.assigned) - num_assigned
+        trail.backtrack()
+        if not valid:
+            return None
+        self.cache[lit] = (num_assigned, implied)
+        self.max_stamp = max(self.max_stamp, num_assigned)
+        return implied
+
+    def _invalidate(self, num_assigned: int):
+        """Drop the cached probe results made with assignments that are being undone."""
+        if self.max_stamp <= num_assigned:
+            return
+        self.max_stamp = num_assigned
+        stale = [lit for lit, (n, _) in self.cache.items() if n > num_assigned]
+        for lit in stale:
+            del self.cache[lit]
+
+
+def _weight(var_stats: Dict) -> float:
+    """How much a variable occurs in short clauses (e.g. 2 binary clauses outweigh 3 ternary clauses)."""
+    return sum(
+        count * 4.0**-length for length, count in var_stats["clause_lengths"].items()
+    )
+
+
+def _score(pos: int, neg: int) -> int:
+    return pos * neg + pos + neg
+
+
+def solver(
+    system: Conjunction, model: Model, restart: Optional[str] = None
+) -> Tuple[bool, Dict]:
+    """
+    Runs DPLL with the lookahead heuristic, returning a boolean indicating if a solution is found, and a dictionary
+    of stats (including the number of probes made and the cpu time spent probing).
+    The params model and system will both be updated in place.
+    Optionally restart the search using the named restart policy (see restarts.POLICIES).
+    """
+    lookahead = Lookahead()
+    func = strategy_template.strategy_template(
+        lookahead, lookahead.select, restart=restart
+    )
+    res, stats = func(system, model)
+    stats.update(lookahead.probe_stats)
+    return res, stats
@@ -0,0 +1,96 @@
+from satsolver import Conjunction, Model
+from satsolver import cdcl, dpll, strategy2, strategy3, strategy_random
+from multiprocessing import Process, Queue
+from typing import Dict, List, Optional, Tuple
+from collections.abc import Callable
+import logging
+import queue
+import random
+import time
+
+# default members of the portfolio: (name, solver) pairs
+MEMBERS: List[Tuple[str, Callable]] = [
+    ("dpll", dpll.solver),
+    ("strategy2", strategy2.solver),
+    ("strategy3", strategy3.solver),
+    ("random", strategy_random.solver),
+    ("cdcl", cdcl.solver),
+]
+
+
+def solver(
+    system: Conjunction,
+    model: Model,
+    members: Optional[List[Tuple[str, Callable]]] = None,
+    seed: int = 0,
+) -> Tuple[bool, Dict]:
+    """
+    Runs a portfolio of solvers in parallel (one process each) on the same system, returning the answer of the first
+    to finish (and cancelling the others), along with its stats and:
+        stats["winner"]: the name of the member which finished first
+        stats["member_times"]: the wall time (in seconds) each member ran for (until it finished or was cancelled)
+    Each member's random module is seeded with seed + its index, so the same solver can be included several times
+    with different names to race different seeds (e.g. of strategy_random).
+    The model is updated in place (the system isn't).
+    Note: the members are passed to the processes by forking, so needn't be picklable (but the results must be).
+    """
+    members = MEMBERS if members is None else members
+    results: Queue = Queue()
+    start = time.time()
+    procs: Dict[str, Process] = {}
+    for i, (name, member) in enumerate(members):
+        procs[name] = Process(
+            target=_run_member,
+            args=(name, member, system, model, seed + i, results),
+            daemon=True,
+        )
+        procs[name].start()
+
+    member_times: Dict[str, float] = {}
+    winner = None
+    while winner is None and len(member_times) < len(procs):
+        try:
+            name, res, member_model, stats = results.get(timeout=0.5)
+        except queue.Empty:
+            # (a member killed without reporting e.g. when out of memory, would otherwise be waited on forever)
+            for name, p in procs.items():
+                if name not in member_times and p.exitcode not in (None, 0):
+                    logging.warning(
+                        f"portfolio member '{name}' exited without an answer"
+                    )
+                    member_times[name] = time.time() - start
+            continue
+        member_times[name] = time.time() - start
+        if res is None:
+            logging.warning(f"portfolio member '{name}' failed: {stats['error']}")
+        else:
+            winner = name
+
+    for name, p in procs.items():
+        if p.is_alive():
+            p.terminate()
+        p.join()
+        if name not in member_times:
+            member_times[name] = time.time() - start
+    results.close()
+
+    if winner is None:
+        raise RuntimeError("every member of the portfolio failed")
+    logging.info(f"portfolio member '{winner}' finished first")
+    if res:
+        model.update(member_model)
+    stats["winner"] = winner
+    stats["member_times"] = member_times
+    return res, stats
+
+
+def _run_member(
+    name: str, member: Callable, system: Conjunction, model: Model, seed: int, results
+):
+    random.seed(seed)
+    try:
+        res, stats = member(system, model)
+    except Exception as e:
+        results.put((name, None, {}, {"error": repr(e)}))
+        return
+    results.put((name, res, dict(model) if res else {}, stats))
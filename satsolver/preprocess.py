@@ -0,0 +1,354 @@
+from satsolver import Conjunction, Model, implication
+from satsolver.cardinality import CardinalityDB
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from collections.abc import Callable
+import logging
+import time
+
+
+class Preprocessor:
+    """
+    Simplifies a system before it's handed to a solver, using:
+        - unit propagation (at decision level 0) e.g. of the clues of a sudoku puzzle
+        - subsumption: a clause C subsumes clause D if C is a subset of D (so D can be removed)
+        - self subsuming resolution: if C = {l} + A and D = {-l} + B where A is a subset of B,
+            then -l can be removed from D (as resolving C and D gives a clause which subsumes D)
+        - bounded variable elimination: a variable v is eliminated by replacing all clauses containing v or -v
+            with their (non tautological) resolvents on v, provided that doesn't increase the number of clauses
+        - the binary implication graph (see implication.py): equivalent literals are substituted by a single
+            representative, failed literals are asserted false, and redundant binary clauses are removed
+
+    The eliminated clauses are kept (on a stack) so a model of the reduced system can be extended to a model
+    of the original system with extend_model().
+    """
+
+    def __init__(
+        self,
+        system: Iterable[Iterable[int]],
+        model: Optional[Model] = None,
+        max_occurrences: int = 16,
+        max_resolvent_length: int = 16,
+        max_subsume_occurrences: int = 32,
+        subsume_effort: int = 100_000,
+    ):
+        """
+        params:
+            system: the system to simplify with run() (which isn't modified).
+            model: optional (partial) model whose assignments are treated as unit clauses.
+            max_occurrences: variables occuring in more clauses than this aren't considered for elimination.
+            max_resolvent_length: don't eliminate variables which would produce a longer resolvent.
+            max_subsume_occurrences: clauses whose least frequent variable occurs in more clauses than this
+                aren't used to (self) subsume other clauses.
+            subsume_effort: the total number of clauses which may be checked for (self) subsumption,
+                after which subsumption stops.
+        """
+        self.system = system
+        self.model = model or {}
+        self.max_occurrences = max_occurrences
+        self.max_resolvent_length = max_resolvent_length
+        self.max_subsume_occurrences = max_subsume_occurrences
+        self.subsume_budget = subsume_effort  # (decreased by each subsumption check)
+
+        self.clauses: List[Optional[Set[int]]] = []  # (None for removed clauses)
+        # map each literal to the indices of the clauses it occurs in
+        self.occurs: Dict[int, Set[int]] = {}
+        self.value: Model = {}  # variables fixed by unit propagation
+        self.units: List[int] = []  # unit literals still to propagate
+        self.queue: List[int] = []  # indices of clauses to check for (self) subsumption
+        # eliminated variables (in order of elimination) along with the clauses they were removed from
+        self.eliminated: List[Tuple[int, List[Set[int]]]] = []
+        self.vars: Set[int] = set()  # all variables in the original system
+        self.ok = True  # False once the system is known to be inconsistent
+        self.stats: Dict = {
+            "clauses_removed": 0,
+            "vars_removed": 0,
+            "vars_fixed": 0,
+            "vars_eliminated": 0,
+            "subsumed": 0,
+            "strengthened": 0,
+            "equivalences": 0,  # variables substituted by an equivalent literal
+            "failed_literals": 0,
+            "redundant_binaries": 0,
+            "time": 0.0,
+        }
+        self.num_clauses = 0  # number of clauses in the original system
+
+    def run(self) -> Conjunction:
+        """Simplify the system, returning the reduced system (which is empty if ok is False)."""
+        start = time.process_time()
+        clauses = self.clauses
+        occurs = self.occurs
+        for clause in self.system:
+            self.num_clauses += 1
+            lits = set(clause)
+            for t in lits:
+                if -t in lits:
+                    # tautology e.g. {111, -111, 114}
+                    self.vars.update(abs(t) for t in lits)
+                    break
+            else:
+                ci = len(clauses)
+                clauses.append(lits)
+                for t in lits:
+                    if t in occurs:
+                        occurs[t].add(ci)
+                    else:
+                        occurs[t] = {ci}
+                if len(lits) == 1:
+                    self.units.append(next(iter(lits)))
+                elif len(lits) == 0:
+                    self.ok = False
+        self.vars.update(abs(t) for t in occurs)
+        for var, val in self.model.items():
+            self.vars.add(var)
+            self.units.append(var if val else -var)
+
+        self._propagate()
+        self.queue = [ci for ci in range(len(clauses)) if clauses[ci] is not None]
+        # (the implication graph is only used once, as it's the most expensive pass)
+        if self.ok:
+            self._reduce_binary()
+        changed = True
+        while self.ok and changed:
+            self._subsume_all()
+            changed = self._eliminate_all()
+
+        system = [set(c) for c in clauses if c is not None] if self.ok else []
+        remaining = set(abs(t) for clause in system for t in clause)
+        self.stats["clauses_removed"] = self.num_clauses - len(system)
+        self.stats["vars_removed"] = len(self.vars) - len(remaining)
+        self.stats["vars_fixed"] = len(self.value)
+        self.stats["time"] = time.process_time() - start
+        logging.debug(f"preprocessing stats: {self.stats}")
+        return system
+
+    def extend_model(self, model: Model):
+        """Extend (in place) a model of the reduced system to a model of the original system."""
+        model.update(self.value)
+        # (including variables substituted by an equivalent literal)
+        eliminated = set(var for var, _ in self.eliminated)
+        for var in self.vars:
+            # (any value satisfies the original system for variables which were left unassigned)
+            if var not in model and var not in eliminated:
+                model[var] = False
+
+        # (in reverse order, as the clauses of an eliminated variable may contain variables eliminated later)
+        for var, clauses in reversed(self.eliminated):
+            model[var] = False
+            for clause in clauses:
+                if var in clause and not any(
+                    model[abs(t)] == (t > 0) for t in clause if t != var
+                ):
+                    model[var] = True
+                    break
+
+    def _add(self, lits: Set[int]) -> int:
+        ci = len(self.clauses)
+        self.clauses.append(lits)
+        for t in lits:
+            self.occurs.setdefault(t, set()).add(ci)
+        if len(lits) == 1:
+            self.units.append(next(iter(lits)))
+        elif len(lits) == 0:
+            self.ok = False
+        return ci
+
+    def _remove(self, ci: int):
+        for t in self.clauses[ci]:
+            self.occurs[t].discard(ci)
+        self.clauses[ci] = None
+
+    def _strengthen(self, ci: int, t: int):
+        """Remove literal t from clause ci."""
+        clause = self.clauses[ci]
+        clause.discard(t)
+        self.occurs[t].discard(ci)
+        if len(clause) == 1:
+            self.units.append(next(iter(clause)))
+        elif len(clause) == 0:
+            self.ok = False
+        self.queue.append(ci)
+
+    def _propagate(self):
+        """Assign the (level 0) unit literals, removing the clauses they satisfy and strengthening the others."""
+        while self.ok and self.units:
+            t = self.units.pop()
+            if abs(t) in self.value:
+                if self.value[abs(t)] != (t > 0):
+                    self.ok = False
+                continue
+            self.value[abs(t)] = t > 0
+            for ci in list(self.occurs.get(t, ())):
+                self._remove(ci)
+            for ci in list(self.occurs.get(-t, ())):
+                self._strengthen(ci, -t)
+
+    def _subsume_all(self):
+        """Use each clause in the queue to (self) subsume other clauses (until the subsume_effort runs out)."""
+        while self.ok and self.queue and self.subsume_budget > 0:
+            ci = self.queue.pop()
+            if self.clauses[ci] is not None:
+                self._subsume(ci)
+            self._propagate()
+
+    def _subsume(self, ci: int):
+        clause = self.clauses[ci]
+        # only clauses containing the least frequent variable of the clause (in either polarity) can be affected
+        best = min(
+            clause, key=lambda t: len(self.occurs[t]) + len(self.occurs.get(-t, ()))
+        )
+        n = len(self.occurs[best]) + len(self.occurs.get(-best, ()))
+        if n > self.max_subsume_occurrences:
+            return
+        self.subsume_budget -= n
+        for t in (best, -best):
+            for di in list(self.occurs.get(t, ())):
+                other = self.clauses[di]
+                if di == ci or other is None or len(other) < len(clause):
+                    continue
+                res = _subsumes(clause, other)
+                if res is None:
+                    continue
+                if res == 0:
+                    self._remove(di)
+                    self.stats["subsumed"] += 1
+                else:
+                    self._strengthen(di, res)
+                    self.stats["strengthened"] += 1
+
+    def _reduce_binary(self):
+        """Simplify the system using its binary implication graph."""
+        binaries = [c for c in self.clauses if c is not None and len(c) == 2]
+        graph = implication.build_graph(binaries)
+        equiv = implication.equivalences(graph)
+        if equiv is None:
+            self.ok = False
+            return
+
+        # substitute each (positive) literal by its representative, keeping the equivalence for extend_model()
+        for t, rep in equiv.items():
+            if t < 0:
+                continue
+            for ci in list(self.occurs.get(t, ())) + list(self.occurs.get(-t, ())):
+                clause = implication.substitute(self.clauses[ci], {t: rep})
+                self._remove(ci)
+                if clause is not None:
+                    self.queue.append(self._add(clause))
+            self.eliminated.append((t, [set([t, -rep]), set([-t, rep])]))
+            self.stats["equivalences"] += 1
+        self._propagate()
+
+        failed = implication.failed_literals(graph)
+        for t in failed:
+            self.units.append(-t)
+        self.stats["failed_literals"] += len(failed)
+        self._propagate()
+        if not self.ok:
+            return
+
+        binaries = [c for c in self.clauses if c is not None and len(c) == 2]
+        redundant = implication.transitive_reduction(implication.build_graph(binaries))
+        for a, b in redundant:
+            for ci in self.occurs[a] & self.occurs[b]:
+                if len(self.clauses[ci]) == 2:
+                    self._remove(ci)
+                    break
+        self.stats["redundant_binaries"] += len(redundant)
+
+    def _eliminate_all(self) -> bool:
+        """Try to eliminate every variable (least frequent first), returning True if any were eliminated."""
+        candidates = []
+        for var in self.vars:
+            if var in self.value:
+                continue
+            n = len(self.occurs.get(var, ())) + len(self.occurs.get(-var, ()))
+            if 0 < n <= self.max_occurrences:
+                candidates.append((n, var))
+        candidates.sort()
+
+        changed = False
+        for _, var in candidates:
+            if not self.ok:
+                break
+            if var not in self.value and self._eliminate(var):
+                changed = True
+                self._propagate()
+        return changed
+
+    def _eliminate(self, var: int) -> bool:
+        pos = [self.clauses[ci] for ci in self.occurs.get(var, ())]
+        neg = [self.clauses[ci] for ci in self.occurs.get(-var, ())]
+        if len(pos) + len(neg) > self.max_occurrences:
+            return False
+
+        resolvents = []
+        for p in pos:
+            for n in neg:
+                resolvent = (p | n) - {var, -var}
+                if any(-t in resolvent for t in resolvent):
+                    continue  # tautology
+                if len(resolvent) > self.max_resolvent_length:
+                    return False
+                resolvents.append(resolvent)
+                if len(resolvents) > len(pos) + len(neg):
+                    return False
+
+        clauses = []
+        for ci in list(self.occurs.get(var, ())) + list(self.occurs.get(-var, ())):
+            clauses.append(set(self.clauses[ci]))
+            self._remove(ci)
+        self.eliminated.append((var, clauses))
+        self.stats["vars_eliminated"] += 1
+        for resolvent in resolvents:
+            self.queue.append(self._add(resolvent))
+        return True
+
+
+def _subsumes(clause: Set[int], other: Set[int]) -> Optional[int]:
+    """
+    Returns 0 if clause is a subset of other,
+    or the literal -t which can be removed from other if clause is a subset apart from t (where -t is in other),
+    or None otherwise.
+    """
+    res = 0
+    for t in clause:
+        if t in other:
+            continue
+        if res == 0 and -t in other:
+            res = -t
+            continue
+        return None
+    return res
+
+
+def preprocessed_solver(solver: Callable) -> Callable:
+    """
+    Wraps a solver function so it runs on the system after preprocessing (see Preprocessor),
+    extending the model it finds to the original system.
+    The preprocessing stats are returned in stats["preprocess"].
+    If the system is a CardinalityDB, the at-most-one constraints of the reduced system are detected again
+    (see CardinalityDB.from_system()) before it's passed to the solver.
+    Note: the model is updated in place, but (unlike the wrapped solver) the system is left untouched.
+    """
+
+    def solve(system: Conjunction, model: Model) -> Tuple[bool, Dict]:
+        pre = Preprocessor(system, model)
+        reduced = pre.run()
+        logging.info(
+            f"preprocessing removed {pre.stats['clauses_removed']}/{pre.num_clauses} clauses "
+            f"and {pre.stats['vars_removed']}/{len(pre.vars)} variables in {pre.stats['time']:.3f}s"
+        )
+        if not pre.ok:
+            return False, {"backtracks": 0, "preprocess": pre.stats}
+
+        if isinstance(system, CardinalityDB):
+            reduced = CardinalityDB.from_system(reduced)
+        reduced_model: Model = {}
+        res, stats = solver(reduced, reduced_model)
+        if res:
+            pre.extend_model(reduced_model)
+            model.update(reduced_model)
+        stats["preprocess"] = pre.stats
+        return res, stats
+
+    return solve
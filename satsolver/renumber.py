@@ -0,0 +1,92 @@
+from satsolver import Conjunction, Model
+from satsolver.cardinality import CardinalityDB
+from satsolver.clausedb import ClauseDB
+from typing import Dict, Iterable, List, Mapping, Tuple, Union
+from collections.abc import Callable
+
+
+class Renumbering:
+    """
+    Maps the (possibly sparse) variables of a system to dense variables 1..n, and back again.
+    e.g. the variables of the 9x9 sudoku rules are encoded as int(f"{row}{col}{val}"), so range from 111 to 999.
+
+    Variables are numbered in increasing order, so comparing (or sorting) dense variables gives the same result
+    as for the original variables.
+    Note: dense variables start from 1 rather than 0 so literals can still be negated,
+    so a flat array indexed by dense variable has n + 1 entries (with index 0 unused).
+    """
+
+    def __init__(self, vars: Iterable[int]):
+        # original variable of each dense variable
+        self.orig: List[int] = [0] + sorted(set(abs(v) for v in vars))
+        # dense variable of each original variable
+        self.dense: Dict[int, int] = {v: i for i, v in enumerate(self.orig) if i > 0}
+
+    @classmethod
+    def from_system(cls, system: Iterable[Iterable[int]]) -> "Renumbering":
+        if isinstance(system, CardinalityDB):
+            # (without expanding the constraints to clauses)
+            return cls(abs(t) for db in (system.clauses, system.amos) for t in db.lits)
+        return cls(abs(t) for clause in system for t in clause)
+
+    @property
+    def num_vars(self) -> int:
+        return len(self.orig) - 1
+
+    def encode_lit(self, t: int) -> int:
+        return self.dense[t] if t > 0 else -self.dense[-t]
+
+    def decode_lit(self, t: int) -> int:
+        return self.orig[t] if t > 0 else -self.orig[-t]
+
+    def encode(
+        self, system: Union[Conjunction, ClauseDB, CardinalityDB]
+    ) -> Union[Conjunction, ClauseDB, CardinalityDB]:
+        """Renumber the literals of a system (returning a new system of the same type)."""
+        dense = self.dense
+        if isinstance(system, CardinalityDB):
+            res = CardinalityDB()
+            res.clauses = self.encode(system.clauses)
+            res.amos = self.encode(system.amos)
+            res.exactly = system.exactly[:]
+            return res
+        if isinstance(system, ClauseDB):
+            res = ClauseDB()
+            res.lits.extend(dense[t] if t > 0 else -dense[-t] for t in system.lits)
+            res.offsets = system.offsets[:]
+            return res
+        return [set(dense[t] if t > 0 else -dense[-t] for t in c) for c in system]
+
+    def decode(self, system: Conjunction) -> Conjunction:
+        """Inverse of encode() (for a Conjunction)."""
+        orig = self.orig
+        return [set(orig[t] if t > 0 else -orig[-t] for t in c) for c in system]
+
+    def encode_model(self, model: Mapping[int, bool]) -> Model:
+        dense = self.dense
+        return {dense[var]: val for var, val in model.items() if var in dense}
+
+    def decode_model(self, model: Mapping[int, bool]) -> Model:
+        orig = self.orig
+        return {orig[var]: val for var, val in model.items()}
+
+
+def dense_solver(solver: Callable) -> Callable:
+    """
+    Wraps a solver function so it runs on a renumbered copy of the system (with variables 1..n),
+    mapping the model back to the original variables.
+    The params system and model are both updated in place (like the wrapped solver).
+    Note: variables in the model that aren't in the system are left unchanged.
+    """
+
+    def solve(system: Conjunction, model: Model) -> Tuple[bool, Dict]:
+        renumbering = Renumbering.from_system(system)
+        dense_system = renumbering.encode(system)
+        dense_model = renumbering.encode_model(model)
+        res, stats = solver(dense_system, dense_model)
+        if not isinstance(dense_system, (ClauseDB, CardinalityDB)):
+            system[:] = renumbering.decode(dense_system)
+        model.update(renumbering.decode_model(dense_model))
+        return res, stats
+
+    return solve
@@ -0,0 +1,143 @@
+from collections import deque
+from typing import Optional
+
+
+class RestartPolicy:
+    """
+    Decides when a search should restart (i.e. undo all its decisions, while keeping its learned clauses and
+    heuristic state). A search calls on_conflict() after every conflict, and restarts when it returns True.
+    """
+
+    def __init__(self):
+        self.conflicts = 0  # conflicts since the last restart
+
+    def on_conflict(self, lbd: int) -> bool:
+        """
+        Record a conflict, returning True if the search should now restart.
+        lbd is the "literal block distance" of the conflict (the number of distinct decision levels in its learned clause).
+        """
+        self.conflicts += 1
+        return self.conflicts >= self.limit()
+
+    def on_restart(self):
+        self.conflicts = 0
+
+    def limit(self) -> float:
+        """Number of conflicts to allow before the next restart."""
+        return float("inf")
+
+
+def luby(i: int) -> int:
+    """Returns the i'th (1 based) element of the Luby sequence: 1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8, ..."""
+    while True:
+        k = 1
+        while (1 << k) - 1 < i:
+            k += 1
+        if (1 << k) - 1 == i:
+            return 1 << (k - 1)
+        i -= (1 << (k - 1)) - 1
+
+
+class LubyRestarts(RestartPolicy):
+    """Restart after unit * luby(n) conflicts (for the n'th restart)."""
+
+    def __init__(self, unit: int = 100):
+        super().__init__()
+        self.unit = unit
+        self.restarts = 0
+
+    def limit(self) -> float:
+        return self.unit * luby(self.restarts + 1)
+
+    def on_restart(self):
+        super().on_restart()
+        self.restarts += 1
+
+
+class GeometricRestarts(RestartPolicy):
+    """Restart after first * factor^n conflicts (for the n'th restart)."""
+
+    def __init__(self, first: int = 100, factor: float = 1.5):
+        super().__init__()
+        self.next_limit = float(first)
+        self.factor = factor
+
+    def limit(self) -> float:
+        return self.next_limit
+
+    def on_restart(self):
+        super().on_restart()
+        self.next_limit *= self.factor
+
+
+class GlucoseRestarts(RestartPolicy):
+    """
+    Glucose style dynamic restarts: restart when the average LBD of the recent conflicts is (sufficiently)
+    worse than the average LBD over the whole search, i.e. when the search seems to be stuck in a bad region.
+
+    params:
+        window: number of recent conflicts to average
+        k: restart when (recent average * k) > overall average
+        min_conflicts: minimum number of conflicts between restarts
+        growth: factor to grow min_conflicts by after each restart.
+            A search without clause learning should use growth > 1 so that it remains complete.
+    """
+
+    def __init__(
+        self,
+        window: int = 50,
+        k: float = 0.8,
+        min_conflicts: int = 0,
+        growth: float = 1.0,
+    ):
+        super().__init__()
+        self.recent: deque = deque(maxlen=window)
+        self.recent_sum = 0
+        self.total_sum = 0
+        self.total_count = 0
+        self.k = k
+        self.min_conflicts = float(min_conflicts)
+        self.growth = growth
+
+    def on_conflict(self, lbd: int) -> bool:
+        self.conflicts += 1
+        self.total_sum += lbd
+        self.total_count += 1
+        if len(self.recent) == self.recent.maxlen:
+            self.recent_sum -= self.recent[0]
+        self.recent.append(lbd)
+        self.recent_sum += lbd
+
+        if len(self.recent) < self.recent.maxlen or self.conflicts < self.min_conflicts:
+            return False
+        recent_avg = self.recent_sum / len(self.recent)
+        return recent_avg * self.k > self.total_sum / self.total_count
+
+    def on_restart(self):
+        super().on_restart()
+        self.recent.clear()
+        self.recent_sum = 0
+        self.min_conflicts *= self.growth
+
+
+# restart policies which can be selected by name
+POLICIES = ["luby", "geometric", "glucose"]
+
+
+def make_policy(name: Optional[str], learning: bool = True) -> Optional[RestartPolicy]:
+    """
+    Create a (new) restart policy by name (returns None if name is None).
+    learning: whether the search learns clauses (if not, the policy ensures the intervals between restarts
+        grow so that the search remains complete).
+    """
+    if name is None:
+        return None
+    if name == "luby":
+        return LubyRestarts()
+    if name == "geometric":
+        return GeometricRestarts()
+    if name == "glucose":
+        if learning:
+            return GlucoseRestarts()
+        return GlucoseRestarts(min_conflicts=50, growth=1.5)
+    raise ValueError(f"unknown restart policy '{name}' (expected one of {POLICIES})")
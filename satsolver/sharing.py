@@ -0,0 +1,193 @@
+from satsolver import Conjunction, Model
+from satsolver import cdcl, restarts
+from multiprocessing import Lock, Process, Queue, RawArray, RawValue, cpu_count
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+import queue
+import random
+import time
+
+# indices of each worker's counters in the shared counters array
+EXPORTED = 0
+IMPORTED = 1
+USEFUL = 2
+NUM_COUNTERS = 3
+
+
+class ClauseRing:
+    """
+    Fixed size ring buffer of (short) clauses in shared memory, which worker processes write their learned clauses to
+    and read each other's learned clauses from.
+
+    Each clause is stored in a slot of max_length + 2 ints: the worker which wrote it, its length, then its literals.
+    head counts every clause ever written (so clause n is in slot n % slots), and each reader keeps track of the
+    position it has read up to. A reader which falls more than slots clauses behind misses the oldest ones.
+    Note: must be created before the workers are forked (so they share the same memory).
+    """
+
+    def __init__(self, slots: int = 4096, max_length: int = 8):
+        self.slots = slots
+        self.max_length = max_length
+        self.width = max_length + 2
+        self.data = RawArray("i", slots * self.width)
+        self.head = RawValue("q", 0)
+        self.lock = Lock()
+
+    def write(self, clause: List[int], source: int):
+        assert len(clause) <= self.max_length
+        with self.lock:
+            start = (self.head.value % self.slots) * self.width
+            self.data[start] = source
+            self.data[start + 1] = len(clause)
+            self.data[start + 2 : start + 2 + len(clause)] = clause
+            self.head.value += 1
+
+    def read(self, since: int, source: int) -> Tuple[List[List[int]], int]:
+        """
+        Return the clauses written (by workers other than source) since position since,
+        along with the position to read from next time.
+        """
+        res = []
+        with self.lock:
+            head = self.head.value
+            data = self.data
+            for n in range(max(since, head - self.slots), head):
+                start = (n % self.slots) * self.width
+                if data[start] != source:
+                    res.append(data[start + 2 : start + 2 + data[start + 1]])
+        return res, head
+
+
+class SharingSolver(cdcl.Solver):
+    """
+    CDCL solver which exports its short learned clauses (by length and LBD) to a ClauseRing,
+    and imports the clauses learned by the other workers at each restart (when it's at decision level 0).
+
+    An imported clause counts as useful once it takes part in conflict analysis (as a conflict or reason clause).
+    The worker's counters (see EXPORTED etc) are kept in the shared counters array so they survive the worker
+    being terminated.
+    """
+
+    def __init__(
+        self,
+        system: Iterable[Iterable[int]],
+        ring: ClauseRing,
+        worker: int,
+        counters,
+        max_lbd: int = 4,
+        restart: Optional[str] = "luby",
+        seed: int = 0,
+    ):
+        super().__init__(system, restart=restart)
+        self.ring = ring
+        self.worker = worker
+        self.counters = counters
+        self.max_lbd = max_lbd
+        self.read_pos = 0
+        # indices of the imported clauses which haven't been used (in conflict analysis) yet
+        self.imported = set()
+        if worker > 0:
+            # (diversify the workers, so they don't all search the same part of the space)
+            rng = random.Random(seed + worker)
+            for var in self.phase:
+                self.phase[var] = rng.random() < 0.5
+
+    def _count(self, counter: int):
+        self.counters[NUM_COUNTERS * self.worker + counter] += 1
+
+    def on_learn(self, learnt: List[int], lbd: int):
+        if len(learnt) <= self.ring.max_length and lbd <= self.max_lbd:
+            self.ring.write(learnt, self.worker)
+            self._count(EXPORTED)
+
+    def on_restart(self):
+        clauses, self.read_pos = self.ring.read(self.read_pos, self.worker)
+        for clause in clauses:
+            ci = len(self.clauses)
+            if not self.add_clause(clause):
+                return
+            if len(self.clauses) > ci:
+                self.imported.add(ci)
+            self._count(IMPORTED)
+
+    def reason_clause(self, reason: cdcl.Reason):
+        if isinstance(reason, int) and reason in self.imported:
+            self.imported.discard(reason)
+            self._count(USEFUL)
+        return super().reason_clause(reason)
+
+
+def solver(
+    system: Conjunction,
+    model: Model,
+    cpus: Optional[int] = None,
+    max_length: int = 8,
+    max_lbd: int = 4,
+    slots: int = 4096,
+) -> Tuple[bool, Dict]:
+    """
+    Runs a SharingSolver in each of cpus worker processes on the same system (each with a different restart policy
+    and initial phases), exchanging learned clauses of at most max_length literals and LBD at most max_lbd through
+    a shared ClauseRing, and returns the answer of the first worker to finish (terminating the others).
+
+    Returns a boolean indicating if a solution is found, and a dictionary of stats: the winning worker's stats, plus
+    the totals (over every worker) of the clauses "exported", "imported" and "useful" (see SharingSolver).
+    The model is updated in place (the system isn't), and any variables already in it are treated as unit clauses.
+    """
+    cpus = cpus or cpu_count()
+    system = list(system) + [set([var if val else -var]) for var, val in model.items()]
+    ring = ClauseRing(slots, max_length)
+    counters = RawArray("i", NUM_COUNTERS * cpus)
+    results: Queue = Queue()
+    procs = []
+    for worker in range(cpus):
+        procs.append(
+            Process(
+                target=_worker,
+                args=(system, ring, worker, counters, max_lbd, results),
+                daemon=True,
+            )
+        )
+        procs[-1].start()
+
+    start = time.time()
+    while True:
+        try:
+            worker, res, worker_model, stats = results.get(timeout=0.5)
+            break
+        except queue.Empty:
+            if all(p.exitcode not in (None, 0) for p in procs):
+                raise RuntimeError("every clause sharing worker died")
+    for p in procs:
+        if p.is_alive():
+            p.terminate()
+        p.join()
+    results.close()
+
+    logging.debug(f"clause sharing worker {worker} finished first")
+    if res:
+        model.update(worker_model)
+    stats["winner"] = worker
+    stats["workers"] = cpus
+    stats["wall_time"] = time.time() - start
+    for name, counter in [
+        ("exported", EXPORTED),
+        ("imported", IMPORTED),
+        ("useful", USEFUL),
+    ]:
+        stats[name] = sum(counters[counter::NUM_COUNTERS])
+    return res, stats
+
+
+def _worker(
+    system: Conjunction,
+    ring: ClauseRing,
+    worker: int,
+    counters,
+    max_lbd: int,
+    results: Queue,
+):
+    restart = restarts.POLICIES[worker % len(restarts.POLICIES)]
+    s = SharingSolver(system, ring, worker, counters, max_lbd, restart=restart)
+    res = s.solve()
+    results.put((worker, res, s.model() if res else {}, s.stats))
@@ -1,6 +1,6 @@
 import copy
 from satsolver import Disjunction, Conjunction, Model, puzzle
-from satsolver import strategy_template
+from satsolver import strategy_template, watched
 
 # from satsolver.dpll import simplify
 from typing import MutableSet, Tuple, Dict
@@ -29,9 +29,12 @@ def select_lowest_purity(literal_stats: Dict) -> Tuple[int, bool]:
     return data[0], purities[data[0]]["guess"]
 
 
-solver = strategy_template.strategy_template(
-    strategy_template.simplify, select_lowest_purity
-)
+def solver(system: Conjunction, model: Model) -> Tuple[bool, Dict]:
+    # (a new simplify object for each call, so nothing is carried over from a previous system)
+    func = strategy_template.strategy_template(
+        watched.CountingSimplify(), select_lowest_purity
+    )
+    return func(system, model)
 
 
 ###### extra methods used to compare against select_lowest_purity:
@@ -1,6 +1,6 @@
 import copy
 from satsolver import Conjunction, Model
-from satsolver import strategy_template
+from satsolver import strategy_template, watched
 from typing import MutableSet, Tuple, Dict
 import logging
 
@@ -15,4 +15,7 @@ def dlis_split(literal_stats: Dict) -> Tuple[int, bool]:
     return best_var, guess
 
 
-solver = strategy_template.strategy_template(strategy_template.simplify, dlis_split)
+def solver(system: Conjunction, model: Model) -> Tuple[bool, Dict]:
+    # (a new simplify object for each call, so nothing is carried over from a previous system)
+    func = strategy_template.strategy_template(watched.CountingSimplify(), dlis_split)
+    return func(system, model)
@@ -1,7 +1,7 @@
 import copy
 import random
 from satsolver import Conjunction, Model
-from satsolver import strategy_template
+from satsolver import strategy_template, watched
 
 from typing import MutableSet, Tuple, Dict
 import logging
@@ -15,6 +15,6 @@ def select_random(literal_stats: Dict) -> Tuple[int, bool]:
 def solver(system: Conjunction, model: Model) -> Tuple[bool, Dict]:
     # return strategy2.solver(system, model, heuristic=select_random)
     func = strategy_template.strategy_template(
-        strategy_template.simplify, select_random
+        watched.CountingSimplify(), select_random
     )
     return func(system, model)
@@ -1,8 +1,9 @@
-import copy
 from satsolver import Disjunction, Conjunction, Model, puzzle
+from satsolver.trail import Trail
+from satsolver import restarts
 
 # from satsolver.dpll import simplify
-from typing import MutableSet, Tuple, Dict
+from typing import MutableSet, Tuple, Dict, List, Optional, Sequence
 import logging
 from collections.abc import Callable
 
@@ -11,75 +12,159 @@ type_simplify = Callable  # [[Conjunction, Model, bool, bool], Tuple[int, Dict]]
 
 type_select_split = Callable  # [[Dict], Tuple[int, bool]]
 
+type_select = Callable  # [[Conjunction, Any], Optional[Tuple[int, bool]]]
+
 
 def strategy_template(
     simplify: type_simplify,
     heuristic: type_select_split,
+    restart: Optional[str] = None,
 ) -> Callable:  # [[Conjunction, Model], Tuple[bool, Dict]]:
     """
     Generates and returns a SAT solver function that uses the provided heuristic and simplify function.
     The stats returned by a call to simplify should be compatible with the stats expected by the heuristic function.
+    Optionally restart the search using the named restart policy (see restarts.POLICIES).
     (Function generator for a generic satsolver).
     """
 
     def strategy(system: Conjunction, model: Model) -> Tuple[bool, Dict]:
         stats: Dict = {
             "backtracks": 0,
+            "restarts": 0,
         }
 
-        def _solver(
-            system: Conjunction,
-            model: Model,
-            remove_tautologies: bool = False,
-        ) -> bool:
-            nonlocal stats  # https://stackoverflow.com/a/11987499
-            # nonlocal heuristic
-            # nonlocal simplify
-
-            # print(puzzle.visualize_sudoku_model(model, board_size=9))
-            valid, literal_stats = simplify(
-                system, model, tautologies=remove_tautologies
-            )
-            if not valid:
-                stats["backtracks"] += 1
-                return False
-
-            if len(system) == 0:
+        def select(
+            system: Conjunction, literal_stats: Dict
+        ) -> Optional[Tuple[int, bool]]:
+            if not literal_stats:
+                # (no unassigned literals left in any unsatisfied clause)
                 logging.debug(f"reached an empty system")
-                return True
-
+                return None
             # choose a variable e.g. -113 to assume its value
             var, init_guess = heuristic(literal_stats)
             logging.debug(
                 f"splitting on variable {var} with initial guess: {init_guess}"
             )
+            return var, init_guess
 
-            new_system = copy.deepcopy(system)
-            new_model = copy.deepcopy(model)
-            new_model[abs(var)] = init_guess
-            if not _solver(new_system, new_model):
-                logging.debug(f"backtracking! (on var {abs(var)})")
-                new_system = copy.deepcopy(system)
-                new_model = copy.deepcopy(model)
-                new_model[abs(var)] = not init_guess
-                # stats["backtracks"] += 1
-                if not _solver(new_system, new_model):
-                    # stats["backtracks"] += 1
-                    return False
-
-            # carefully update sytem and model in place (so change is present in the outer scope/function)
-            system[:] = new_system
-            model.clear()
-            model.update(new_model)
-            return True
-
-        # note: as an optimization we only remove tautologies on the first pass
-        res = _solver(system, model, remove_tautologies=True)
+        res = search(
+            system, model, simplify, select, stats, restart=restart, hooks=[heuristic]
+        )
         return res, stats
 
     return strategy
 
 
+def search(
+    system: Conjunction,
+    model: Model,
+    simplify: type_simplify,
+    select: type_select,
+    stats: Dict,
+    restart: Optional[str] = None,
+    hooks: Sequence = (),
+) -> bool:
+    """
+    Generic backtracking search shared by all the DPLL based strategies.
+    Rather than copying the system and model at every decision, changes are recorded on a Trail and undone on backtrack.
+    The search is iterative (with an explicit stack of decisions), so it isn't limited by Python's recursion limit.
+
+    params:
+        simplify: called as simplify(system, model, tautologies=...), returning (valid, info)
+        select: called as select(system, info) to get the (var, initial guess) to split on,
+            or None when the system is solved.
+        stats: dict of stats to update (must contain "backtracks" and "restarts" keys)
+        restart: name of the restart policy to use (if any).
+            As there is no clause learning, the "LBD" of a conflict is taken to be the number of decisions made.
+            So a restart doesn't just repeat the same search, the number of conflicts caused by each decision
+            variable (and the last value of each decision variable) are kept across restarts: after a restart,
+            the variables which caused the most conflicts are decided first (using their saved value).
+        hooks: objects (e.g. a stateful heuristic) which may implement attach(trail) to be called at the start
+            of the search, and on_conflict(trail) to be called whenever simplify finds an inconsistency.
+
+    The params system and model will both be updated in place.
+    """
+    trail = Trail(system, model)
+    policy = restarts.make_policy(restart, learning=False)
+    for hook in hooks:
+        if hasattr(hook, "attach"):
+            hook.attach(trail)
+    conflict_hooks = [hook for hook in hooks if hasattr(hook, "on_conflict")]
+
+    # stack of the decisions made, as [var, initial guess, whether the opposite guess has been tried]
+    # (an explicit stack rather than recursion, so the search depth isn't limited by the recursion limit)
+    decisions: List[List] = []
+    # (only used with restarts) the number of conflicts found right after deciding each variable,
+    # the last value decided for each variable, and the variables to decide first after a restart
+    conflicts: Dict[int, int] = {}
+    phases: Model = {}
+    focus: List[int] = []
+    # note: as an optimization we only remove tautologies on the first pass
+    remove_tautologies = True
+    while True:
+        # print(puzzle.visualize_sudoku_model(trail.model, board_size=9))
+        valid, info = simplify(
+            trail.system, trail.model, tautologies=remove_tautologies
+        )
+        remove_tautologies = False
+        if valid:
+            split = select(trail.system, info)
+            if split is None:
+                res = True
+                break
+            var, init_guess = split
+            while focus and focus[-1] in trail.model:
+                focus.pop()
+            if focus:
+                var = focus.pop()
+                init_guess = phases[var]
+            decisions.append([abs(var), init_guess, False])
+            trail.new_level()
+            trail.model[abs(var)] = init_guess
+            continue
+
+        stats["backtracks"] += 1
+        for hook in conflict_hooks:
+            hook.on_conflict(trail)
+        if policy and decisions:
+            conflicts[decisions[-1][0]] = conflicts.get(decisions[-1][0], 0) + 1
+        if policy and trail.level > 0 and policy.on_conflict(trail.level):
+            # undo all decisions (keeping the simplifications made at level 0)
+            logging.debug(f"restarting search after {policy.conflicts} conflicts")
+            for var, _, _ in decisions:
+                phases[var] = trail.model[var]
+            # (as many variables as were decided, in order of most conflicts last, so they're popped first)
+            focus = sorted(
+                (var for var in conflicts if var in phases), key=conflicts.get
+            )[-len(decisions) :]
+            while trail.level > 0:
+                trail.backtrack()
+            decisions.clear()
+            policy.on_restart()
+            stats["restarts"] += 1
+            continue
+
+        # backtrack to the most recent decision whose opposite guess hasn't been tried yet
+        while decisions and decisions[-1][2]:
+            trail.backtrack()
+            decisions.pop()
+        if not decisions:
+            res = False
+            break
+        decision = decisions[-1]
+        logging.debug(f"backtracking! (on var {decision[0]})")
+        trail.backtrack()
+        decision[2] = True
+        trail.new_level()
+        trail.model[decision[0]] = not decision[1]
+
+    # update sytem and model in place (so change is present in the outer scope/function)
+    system[:] = trail.system
+    model.clear()
+    model.update(trail.model)
+    return res
+
+
 def simplify(
     system: Conjunction,
     model: Model,
@@ -91,81 +176,84 @@ def simplify(
     (e.g. for computing "purity ratio").
     """
     # logging.debug(f"in simplify, system = {system}\n")
-    i = 0
-    # all_literals = set()
-    run_again = False
-
-    # map each literal to a dict of stats
-    literal_stats = {}
-
+    # (loops over the system until a pass assigns no new unit clauses)
     while True:
-        if i > len(system) - 1:
-            break
-        clause = system[i]
+        i = 0
+        run_again = False
 
-        # handle tautologies e.g. {111, -111, 114}
-        if tautologies:
-            new_clause = set([t for t in clause if -t not in clause])
-            # removed_tokens = clause - new_clause  # e.g. {111, -111}
-            system[i] = new_clause
+        # map each literal to a dict of stats
+        literal_stats = {}
+
+        while True:
+            if i > len(system) - 1:
+                break
             clause = system[i]
 
-        if len(clause) == 0:
-            system.pop(i)
-            continue
+            # handle tautologies e.g. {111, -111, 114}
+            if tautologies:
+                new_clause = set([t for t in clause if -t not in clause])
+                # removed_tokens = clause - new_clause  # e.g. {111, -111}
+                system[i] = new_clause
+                clause = system[i]
 
-        # apply model to simplify if possible
-        remove_tokens = set()
-        clause_removed = False
-        for t in clause:
-            if abs(t) in model:
-                term_val = model[abs(t)] if t > 0 else not model[abs(t)]
-                if term_val == True:  # whole clause must be true
-                    # logging.debug(
-                    #    f"removing clause (known to be true from model): {clause}"
-                    # )
-                    system.pop(i)
-                    clause_removed = True
-                    break
-                else:
-                    # logging.debug(
-                    #    f"removing useless token {t} (where {abs(t)} = {model[abs(t)]}) from clause: {clause}"
-                    # )
-                    remove_tokens.add(t)
-        if clause_removed:
-            continue
-        # if remove_tokens:
-        #    logging.debug(f"remove_tokens = {remove_tokens}")
-        if len(clause) == len(remove_tokens):
-            return False, set()  # inconsistent (no terms left to make clause true)
-        system[i] = clause - remove_tokens
-        clause = system[i]
-
-        # handle unit clauses
-        if unit_clauses and len(clause) == 1:
-            term = list(clause)[0]  # e.g. -124
-            term_value = term > 0
-            if abs(term) in model and model[abs(term)] != term_value:
-                return False, set()  # inconsistent
-            model[abs(term)] = term_value  # update model, ensuring this clause is True
-            system.pop(i)
-            run_again = True
-            continue
+            if len(clause) == 0:
+                system.pop(i)
+                continue
+
+            # apply model to simplify if possible
+            remove_tokens = set()
+            clause_removed = False
+            for t in clause:
+                if abs(t) in model:
+                    term_val = model[abs(t)] if t > 0 else not model[abs(t)]
+                    if term_val == True:  # whole clause must be true
+                        # logging.debug(
+                        #    f"removing clause (known to be true from model): {clause}"
+                        # )
+                        system.pop(i)
+                        clause_removed = True
+                        break
+                    else:
+                        # logging.debug(
+                        #    f"removing useless token {t} (where {abs(t)} = {model[abs(t)]}) from clause: {clause}"
+                        # )
+                        remove_tokens.add(t)
+            if clause_removed:
+                continue
+            # if remove_tokens:
+            #    logging.debug(f"remove_tokens = {remove_tokens}")
+            if len(clause) == len(remove_tokens):
+                return False, set()  # inconsistent (no terms left to make clause true)
+            if remove_tokens:
+                system[i] = clause - remove_tokens
+                clause = system[i]
+
+            # handle unit clauses
+            if unit_clauses and len(clause) == 1:
+                term = list(clause)[0]  # e.g. -124
+                term_value = term > 0
+                if abs(term) in model and model[abs(term)] != term_value:
+                    return False, set()  # inconsistent
+                # update model, ensuring this clause is True
+                model[abs(term)] = term_value
+                system.pop(i)
+                run_again = True
+                continue
+
+            # track stats about all literals (still in system)
+            for t in clause:
+                if abs(t) not in literal_stats:
+                    literal_stats[abs(t)] = {
+                        "clause_lengths": [],
+                        "cp": 0,  # num occurences as positive literal
+                        "cn": 0,  # num occurences as negative literal
+                    }
+                literal_stats[abs(t)]["cp" if t > 0 else "cn"] += 1
+                literal_stats[abs(t)]["clause_lengths"].append(len(clause))
+            i += 1
 
-        # track stats about all literals (still in system)
-        for t in clause:
-            if abs(t) not in literal_stats:
-                literal_stats[abs(t)] = {
-                    "clause_lengths": [],
-                    "cp": 0,  # num occurences as positive literal
-                    "cn": 0,  # num occurences as negative literal
-                }
-            literal_stats[abs(t)]["cp" if t > 0 else "cn"] += 1
-            literal_stats[abs(t)]["clause_lengths"].append(len(clause))
-        i += 1
-
-    if run_again:
-        # there may be new unit clauses to handle:
-        logging.debug("simplify: calling itself recursively")
-        return simplify(system, model, tautologies=False, unit_clauses=True)
-    return True, literal_stats
+        if not run_again:
+            return True, literal_stats
+        # there may be new unit clauses to handle (so do another pass):
+        logging.debug("simplify: running another pass")
+        tautologies = False
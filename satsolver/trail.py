@@ -0,0 +1,93 @@
+from satsolver import Disjunction, Conjunction, Model
+from typing import List, Tuple
+from collections.abc import Callable
+
+
+class Trail:
+    """
+    Records every change made to a system/model during a search, so that the changes made
+    since a decision can be undone when backtracking (instead of deep copying the system and model at every decision).
+
+    Usage: wrap a system and model with `Trail(system, model)` and then simplify/assign using `trail.system` and `trail.model`.
+    Call `new_level()` before making a decision, and `backtrack()` to undo everything since the latest decision.
+    """
+
+    def __init__(self, system: Conjunction, model: Model):
+        self.assigned: List[int] = []  # variables in the order they were assigned
+        # changes made to the clause database (only recorded above decision level 0)
+        self.undo: List[Tuple[int, int, Disjunction]] = []
+        # (len(self.assigned), len(self.undo)) at the start of each decision level
+        self.marks: List[Tuple[int, int]] = []
+        # functions to call (with the number of variables that will remain assigned) at the start of backtrack()
+        self.listeners: List[Callable] = []
+        self.system = TrailSystem(system, self)
+        self.model = TrailModel(model, self)
+
+    @property
+    def level(self) -> int:
+        """Current decision level (0 when no decisions have been made)."""
+        return len(self.marks)
+
+    def new_level(self):
+        """Start a new decision level (call right before assigning a decision variable)."""
+        self.marks.append((len(self.assigned), len(self.undo)))
+
+    def backtrack(self):
+        """Undo all changes to the system and model made since the latest call to new_level()."""
+        num_assigned, num_undo = self.marks.pop()
+        for listener in self.listeners:
+            listener(num_assigned)
+
+        model = self.model
+        for var in self.assigned[num_assigned:]:
+            dict.__delitem__(model, var)
+        del self.assigned[num_assigned:]
+
+        system = self.system
+        undo = self.undo
+        while len(undo) > num_undo:
+            op, i, clause = undo.pop()
+            if op == POP:
+                list.insert(system, i, clause)
+            else:
+                list.__setitem__(system, i, clause)
+
+
+# types of changes recorded in Trail.undo
+POP = 0
+SET = 1
+
+
+class TrailSystem(list):
+    """A Conjunction which records calls to pop() and item assignment in a Trail."""
+
+    def __init__(self, system: Conjunction, trail: Trail):
+        super().__init__(system)
+        self.trail = trail
+
+    def pop(self, i: int = -1) -> Disjunction:
+        clause = super().pop(i)
+        if self.trail.marks:
+            if i < 0:
+                i += len(self) + 1
+            self.trail.undo.append((POP, i, clause))
+        return clause
+
+    def __setitem__(self, i, clause):
+        if self.trail.marks:
+            self.trail.undo.append((SET, i, self[i]))
+        super().__setitem__(i, clause)
+
+
+class TrailModel(dict):
+    """A Model which records the order that variables were assigned in a Trail."""
+
+    def __init__(self, model: Model, trail: Trail):
+        super().__init__(model)
+        self.trail = trail
+        trail.assigned.extend(model.keys())
+
+    def __setitem__(self, var: int, value: bool):
+        if var not in self:
+            self.trail.assigned.append(var)
+        super().__setitem__(var, value)
@@ -0,0 +1,155 @@
+from satsolver.trail import Trail
+from typing import List, Dict, Tuple, Optional
+
+
+class ActivityHeap:
+    """
+    Indexed binary max-heap of variables ordered by their activity (EVSIDS scores).
+    Pushing, popping, and bumping (increasing the activity of) a variable are all O(log n).
+
+    Activities are bumped by an increment which grows exponentially (by 1/decay) after each conflict,
+    which is equivalent to decaying every activity but O(1).
+    """
+
+    def __init__(self, decay: float = 0.95):
+        self.activity: Dict[int, float] = {}
+        self.heap: List[int] = []
+        self.indices: Dict[int, int] = {}  # index of each variable in the heap
+        self.var_inc = 1.0
+        self.decay_factor = decay
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    def __contains__(self, var: int) -> bool:
+        return var in self.indices
+
+    def push(self, var: int):
+        """Insert a variable into the heap (if not already present)."""
+        if var in self.indices:
+            return
+        if var not in self.activity:
+            self.activity[var] = 0.0
+        self.indices[var] = len(self.heap)
+        self.heap.append(var)
+        self._sift_up(len(self.heap) - 1)
+
+    def pop(self) -> int:
+        """Remove and return the variable with the highest activity."""
+        heap = self.heap
+        top = heap[0]
+        last = heap.pop()
+        del self.indices[top]
+        if heap:
+            heap[0] = last
+            self.indices[last] = 0
+            self._sift_down(0)
+        return top
+
+    def bump(self, var: int):
+        """Increase the activity of a variable."""
+        activity = self.activity
+        activity[var] = activity.get(var, 0.0) + self.var_inc
+        if activity[var] > 1e100:
+            # rescale to avoid overflow
+            for v in activity:
+                activity[v] *= 1e-100
+            self.var_inc *= 1e-100
+        if var in self.indices:
+            self._sift_up(self.indices[var])
+
+    def decay(self):
+        """Decay all activities (by increasing the bump increment)."""
+        self.var_inc /= self.decay_factor
+
+    def _sift_up(self, i: int):
+        heap = self.heap
+        indices = self.indices
+        activity = self.activity
+        var = heap[i]
+        act = activity[var]
+        while i > 0:
+            parent = (i - 1) >> 1
+            if activity[heap[parent]] >= act:
+                break
+            heap[i] = heap[parent]
+            indices[heap[i]] = i
+            i = parent
+        heap[i] = var
+        indices[var] = i
+
+    def _sift_down(self, i: int):
+        heap = self.heap
+        indices = self.indices
+        activity = self.activity
+        var = heap[i]
+        act = activity[var]
+        size = len(heap)
+        while True:
+            child = 2 * i + 1
+            if child >= size:
+                break
+            if child + 1 < size and activity[heap[child + 1]] > activity[heap[child]]:
+                child += 1
+            if activity[heap[child]] <= act:
+                break
+            heap[i] = heap[child]
+            indices[heap[i]] = i
+            i = child
+        heap[i] = var
+        indices[var] = i
+
+
+class VSIDS:
+    """
+    Decision heuristic (for use with strategy_template) which splits on the variable with the highest activity.
+    Whenever a conflict is found, the variables which were decided on are bumped (and all activities decay),
+    so the search focuses on the variables involved in recent conflicts.
+    The initial guess for a variable is the value it was last assigned (phase saving).
+
+    Note: an instance keeps its state between calls, so should only be used by one search at a time.
+    """
+
+    def __init__(self, decay: float = 0.95, default_phase: bool = True):
+        self.decay = decay
+        self.heap = ActivityHeap(decay)
+        self.default_phase = default_phase
+        self.phase: Dict[int, bool] = {}
+        self.trail: Optional[Trail] = None
+        # (decision level, var) of unassigned variables which were popped while not in any remaining clause
+        self.parked: List[Tuple[int, int]] = []
+
+    def attach(self, trail: Trail):
+        """Start a new search."""
+        self.trail = trail
+        self.heap = ActivityHeap(self.decay)
+        self.phase = {}
+        self.parked = []
+        trail.listeners.append(self._on_backtrack)
+        for clause in trail.system:
+            for t in clause:
+                self.heap.push(abs(t))
+
+    def on_conflict(self, trail: Trail):
+        for num_assigned, _ in trail.marks:
+            self.heap.bump(trail.assigned[num_assigned])
+        self.heap.decay()
+
+    def _on_backtrack(self, num_assigned: int):
+        trail = self.trail
+        for var in trail.assigned[num_assigned:]:
+            self.phase[var] = trail.model[var]
+            self.heap.push(var)
+        while self.parked and self.parked[-1][0] > trail.level:
+            self.heap.push(self.parked.pop()[1])
+
+    def __call__(self, literal_stats: Dict) -> Tuple[int, bool]:
+        heap = self.heap
+        model = self.trail.model
+        while True:
+            var = heap.pop()
+            if var in literal_stats:
+                break
+            if var not in model:
+                self.parked.append((self.trail.level, var))
+        return var, self.phase.get(var, self.default_phase)
@@ -0,0 +1,296 @@
+from satsolver import Conjunction, Model
+from satsolver.trail import Trail
+from typing import List, Dict, Tuple, Optional
+import logging
+
+
+class WatchedSimplify:
+    """
+    Drop-in replacement for strategy_template.simplify() which propagates unit clauses using two watched literals.
+
+    Each clause (of length >= 2) watches two of its literals that aren't false.
+    When a variable is assigned, only the clauses watching the literal that became false are visited
+    (to find a new literal to watch, or to discover that the clause is now unit/conflicting).
+    The system itself is never modified, so this must be driven by strategy_template.search()
+    (which assigns variables through a Trail and undoes them on backtrack).
+
+    Returns the same (valid, literal_stats) as strategy_template.simplify().
+    """
+
+    def __init__(self):
+        self.trail: Optional[Trail] = None
+        self.clauses: List[List[int]] = []
+        # map each literal to the list of indices of the clauses watching it
+        self.watches: Dict[int, List[int]] = {}
+        self.units: List[int] = []  # literals of the unit clauses in the system
+        self.qhead = 0  # index into trail.assigned of the next assignment to propagate
+
+    def attach(self, trail: Trail):
+        """Build the watch lists for the system of a (new) trail."""
+        self.trail = trail
+        self.clauses = []
+        self.watches = {}
+        self.units = []
+        self.qhead = 0
+        trail.listeners.append(self._on_backtrack)
+
+        for clause in trail.system:
+            if any(-t in clause for t in clause):
+                continue  # tautology e.g. {111, -111, 114}
+            if len(clause) == 0:
+                continue
+            if len(clause) == 1:
+                self.units.append(next(iter(clause)))
+                continue
+            lits = list(clause)
+            self.watches.setdefault(lits[0], []).append(len(self.clauses))
+            self.watches.setdefault(lits[1], []).append(len(self.clauses))
+            self.clauses.append(lits)
+
+    def _on_backtrack(self, num_assigned: int):
+        self.qhead = min(self.qhead, num_assigned)
+
+    def __call__(
+        self,
+        system: Conjunction,
+        model: Model,
+        tautologies: bool = True,
+        unit_clauses: bool = True,
+    ) -> Tuple[bool, Dict]:
+        trail = getattr(model, "trail", None)
+        if trail is None:
+            raise ValueError(
+                "WatchedSimplify must be driven by strategy_template.search()"
+            )
+        if trail is not self.trail:
+            self.attach(trail)
+            for t in self.units:
+                if abs(t) in model:
+                    if model[abs(t)] != (t > 0):
+                        return False, {}
+                    continue
+                model[abs(t)] = t > 0
+
+        if not self.propagate(model):
+            return False, {}
+        return True, self.literal_stats(model)
+
+    def propagate(self, model: Model) -> bool:
+        """
+        Propagate all assignments made since the last call (assigning the literals of clauses which become unit).
+        Returns False if a clause becomes false.
+        """
+        assigned = self.trail.assigned
+        clauses = self.clauses
+        watches = self.watches
+
+        while self.qhead < len(assigned):
+            var = assigned[self.qhead]
+            self.qhead += 1
+            false_lit = -var if model[var] else var
+
+            ws = watches.get(false_lit)
+            if not ws:
+                continue
+            i = j = 0
+            while i < len(ws):
+                ci = ws[i]
+                i += 1
+                clause = clauses[ci]
+                # ensure the false literal is clause[1]
+                if clause[0] == false_lit:
+                    clause[0] = clause[1]
+                    clause[1] = false_lit
+                first = clause[0]
+                val = model.get(abs(first))
+                if val is not None and val == (first > 0):
+                    ws[j] = ci  # clause is already true
+                    j += 1
+                    continue
+
+                # look for a new literal to watch
+                for k in range(2, len(clause)):
+                    t = clause[k]
+                    val = model.get(abs(t))
+                    if val is None or val == (t > 0):
+                        clause[1] = t
+                        clause[k] = false_lit
+                        watches.setdefault(t, []).append(ci)
+                        break
+                else:
+                    ws[j] = ci
+                    j += 1
+                    if abs(first) in model:
+                        # conflict (every literal in the clause is false)
+                        while i < len(ws):
+                            ws[j] = ws[i]
+                            i += 1
+                            j += 1
+                        del ws[j:]
+                        logging.debug(f"conflict in clause: {clause}")
+                        return False
+                    model[abs(first)] = first > 0  # clause is unit
+            del ws[j:]
+        return True
+
+    def literal_stats(self, model: Model) -> Dict:
+        """
+        Compute the stats about each literal's occurences in the clauses which aren't true yet.
+        Note: this walks every clause on each call (see CountingSimplify, which maintains them incrementally).
+        """
+        literal_stats: Dict = {}
+        for clause in self.clauses:
+            remaining = []
+            for t in clause:
+                val = model.get(abs(t))
+                if val is None:
+                    remaining.append(t)
+                elif val == (t > 0):
+                    break  # clause is true
+            else:
+                for t in remaining:
+                    if abs(t) not in literal_stats:
+                        literal_stats[abs(t)] = {
+                            "clause_lengths": [],
+                            "cp": 0,  # num occurences as positive literal
+                            "cn": 0,  # num occurences as negative literal
+                        }
+                    literal_stats[abs(t)]["cp" if t > 0 else "cn"] += 1
+                    literal_stats[abs(t)]["clause_lengths"].append(len(remaining))
+        return literal_stats
+
+
+class CountingSimplify(WatchedSimplify):
+    """
+    Like WatchedSimplify, except the literal_stats are maintained incrementally rather than rebuilt on every call.
+
+    For each variable we track the number of positive/negative occurences ("cp"/"cn") in the clauses which
+    aren't true yet, and the number of those clauses of each (remaining) length ("clause_lengths" maps length -> count).
+    When a variable is assigned only the clauses it occurs in are visited, and the changes are reverted on backtrack.
+    Note: the returned literal_stats is updated in place by later calls.
+    """
+
+    def attach(self, trail: Trail):
+        super().attach(trail)
+        trail.listeners.append(self._uncount_until)
+        # map each literal to the list of indices of the clauses it occurs in
+        self.occurs: Dict[int, List[int]] = {}
+        # number of true literals in each clause
+        self.num_true = [0] * len(self.clauses)
+        # number of literals in each clause whose variable hasn't been counted as assigned
+        self.num_left = [len(clause) for clause in self.clauses]
+        # number of variables in trail.assigned that have been counted
+        self.counted = 0
+        self.counted_vars = set()
+        # stats of each variable (even those with no occurences left)
+        self.var_stats: Dict[int, Dict] = {}
+        # stats of the variables with occurences left
+        self.stats: Dict[int, Dict] = {}
+
+        for ci, clause in enumerate(self.clauses):
+            for t in clause:
+                self.occurs.setdefault(t, []).append(ci)
+                if abs(t) not in self.var_stats:
+                    self.var_stats[abs(t)] = {
+                        "clause_lengths": {},
+                        "cp": 0,  # num occurences as positive literal
+                        "cn": 0,  # num occurences as negative literal
+                    }
+                self._add(t, len(clause))
+
+    def literal_stats(self, model: Model) -> Dict:
+        assigned = self.trail.assigned
+        while self.counted < self.qhead:
+            self._count(assigned[self.counted])
+            self.counted += 1
+        return self.stats
+
+    def _add(self, t: int, length: int):
+        """Count an occurence of literal t in a (not yet true) clause of the given length."""
+        var_stats = self.var_stats[abs(t)]
+        if var_stats["cp"] + var_stats["cn"] == 0:
+            self.stats[abs(t)] = var_stats
+        var_stats["cp" if t > 0 else "cn"] += 1
+        lengths = var_stats["clause_lengths"]
+        lengths[length] = lengths.get(length, 0) + 1
+
+    def _remove(self, t: int, length: int):
+        """Inverse of _add()."""
+        var_stats = self.var_stats[abs(t)]
+        var_stats["cp" if t > 0 else "cn"] -= 1
+        lengths = var_stats["clause_lengths"]
+        lengths[length] -= 1
+        if lengths[length] == 0:
+            del lengths[length]
+        if var_stats["cp"] + var_stats["cn"] == 0:
+            del self.stats[abs(t)]
+
+    def _shrink(self, clause: List[int], false_lit: int, length: int):
+        """Move the other uncounted literals of a clause from the given length to length - 1."""
+        for t in clause:
+            if t != false_lit and abs(t) not in self.counted_vars:
+                lengths = self.var_stats[abs(t)]["clause_lengths"]
+                lengths[length] -= 1
+                if lengths[length] == 0:
+                    del lengths[length]
+                lengths[length - 1] = lengths.get(length - 1, 0) + 1
+
+    def _grow(self, clause: List[int], false_lit: int, length: int):
+        """Inverse of _shrink()."""
+        for t in clause:
+            if t != false_lit and abs(t) not in self.counted_vars:
+                lengths = self.var_stats[abs(t)]["clause_lengths"]
+                lengths[length - 1] -= 1
+                if lengths[length - 1] == 0:
+                    del lengths[length - 1]
+                lengths[length] = lengths.get(length, 0) + 1
+
+    def _count(self, var: int):
+        """Update the stats for the clauses containing a (newly assigned) variable."""
+        true_lit = var if self.trail.model[var] else -var
+        false_lit = -true_lit
+        clauses = self.clauses
+
+        for ci in self.occurs.get(true_lit, []):
+            if self.num_true[ci] == 0:
+                # clause is now true, so none of its literals count anymore
+                for t in clauses[ci]:
+                    if abs(t) not in self.counted_vars:
+                        self._remove(t, self.num_left[ci])
+            self.num_true[ci] += 1
+            self.num_left[ci] -= 1
+
+        for ci in self.occurs.get(false_lit, []):
+            if self.num_true[ci] == 0:
+                self._remove(false_lit, self.num_left[ci])
+                self._shrink(clauses[ci], false_lit, self.num_left[ci])
+            self.num_left[ci] -= 1
+
+        self.counted_vars.add(var)
+
+    def _uncount(self, var: int):
+        """Inverse of _count() (for a variable being unassigned)."""
+        self.counted_vars.discard(var)
+        true_lit = var if self.trail.model[var] else -var
+        false_lit = -true_lit
+        clauses = self.clauses
+
+        for ci in self.occurs.get(false_lit, []):
+            self.num_left[ci] += 1
+            if self.num_true[ci] == 0:
+                self._grow(clauses[ci], false_lit, self.num_left[ci])
+                self._add(false_lit, self.num_left[ci])
+
+        for ci in self.occurs.get(true_lit, []):
+            self.num_left[ci] += 1
+            self.num_true[ci] -= 1
+            if self.num_true[ci] == 0:
+                for t in clauses[ci]:
+                    if abs(t) not in self.counted_vars:
+                        self._add(t, self.num_left[ci])
+
+    def _uncount_until(self, num_assigned: int):
+        assigned = self.trail.assigned
+        while self.counted > num_assigned:
+            self.counted -= 1
+            self._uncount(assigned[self.counted])
@@ -0,0 +1,50 @@
+import os
+from satsolver import Model, dimacs, verify_model, model_to_system, cdcl, puzzle
+from satsolver.assignment import Assignment, UNASSIGNED, TRUE, FALSE
+from tests.conftest import ROOT_DIR, RULES_9X9
+
+
+def test_assignment():
+    assigns = Assignment(3)
+    assigns.assign(-2)
+    assigns.new_level()
+    assigns.assign(3)
+    assert assigns.vals[-2] == TRUE and assigns.vals[2] == FALSE
+    assert assigns.vals[1] == UNASSIGNED and assigns.vals[-1] == UNASSIGNED
+    assert assigns.value(3) and not assigns.value(-3) and assigns.value(1) is None
+    assert list(assigns.level[2:]) == [0, 1]
+
+    # growing keeps the current assignment
+    assigns.grow(10)
+    assert len(assigns.vals) == 21 and len(assigns.level) == 11
+    assert assigns.vals[-2] == TRUE and assigns.vals[3] == TRUE
+    assigns.assign(-10)
+    assert assigns.vals[10] == FALSE and assigns.vals[-3] == FALSE
+
+    assert assigns.cancel_until(0) == [3, -10]
+    assert assigns.trail == [-2] and assigns.decision_level == 0
+    assert assigns.value(3) is None and assigns.value(10) is None
+
+
+def test_assignment__mapping():
+    assigns = Assignment()
+    assigns[5] = True
+    assigns[2] = False
+    assert dict(assigns) == {5: True, 2: False}
+    assert 2 in assigns and 3 not in assigns and 100 not in assigns
+    assigns[2] = True
+    del assigns[5]
+    assert dict(assigns) == {2: True} and assigns.trail == [2]
+
+    # can be used wherever a Model is expected
+    fname = os.path.join(ROOT_DIR, f"example_sudokus/sudoku1.cnf")
+    system = dimacs.parse_file(fname) + dimacs.parse_file(RULES_9X9)
+    model: Model = {}
+    assert cdcl.solver(system, model)[0]
+    assigns = Assignment()
+    for var, val in model.items():
+        assigns[var] = val
+    assert verify_model(system, assigns)[0]
+    assert model_to_system(assigns) == model_to_system(model)
+    board = puzzle.visualize_sudoku_model(assigns, board_size=9)
+    assert board == puzzle.visualize_sudoku_model(model, board_size=9)
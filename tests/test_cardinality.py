@@ -0,0 +1,84 @@
+import copy
+import itertools
+import os
+import random
+from satsolver import Conjunction, Model, dimacs, verify_model, puzzle
+from satsolver import cdcl, renumber
+from satsolver.cardinality import CardinalityDB
+from tests.conftest import ROOT_DIR, RULES_9X9
+from tests.test_cdcl import brute_force, random_system, pigeonhole
+
+
+def test_cardinality_db__sudoku_rules():
+    rules = dimacs.parse_file(RULES_9X9)
+    db = dimacs.parse_file(RULES_9X9, cardinality=True)
+    assert isinstance(db, CardinalityDB)
+    # every clause is part of an exactly-one constraint (each cell has one value, each row has each value etc)
+    assert len(db.clauses) == 0
+    assert len(db.amos) == 4 * 81 and all(db.exactly)
+    assert db.num_clauses() == len(rules)
+    # iterating yields the original clauses
+    assert set(frozenset(c) for c in db) == set(frozenset(c) for c in rules)
+    assert db.nbytes() < 20000
+
+
+def test_cardinality_db__detection():
+    system: Conjunction = [
+        set([-1, -2]),
+        set([-1, -3]),
+        set([-2, -3]),
+        set([-3, -4]),  # (not part of a clique of size 3)
+        set([1, 4, 5]),
+    ]
+    db = CardinalityDB.from_system(system)
+    assert [list(lits) for lits in db.amos] == [[1, 2, 3]]
+    assert list(db.exactly) == [0]
+    assert set(frozenset(c) for c in db.clauses) == set(
+        [frozenset([-3, -4]), frozenset([1, 4, 5])]
+    )
+
+    db = CardinalityDB.from_system(pigeonhole(5, 4))
+    assert len(db.amos) == 4 and len(db.clauses) == 5
+
+
+def test_cdcl__cardinality_random_systems():
+    rng = random.Random(0)
+    for _ in range(300):
+        system = random_system(rng)
+        num_vars = max(abs(t) for clause in system for t in clause)
+        # add some at-most-one constraints (encoded pairwise)
+        for _ in range(rng.randint(1, 3)):
+            lits = [
+                rng.choice([-1, 1]) * v
+                for v in rng.sample(range(1, num_vars + 1), min(num_vars, 4))
+            ]
+            for a, b in itertools.combinations(lits, 2):
+                system.append(set([-a, -b]))
+
+        db = CardinalityDB.from_system(system)
+        model: Model = {}
+        res, _ = cdcl.solver(db, model)
+        assert res == brute_force(system), system
+        if res:
+            valid, reason = verify_model(system, model)
+            assert valid, reason
+
+
+def test_cdcl__cardinality_sudoku():
+    rules = dimacs.parse_file(RULES_9X9, cardinality=True)
+    fname = os.path.join(ROOT_DIR, "datasets/top95.sdk.txt")
+    with open(fname, "r") as f:
+        lines = [line.strip() for line in f.readlines()][:5]
+    for line in lines:
+        system = copy.deepcopy(rules)
+        system += puzzle.encode_puzzle(line)
+        model: Model = {}
+        res, _ = renumber.dense_solver(cdcl.solver)(system, model)
+        assert res
+        valid, reason = verify_model(
+            puzzle.encode_puzzle(line) + rules.to_system(), model
+        )
+        assert valid, reason
+
+    res, _ = cdcl.solver(CardinalityDB.from_system(pigeonhole(5, 4)), {})
+    assert not res
@@ -0,0 +1,75 @@
+import copy
+import itertools
+import os
+import random
+from satsolver import Conjunction, Model, dimacs, verify_model, cdcl
+from tests.conftest import ROOT_DIR, RULES_4X4, RULES_9X9
+from tests.test_dpll import sudoku_tester
+
+
+def brute_force(system: Conjunction) -> bool:
+    """Check if a (small) system is satisfiable by trying every possible model."""
+    vars = sorted(set(abs(t) for clause in system for t in clause))
+    for values in itertools.product([False, True], repeat=len(vars)):
+        model = dict(zip(vars, values))
+        if all(any(model[abs(t)] == (t > 0) for t in clause) for clause in system):
+            return True
+    return False
+
+
+def random_system(rng: random.Random) -> Conjunction:
+    """Generate a small random system (with every variable appearing at least once)."""
+    num_vars = rng.randint(2, 9)
+    system: Conjunction = [set(range(1, num_vars + 1))]
+    for _ in range(rng.randint(1, 45)):
+        size = rng.randint(1, 4)
+        system.append(
+            set(rng.choice([-1, 1]) * rng.randint(1, num_vars) for _ in range(size))
+        )
+    return system
+
+
+def pigeonhole(pigeons: int, holes: int) -> Conjunction:
+    """
+    Encode the (inconsistent when pigeons > holes) pigeonhole problem,
+    where variable 10*p + h means pigeon p is in hole h.
+    """
+    system: Conjunction = []
+    for p in range(1, pigeons + 1):
+        system.append(set(10 * p + h for h in range(1, holes + 1)))
+    for h in range(1, holes + 1):
+        for p1, p2 in itertools.combinations(range(1, pigeons + 1), 2):
+            system.append(set([-(10 * p1 + h), -(10 * p2 + h)]))
+    return system
+
+
+def test_cdcl__random_systems():
+    """Compare the cdcl solver against brute force on small random systems."""
+    rng = random.Random(0)
+    for _ in range(300):
+        system = random_system(rng)
+        model: Model = {}
+        res, stats = cdcl.solver(copy.deepcopy(system), model)
+        assert res == brute_force(system), system
+        if res:
+            valid, reason = verify_model(system, model)
+            assert valid, reason
+
+
+def test_cdcl__learns_and_backjumps():
+    system = pigeonhole(3, 2)
+    res, stats = cdcl.solver(system, {})
+    assert not res
+    assert stats["conflicts"] > 0 and stats["learned_clauses"] > 0
+    assert stats["backtracks"] == stats["conflicts"]
+
+    res, stats = cdcl.solver([set([111]), set([-111])], {})
+    assert not res
+
+
+def test_sudoku_examples():
+    fname = os.path.join(ROOT_DIR, f"datasets/4x4.txt")
+    sudoku_tester(RULES_4X4, fname, 4, solver=cdcl.solver)
+
+    fname = os.path.join(ROOT_DIR, f"datasets/damnhard.sdk.txt")
+    sudoku_tester(RULES_9X9, fname, 9, solver=cdcl.solver)
@@ -0,0 +1,50 @@
+import copy
+import random
+from satsolver import Conjunction, Model, dimacs, verify_model, cdcl
+from satsolver.clausedb import ClauseDB
+from tests.conftest import RULES_9X9
+from tests.test_cdcl import brute_force, random_system
+
+
+def test_clausedb():
+    system: Conjunction = [
+        set([111, 112, 113]),
+        set([-111, -112]),
+        set([114]),
+    ]
+    db = ClauseDB.from_system(system)
+    assert len(db) == 3
+    assert set(db[1]) == set([-111, -112]) and list(db[-1]) == [114]
+    assert db.bounds(1) == (3, 5)
+    assert db.to_system() == system
+    occurs = {t: list(cis) for t, cis in db.occurrences().items()}
+    assert occurs == {111: [0], 112: [0], 113: [0], -111: [1], -112: [1], 114: [2]}
+
+    # duplicate literals are dropped
+    assert db.append([115, -116, 115]) == 3
+    assert list(db[3]) == [115, -116]
+
+    # a ClauseDB can be read like a Conjunction
+    assert verify_model(
+        db, {111: True, 112: False, 113: True, 114: True, 115: True, 116: True}
+    )[0]
+    assert dimacs.to_dimacs(db) == dimacs.to_dimacs(db.to_system())
+
+
+def test_clausedb__parse_compact():
+    system = dimacs.parse_file(RULES_9X9)
+    db = dimacs.parse_file(RULES_9X9, compact=True)
+    assert db.to_system() == system
+    # (a set alone takes 200+ bytes)
+    assert db.nbytes() < 20 * len(db)
+
+
+def test_cdcl__clausedb():
+    rng = random.Random(0)
+    for _ in range(100):
+        system = random_system(rng)
+        model: Model = {}
+        res, stats = cdcl.solver(ClauseDB(system), model)
+        assert res == brute_force(system), system
+        if res:
+            assert verify_model(system, model)[0]
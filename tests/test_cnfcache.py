@@ -0,0 +1,49 @@
+import copy
+import os
+import shutil
+from satsolver import dimacs, cnfcache
+from satsolver.cardinality import CardinalityDB
+from tests.conftest import RULES_9X9
+
+
+def test_cache(tmp_path):
+    fname = str(tmp_path / "rules.cnf")
+    shutil.copy(RULES_9X9, fname)
+    system = dimacs.parse_file(fname)
+    assert cnfcache.load(fname) is None
+
+    # the cache is written when the file is first parsed, then loaded instead of parsing it
+    assert dimacs.parse_file(fname, cache=True) == system
+    assert os.path.exists(cnfcache.cache_path(fname))
+    db = cnfcache.load(fname)
+    assert db is not None and db.to_system() == system
+    assert dimacs.parse_file(fname, cache=True) == system
+
+    # (the cached buffers are read only, so they're copied when a clause is appended, or the db is copied)
+    assert copy.deepcopy(db).to_system() == system
+    assert db.append([1, 2]) == len(system)
+    assert list(db[-1]) == [1, 2] and db.to_system()[:-1] == system
+
+    # the cache is still used if the file is touched but unchanged
+    os.utime(fname, ns=(0, 0))
+    assert cnfcache.load(fname) is not None
+
+    # but not once it's changed
+    with open(fname, "a") as f:
+        f.write("1 2 3 0\n")
+    assert cnfcache.load(fname) is None
+    assert dimacs.parse_file(fname, cache=True) == system + [set([1, 2, 3])]
+
+
+def test_cache__cardinality(tmp_path):
+    fname = str(tmp_path / "rules.cnf")
+    shutil.copy(RULES_9X9, fname)
+    expected = dimacs.parse_file(fname, cardinality=True)
+    dimacs.parse_file(fname, cardinality=True, cache=True)
+    db = dimacs.parse_file(fname, cardinality=True, cache=True)
+    assert isinstance(db, CardinalityDB)
+    assert [list(c) for c in db.amos] == [list(c) for c in expected.amos]
+    assert db.exactly == expected.exactly
+    assert list(map(set, db)) == list(map(set, expected))
+    # (the cache of the plain clauses is separate)
+    assert cnfcache.load(fname) is None
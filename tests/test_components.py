@@ -0,0 +1,67 @@
+import copy
+import os
+import pytest
+import random
+from satsolver import Model, dimacs, puzzle, verify_model
+from satsolver import cdcl, components, dpll
+from tests.conftest import ROOT_DIR, RULES_9X9
+from tests.test_cdcl import brute_force, random_system
+
+
+def test_components():
+    system = [{1, -2}, {3, 4}, {2, 5}, {-4}, {6}]
+    comps = components.components(system)
+    assert comps == [[{1, -2}, {2, 5}], [{3, 4}, {-4}], [{6}]]
+
+
+def test_decomposed_solver__random_systems():
+    rng = random.Random(0)
+    for i in range(100):
+        # (two independent systems, the second renumbered to different variables)
+        a, b = random_system(rng), random_system(rng)
+        system = a + [set(t + 100 if t > 0 else t - 100 for t in c) for c in b]
+        # (only the first few are also solved in parallel, as forking is slow)
+        for cpus in [1, 2] if i < 10 else [1]:
+            model: Model = {}
+            solve = components.decomposed_solver(cdcl.solver, cpus=cpus, min_split=5)
+            res, stats = solve(copy.deepcopy(system), model)
+            assert res == (brute_force(a) and brute_force(b)), system
+            if res:
+                valid, reason = verify_model(system, model)
+                assert valid, reason
+
+
+def test_decomposed_solver__inconsistent_component():
+    system = [{1, 2}, {-1, 2}, {1, -2}, {-1, -2}] + [{3, 4, 5}, {-3, 6}]
+    res, stats = components.decomposed_solver(dpll.solver)(system, {})
+    assert not res
+
+
+def test_decomposed_solver__sudoku():
+    rules = dimacs.parse_file(RULES_9X9)
+    fname = os.path.join(ROOT_DIR, "datasets/top95.sdk.txt")
+    with open(fname, "r") as f:
+        lines = [f.readline().strip() for _ in range(3)]
+    solve = components.decomposed_solver(dpll.solver)
+    for line in lines:
+        system = puzzle.encode_puzzle(line) + rules
+        model: Model = {}
+        res, stats = solve(copy.deepcopy(system), model)
+        assert res
+        valid, reason = verify_model(system, model)
+        assert valid, reason
+        assert stats["components"] >= 1
+
+
+def _dying_solver(system, model):
+    """A solver whose process dies on the component with variable 100."""
+    if any(abs(t) == 100 for clause in system for t in clause):
+        os._exit(1)
+    return dpll.solver(system, model)
+
+
+def test_decomposed_solver__worker_dies():
+    system = [{1, 2}, {-1, 3}, {100, 101}, {200, 201}, {-200, 202}]
+    solve = components.decomposed_solver(_dying_solver, cpus=2)
+    with pytest.raises(RuntimeError):
+        solve(system, {})
@@ -0,0 +1,76 @@
+import copy
+import os
+import pytest
+import random
+from multiprocessing import Value
+from satsolver import Model, dimacs, verify_model, puzzle
+from satsolver import cube, incremental
+from tests.conftest import ROOT_DIR, RULES_9X9
+from tests.test_cdcl import brute_force, random_system, pigeonhole
+
+
+def test_make_cubes():
+    """The cubes should cover every model of the system."""
+    rng = random.Random(0)
+    for _ in range(100):
+        system = random_system(rng)
+        cubes, model = cube.make_cubes(system, depth=2)
+        assert len(cubes) <= 4
+        if model is not None:
+            valid, reason = verify_model(system, model)
+            assert valid, reason
+            continue
+        assert any(
+            brute_force(system + [set([t]) for t in c]) for c in cubes
+        ) == brute_force(system)
+
+
+def test_cube_and_conquer():
+    rng = random.Random(1)
+    for _ in range(20):
+        system = random_system(rng)
+        model: Model = {}
+        res, _ = cube.solver(copy.deepcopy(system), model, cpus=2, depth=2)
+        assert res == brute_force(system), system
+        if res:
+            valid, reason = verify_model(system, model)
+            assert valid, reason
+
+    res, stats = cube.solver(pigeonhole(6, 5), {}, cpus=2)
+    assert not res
+    assert stats["cubes"] > 1 and stats["cubes_refuted"] == stats["cubes"]
+
+
+def test_cube_and_conquer__sudoku():
+    rules = dimacs.parse_file(RULES_9X9)
+    fname = os.path.join(ROOT_DIR, "datasets/top95.sdk.txt")
+    with open(fname, "r") as f:
+        line = f.readline().strip()
+    system = puzzle.encode_puzzle(line) + rules
+    model: Model = {}
+    res, _ = cube.solver(system, model, cpus=2)
+    assert res
+    valid, reason = verify_model(system, model)
+    assert valid, reason
+
+
+def test_cube_and_conquer__worker_dies(monkeypatch):
+    """If a worker dies holding a cube, the solver raises (rather than waiting forever for that cube)."""
+    died = Value("i", 0)
+    assumption_solver = incremental.assumption_solver
+
+    def dying_assumption_solver(s):
+        solve = assumption_solver(s)
+
+        def dying_solve(system, model):
+            with died.get_lock():
+                if not died.value:
+                    died.value = 1
+                    os._exit(1)  # (only the first worker to solve a cube dies)
+            return solve(system, model)
+
+        return dying_solve
+
+    monkeypatch.setattr(incremental, "assumption_solver", dying_assumption_solver)
+    with pytest.raises(RuntimeError):
+        cube.solver(pigeonhole(6, 5), {}, cpus=2, depth=3)
@@ -1,5 +1,12 @@
-from satsolver import Conjunction
+import bz2
+import gzip
+import io
+import lzma
+import pytest
+from satsolver import Conjunction, model_to_system
 from satsolver import dimacs
+from satsolver.assignment import Assignment
+from tests.conftest import RULES_9X9
 
 
 def test_simple_parse():
@@ -38,3 +45,113 @@ def test_bidirectional_encoding():
     system = dimacs.parse_string(content)
     res = dimacs.to_dimacs(system)
     assert content == res
+
+
+def test_parse_stream(monkeypatch):
+    """Test parsing clauses which span lines (and chunks), with comments and an inaccurate header."""
+    contents = "c a comment 1 0\np cnf 5 2\n1 -2\n 3 0 -4 0\nc 5 0\n5\n0 2 2 -1 0\n"
+    expected = [set([1, -2, 3]), set([-4]), set([5]), set([2, -1])]
+    for chunk_size in [1, 2, 3, 5, 1 << 20]:
+        monkeypatch.setattr(dimacs, "CHUNK_SIZE", chunk_size)
+        assert dimacs.parse_string(contents) == expected
+        db = dimacs.parse_string(contents, compact=True)
+        assert [list(c) for c in db] == [[1, -2, 3], [-4], [5], [2, -1]]
+
+    with pytest.raises(ValueError):
+        dimacs.parse_string("1 2 0\n3 4\n")
+    with pytest.raises(ValueError):
+        dimacs.parse_string("1 x 0\n")
+
+
+def test_parse_stream__overstated_header():
+    """The header is only a hint, so an overstated number of clauses isn't preallocated."""
+    for compact in [False, True]:
+        system = dimacs.parse_string("p cnf 3 50000000\n1 -2 0\n", compact=compact)
+        assert [set(c) for c in system] == [set([1, -2])]
+        if compact:
+            assert len(system.offsets) == 2
+
+
+def test_parse_stream__problem_lines():
+    """Headers may end with \\r\\n, and problem lines other than "p cnf" are ignored."""
+    for compact in [False, True]:
+        system = dimacs.parse_string("p cnf 2 1\r\n1 -2 0\r\n", compact=compact)
+        assert [set(c) for c in system] == [set([1, -2])]
+        system = dimacs.parse_string("p inccnf\n1 -2 0\n", compact=compact)
+        assert [set(c) for c in system] == [set([1, -2])]
+    with pytest.raises(ValueError):
+        dimacs.parse_string("p cnf x\n1 0\n")
+
+
+def test_parse_file__compact():
+    """Test the parsed ClauseDB matches the parsed Conjunction."""
+    system = dimacs.parse_file(RULES_9X9)
+    db = dimacs.parse_file(RULES_9X9, compact=True)
+    assert len(db) == len(system) and db.offsets[-1] == len(db.lits)
+    assert db.to_system() == system
+
+
+def test_parse_file__compressed(tmp_path):
+    """Test parsing files compressed with gzip, bzip2 and xz (detected from their contents)."""
+    with open(RULES_9X9, "rb") as f:
+        contents = f.read()
+    expected = dimacs.parse_file(RULES_9X9)
+    for module in [gzip, bz2, lzma]:
+        fname = str(tmp_path / f"rules.{module.__name__}")  # (not the usual extension)
+        with module.open(fname, "wb") as f:
+            f.write(contents)
+        assert dimacs.parse_file(fname) == expected
+
+
+def test_write_model():
+    """Test writing a model (or an Assignment) matches writing it as a system of unit clauses."""
+    model = {3: True, 1: False, 2: True}
+    expected = dimacs.to_dimacs(model_to_system(model))
+    f = io.StringIO()
+    dimacs.write_model(model, f)
+    assert f.getvalue() == expected == "p cnf 3 3\n-1 0\n2 0\n3 0\n"
+
+    a = Assignment(4)
+    for t in [3, -1, 2]:
+        a.assign(t)
+    f = io.StringIO()
+    dimacs.write_model(a, f)
+    assert f.getvalue() == expected
+
+
+def test_write_dimacs(monkeypatch):
+    monkeypatch.setattr(dimacs, "WRITE_BATCH", 2)
+    system = dimacs.parse_file(RULES_9X9)
+    f = io.StringIO()
+    dimacs.write_dimacs(system, f, num_vars=999)
+    assert f.getvalue().startswith(f"p cnf 999 {len(system)}\n")
+    assert dimacs.parse_string(f.getvalue()) == system
+
+    # (a CardinalityDB is written as the equivalent CNF system)
+    db = dimacs.parse_file(RULES_9X9, cardinality=True)
+    res = dimacs.parse_string(dimacs.to_dimacs(db))
+    assert len(res) == len(system)
+    assert set(map(frozenset, res)) == set(map(frozenset, system))
+
+
+def test_parse_icnf(monkeypatch):
+    """Test parsing clauses interleaved with queries, in the order they're read."""
+    contents = "p inccnf\nc comment\n1 2 0\n-1\n 3 0\na 1 0\na -2 -3 0\n4 0\na 0\n"
+    blocks = [
+        b if isinstance(b, list) else [list(c) for c in b]
+        for b in dimacs.parse_icnf(io.StringIO(contents))
+    ]
+    assert blocks == [[[1, 2], [-1, 3]], [1], [-2, -3], [[4]], []]
+
+    # (long runs of clauses are parsed a batch at a time)
+    monkeypatch.setattr(dimacs, "CHUNK_SIZE", 8)
+    f = io.StringIO()
+    dimacs.write_icnf(dimacs.parse_file(RULES_9X9), [[111], [-111, 112]], f)
+    f.seek(0)
+    blocks = list(dimacs.parse_icnf(f))
+    assert blocks[-2:] == [[111], [-111, 112]]
+    system = [set(c) for b in blocks[:-2] for c in b]
+    assert system == dimacs.parse_file(RULES_9X9)
+
+    with pytest.raises(ValueError):
+        list(dimacs.parse_icnf(io.StringIO("1 2 0\na 1\n")))
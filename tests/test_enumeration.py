@@ -0,0 +1,52 @@
+import itertools
+import os
+import random
+from satsolver import Conjunction, dimacs, verify_model, puzzle
+from satsolver import enumeration
+from tests.conftest import ROOT_DIR, RULES_9X9
+from tests.test_cdcl import random_system
+
+
+def brute_force_count(system: Conjunction, vars=None) -> int:
+    """Count the models of a (small) system by trying every possible model (projected onto vars if given)."""
+    all_vars = sorted(set(abs(t) for clause in system for t in clause))
+    found = set()
+    for values in itertools.product([False, True], repeat=len(all_vars)):
+        model = dict(zip(all_vars, values))
+        if all(any(model[abs(t)] == (t > 0) for t in clause) for clause in system):
+            found.add(tuple(model[v] for v in (vars or all_vars)))
+    return len(found)
+
+
+def test_solve_all__random_systems():
+    rng = random.Random(0)
+    for _ in range(100):
+        system = random_system(rng)
+        models = list(enumeration.solve_all(system))
+        assert len(models) == brute_force_count(system), system
+        assert len(set(tuple(sorted(m.items())) for m in models)) == len(models)
+        for model in models:
+            valid, reason = verify_model(system, model)
+            assert valid, reason
+
+        vars = [1, 2]
+        assert enumeration.count_models(system, vars=vars) == brute_force_count(
+            system, vars
+        )
+        assert enumeration.count_models(system, limit=2) == min(
+            2, brute_force_count(system)
+        )
+
+
+def test_is_unique__sudoku():
+    rules = dimacs.parse_file(RULES_9X9)
+    fname = os.path.join(ROOT_DIR, "datasets/top95.sdk.txt")
+    with open(fname, "r") as f:
+        line = f.readline().strip()
+    assert enumeration.is_unique(puzzle.encode_puzzle(line) + rules)
+
+    # removing a clue gives more solutions
+    line = line.replace("4", ".", 1)
+    assert not enumeration.is_unique(puzzle.encode_puzzle(line) + rules)
+    models = list(enumeration.solve_all(puzzle.encode_puzzle(line) + rules, limit=5))
+    assert len(models) == 5
@@ -0,0 +1,79 @@
+import copy
+import random
+import sys
+from satsolver import Conjunction, Model, verify_model, cdcl, implication
+from tests.test_cdcl import brute_force, random_system
+
+
+def test_equivalences():
+    # 1 -> 2 -> 3 -> 1 (so 1, 2 and 3 are all equivalent)
+    system: Conjunction = [
+        set([-1, 2]),
+        set([-2, 3]),
+        set([-3, 1]),
+        set([3, 4, 5]),
+    ]
+    graph = implication.build_graph(system)
+    assert graph[1] == set([2]) and graph[-2] == set([-1])
+    assert implication.equivalences(graph) == {2: 1, 3: 1, -2: -1, -3: -1}
+
+    reduced, substitution = implication.reduce(system)
+    assert substitution == {2: 1, 3: 1}
+    assert reduced == [set([1, 4, 5])]
+    model: Model = {1: True, 4: False, 5: False}
+    implication.extend_model(model, substitution)
+    assert model == {1: True, 2: True, 3: True, 4: False, 5: False}
+
+    # 1 is equivalent to -1
+    system = [set([-1, 2]), set([-2, -1]), set([1, 3]), set([-3, 1])]
+    assert implication.reduce(system)[0] is None
+
+
+def test_failed_literals_and_transitive_reduction():
+    # 1 implies both 2 and -2
+    system: Conjunction = [set([-1, 2]), set([-1, 3]), set([-3, -2])]
+    assert implication.failed_literals(implication.build_graph(system)) == [1]
+    reduced, _ = implication.reduce(system)
+    assert set([-1]) in reduced
+
+    # 1 -> 2 -> 3 makes the clause for 1 -> 3 redundant
+    system = [set([-1, 2]), set([-2, 3]), set([-1, 3])]
+    graph = implication.build_graph(system)
+    assert implication.transitive_reduction(graph) == [(-1, 3)]
+    assert 3 not in graph[1] and -1 not in graph[-3]
+
+    # the search stops once max_steps is used up (here after the first literal)
+    system += [set([-4, 5]), set([-5, 6]), set([-4, 6])]
+    assert implication.transitive_reduction(implication.build_graph(system)) == [
+        (-1, 3),
+        (-4, 6),
+    ]
+    graph = implication.build_graph(system)
+    assert implication.transitive_reduction(graph, max_steps=0) == [(-1, 3)]
+
+
+def test_reduce__random_systems():
+    rng = random.Random(0)
+    for _ in range(300):
+        system = random_system(rng)
+        reduced, substitution = implication.reduce(copy.deepcopy(system))
+        if reduced is None:
+            assert not brute_force(system)
+            continue
+        model: Model = {}
+        res, _ = cdcl.solver(reduced, model)
+        assert res == brute_force(system), system
+        if res:
+            implication.extend_model(model, substitution)
+            for var in set(abs(t) for clause in system for t in clause):
+                model.setdefault(var, False)  # (variables removed from the system)
+            valid, reason = verify_model(system, model)
+            assert valid, reason
+
+
+def test_scc__long_cycle():
+    """Finding the components shouldn't be limited by the recursion limit."""
+    n = sys.getrecursionlimit() + 200
+    system = [set([-i, i + 1]) for i in range(1, n)] + [set([-n, 1])]
+    equiv = implication.equivalences(implication.build_graph(system))
+    assert len(equiv) == 2 * (n - 1) and all(abs(rep) == 1 for rep in equiv.values())
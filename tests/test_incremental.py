@@ -0,0 +1,121 @@
+import os
+import random
+from satsolver import Conjunction, Model, dimacs, verify_model, puzzle
+from satsolver import incremental
+from satsolver.clausedb import ClauseDB
+from tests.conftest import ROOT_DIR, RULES_9X9
+from tests.test_cdcl import brute_force, random_system
+
+
+def test_incremental__assumptions():
+    """Solving under assumptions should match solving the system with the assumptions as unit clauses."""
+    rng = random.Random(0)
+    for _ in range(50):
+        system = random_system(rng)
+        vars = sorted(set(abs(t) for clause in system for t in clause))
+        s = incremental.Solver(system)
+        for _ in range(10):
+            assumptions = [
+                rng.choice([-1, 1]) * v
+                for v in rng.sample(vars, rng.randint(0, len(vars)))
+            ]
+            units: Conjunction = [set([t]) for t in assumptions]
+            res = s.solve(assumptions)
+            assert res == brute_force(system + units), (system, assumptions)
+            if res:
+                valid, reason = verify_model(system + units, s.model())
+                assert valid, reason
+    # (assumptions on variables outside the system)
+    s = incremental.Solver([set([1, 2])])
+    assert s.solve([-1, 5])
+    assert s.model() == {1: False, 2: True, 5: True}
+    assert not s.solve([-1, -2])
+    assert not s.solve([5, -5])
+    assert s.solve()
+
+
+def test_incremental__sudoku():
+    rules = dimacs.parse_file(RULES_9X9)
+    fname = os.path.join(ROOT_DIR, "datasets/top95.sdk.txt")
+    with open(fname, "r") as f:
+        lines = [line.strip() for line in f.readlines()][:10]
+    solver = incremental.assumption_solver(incremental.Solver(rules))
+    for line in lines:
+        clues = puzzle.encode_puzzle(line)
+        model: Model = {}
+        res, stats = solver(clues, model)
+        assert res
+        valid, reason = verify_model(clues + rules, model)
+        assert valid, reason
+        assert stats["backtracks"] >= 0
+
+    # the same clues twice (contradictory)
+    clues = puzzle.encode_puzzle(lines[0])
+    t = next(iter(clues[0]))
+    assert not solver(clues + [set([t + 1])], {})[0]
+
+
+def test_solve_queries():
+    """Queries are answered against the clauses read before them (including clauses added after a query)."""
+    blocks = [
+        ClauseDB([[1, 2], [-1, 2]]),
+        [-2],
+        [1],
+        ClauseDB([[-1, 3]]),  # (a new variable)
+        [1],
+        [1, -3],
+        ClauseDB([[-2, -1]]),
+        [1],
+        [],
+    ]
+    answers = list(incremental.solve_queries(blocks))
+    assert [assumptions for assumptions, _ in answers] == [
+        b for b in blocks if isinstance(b, list)
+    ]
+    models = [model for _, model in answers]
+    assert [model is None for model in models] == [
+        True,
+        False,
+        False,
+        True,
+        True,
+        False,
+    ]
+    assert models[1][1] and models[1][2]
+    assert models[2][3]
+    assert models[5] == {1: False, 2: True, 3: models[5][3]}
+
+
+def test_cached_solver__sudoku(monkeypatch):
+    """The rules are only loaded once, and the clues of each puzzle are solved as assumptions."""
+    built = []
+    Solver = incremental.Solver
+    monkeypatch.setattr(
+        incremental,
+        "Solver",
+        lambda *args, **kwargs: built.append(1) or Solver(*args, **kwargs),
+    )
+    rules = dimacs.parse_file(RULES_9X9)
+    fname = os.path.join(ROOT_DIR, "datasets/top95.sdk.txt")
+    with open(fname, "r") as f:
+        lines = [line.strip() for line in f.readlines()][:5]
+    solver = incremental.cached_solver()
+    for line in lines:
+        system = puzzle.encode_puzzle(line) + rules
+        model: Model = {}
+        res, stats = solver(system, model)
+        assert res
+        valid, reason = verify_model(system, model)
+        assert valid, reason
+    assert len(built) == 1
+
+    # a different system is loaded from scratch (and then kept while its clauses are the same objects)
+    clause = set([1, 2])
+    model = {}
+    assert solver([clause, set([-1])], model)[0]
+    assert model == {1: False, 2: True}
+    assert not solver([clause, set([-1]), set([-2])], {})[0]
+    assert len(built) == 2
+    # (an equal copy of the clauses is loaded again)
+    assert solver([set([1, 2])], {})[0]
+    assert len(built) == 3
@@ -0,0 +1,47 @@
+import copy
+import os
+import random
+from satsolver import Model, dimacs, verify_model, puzzle
+from satsolver import lookahead
+from tests.conftest import ROOT_DIR, RULES_9X9
+from tests.test_cdcl import brute_force, random_system, pigeonhole
+
+
+def test_lookahead__random_systems():
+    rng = random.Random(0)
+    for _ in range(300):
+        system = random_system(rng)
+        model: Model = {}
+        res, _ = lookahead.solver(copy.deepcopy(system), model)
+        assert res == brute_force(system), system
+        if res:
+            # (variables which were never assigned can take any value)
+            for var in set(abs(t) for clause in system for t in clause):
+                model.setdefault(var, False)
+            valid, reason = verify_model(system, model)
+            assert valid, reason
+
+
+def test_lookahead__pigeonhole():
+    res, stats = lookahead.solver(pigeonhole(5, 4), {})
+    assert not res
+    assert stats["probes"] > 0
+
+
+def test_lookahead__sudoku():
+    rules = dimacs.parse_file(RULES_9X9)
+    fname = os.path.join(ROOT_DIR, "datasets/top95.sdk.txt")
+    with open(fname, "r") as f:
+        lines = [line.strip() for line in f.readlines()][:3]
+    failed = 0
+    for line in lines:
+        system = puzzle.encode_puzzle(line) + rules
+        orig_system = copy.deepcopy(system)
+        model: Model = {}
+        res, stats = lookahead.solver(system, model)
+        assert res
+        valid, reason = verify_model(orig_system, model)
+        assert valid, reason
+        failed += stats["failed_literals"]
+    # failed literals are common in hard sudokus (where unit propagation alone gets stuck)
+    assert failed > 0
@@ -1,8 +1,9 @@
 from collections.abc import Callable
 import copy
 import os
-from satsolver import Model, dimacs, verify_model
-from satsolver import strategy2, strategy3, strategy_random
+import sys
+from satsolver import Conjunction, Model, dimacs, verify_model
+from satsolver import strategy2, strategy3, strategy_random, strategy_template, watched
 from tests.conftest import ROOT_DIR, RULES_4X4, RULES_9X9
 from tests.test_dpll import sudoku_tester
 
@@ -33,3 +34,41 @@ def test_other_strategies():
             assert valid, reason
             passed += 1
         print(f"{passed} 9x9 examples passed!")
+
+
+def test_deep_search():
+    """The search and simplify shouldn't be limited by the recursion limit."""
+    n = sys.getrecursionlimit() + 200
+    # implication chain 1 -> 2 -> ... -> n (ordered so each pass of simplify only finds one new unit clause)
+    system: Conjunction = [set([-i, i + 1]) for i in range(n - 1, 0, -1)] + [set([1])]
+    model: Model = {}
+    valid, literal_stats = strategy_template.simplify(system, model)
+    assert valid and system == [] and literal_stats == {}
+    assert model == {i: True for i in range(1, n + 1)}
+
+    # every clause needs its own decision
+    system = [set([i, n + i]) for i in range(1, n + 1)]
+    solver = strategy_template.strategy_template(
+        watched.CountingSimplify(), strategy2.select_lowest_purity
+    )
+    model = {}
+    res, stats = solver(copy.deepcopy(system), model)
+    assert res and stats["backtracks"] == 0
+    assert all(any(model.get(abs(t)) == (t > 0) for t in clause) for clause in system)
+
+
+def test_strategy_solvers__fresh_state(monkeypatch):
+    """Each call builds its own simplify object, so one system's state can't leak into the next."""
+    built = []
+    CountingSimplify = watched.CountingSimplify
+    monkeypatch.setattr(
+        watched,
+        "CountingSimplify",
+        lambda: built.append(CountingSimplify()) or built[-1],
+    )
+    for solver in [strategy2.solver, strategy3.solver]:
+        built.clear()
+        model: Model = {}
+        assert solver([set([1, 2]), set([-1, 2])], model)[0] and model[2]
+        assert not solver([set([1]), set([-1, 2]), set([-2])], {})[0]
+        assert len(built) == 2 and built[0] is not built[1]
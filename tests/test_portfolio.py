@@ -0,0 +1,59 @@
+import copy
+import time
+from satsolver import Conjunction, Model, dimacs, verify_model, puzzle
+from satsolver import cdcl, portfolio, strategy_random
+from tests.conftest import RULES_9X9
+from tests.test_cdcl import pigeonhole
+
+
+def _slow_solver(system: Conjunction, model: Model):
+    time.sleep(60)
+    return False, {"backtracks": 0}
+
+
+def _failing_solver(system: Conjunction, model: Model):
+    raise ValueError("oops")
+
+
+def test_portfolio__sudoku():
+    rules = dimacs.parse_file(RULES_9X9)
+    system = puzzle.encode_puzzle(
+        "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......"
+    )
+    system += rules
+    orig_system = copy.deepcopy(system)
+    model: Model = {}
+    res, stats = portfolio.solver(system, model)
+    assert res
+    valid, reason = verify_model(orig_system, model)
+    assert valid, reason
+    assert stats["winner"] in [name for name, _ in portfolio.MEMBERS]
+    assert set(stats["member_times"]) == set(name for name, _ in portfolio.MEMBERS)
+
+
+def test_portfolio__cancels_losers():
+    members = [
+        ("slow", _slow_solver),
+        ("failing", _failing_solver),
+        ("cdcl", cdcl.solver),
+    ]
+    start = time.time()
+    res, stats = portfolio.solver(pigeonhole(4, 3), {}, members=members)
+    assert not res
+    assert stats["winner"] == "cdcl"
+    # (the slow member is cancelled rather than waited for)
+    assert time.time() - start < 30
+    assert stats["member_times"]["slow"] < 30
+
+
+def test_portfolio__seeds():
+    """The same (random) solver can be raced with different seeds."""
+    members = [
+        ("random_0", strategy_random.solver),
+        ("random_1", strategy_random.solver),
+    ]
+    model: Model = {}
+    res, stats = portfolio.solver([set([1, 2]), set([-1, -2])], model, members=members)
+    assert res
+    assert model[1] != model[2]
+    assert set(stats["member_times"]) == set(["random_0", "random_1"])
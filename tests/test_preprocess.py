@@ -0,0 +1,85 @@
+import copy
+import os
+import random
+from satsolver import Conjunction, Model, dimacs, verify_model, puzzle
+from satsolver import cdcl, dpll, strategy2
+from satsolver.preprocess import Preprocessor, preprocessed_solver
+from tests.conftest import ROOT_DIR, RULES_9X9
+from tests.test_cdcl import brute_force, random_system
+
+
+def test_preprocessor():
+    system: Conjunction = [
+        set([1, 2, 3]),
+        set([1, 2]),  # subsumes the clause above
+        set([-1, 4, 5]),
+        set([1, 4]),  # strengthens the clause above to {4, 5}
+        set([-4, 6, 7]),
+    ]
+    pre = Preprocessor(system)
+    reduced = pre.run()
+    assert pre.ok
+    assert pre.stats["subsumed"] >= 1 and pre.stats["strengthened"] >= 1
+    assert len(reduced) < len(system)
+
+    model: Model = {}
+    assert cdcl.solver(reduced, model)[0]
+    pre.extend_model(model)
+    valid, reason = verify_model(system, model)
+    assert valid, reason
+
+    pre = Preprocessor([set([1, 2]), set([-1, 2]), set([-2])])
+    pre.run()
+    assert not pre.ok
+
+
+def test_preprocessor__subsume_limits():
+    """Subsumption is skipped for frequent variables, and stops once its effort runs out."""
+    system: Conjunction = [set([1, 2]), set([1, 2, 3])]
+    for i in range(8):
+        system += [set([-1, 10 + i]), set([-2, 20 + i])]
+    for kwargs in [{"max_subsume_occurrences": 4}, {"subsume_effort": 0}]:
+        # (no variables are eliminated, to leave the subsumed clause in place)
+        pre = Preprocessor(copy.deepcopy(system), max_occurrences=0, **kwargs)
+        reduced = pre.run()
+        assert pre.stats["subsumed"] == 0
+        assert len(reduced) == len(system)
+
+    pre = Preprocessor(copy.deepcopy(system), max_occurrences=0)
+    reduced = pre.run()
+    assert pre.stats["subsumed"] == 1
+    assert set([1, 2, 3]) not in reduced
+
+
+def test_preprocessed_solver__random_systems():
+    """Preprocessing shouldn't change the satisfiability of a system, and models should be extended correctly."""
+    rng = random.Random(0)
+    solver = preprocessed_solver(cdcl.solver)
+    eliminated = 0
+    for _ in range(300):
+        system = random_system(rng)
+        model: Model = {}
+        res, stats = solver(copy.deepcopy(system), model)
+        assert res == brute_force(system), system
+        if res:
+            valid, reason = verify_model(system, model)
+            assert valid, reason
+        eliminated += stats["preprocess"]["vars_eliminated"]
+    assert eliminated > 0
+
+
+def test_preprocessed_solver__sudoku():
+    rules = dimacs.parse_file(RULES_9X9)
+    fname = os.path.join(ROOT_DIR, "datasets/top95.sdk.txt")
+    with open(fname, "r") as f:
+        lines = [line.strip() for line in f.readlines()][:2]
+    for solver in [dpll.solver, strategy2.solver, cdcl.solver]:
+        for line in lines:
+            system = puzzle.encode_puzzle(line) + rules
+            orig_system = copy.deepcopy(system)
+            model: Model = {}
+            res, stats = preprocessed_solver(solver)(system, model)
+            assert res
+            valid, reason = verify_model(orig_system, model)
+            assert valid, reason
+            assert stats["preprocess"]["clauses_removed"] > len(rules) / 2
@@ -0,0 +1,45 @@
+import copy
+import os
+from satsolver import Conjunction, Model, dimacs, verify_model, model_to_system
+from satsolver import cdcl, dpll, puzzle, strategy2
+from satsolver.clausedb import ClauseDB
+from satsolver.renumber import Renumbering, dense_solver
+from tests.conftest import ROOT_DIR, RULES_9X9
+
+
+def test_renumbering():
+    system: Conjunction = [
+        set([999, -111]),
+        set([-555, 111]),
+    ]
+    renumbering = Renumbering.from_system(system)
+    assert renumbering.num_vars == 3
+    assert renumbering.dense == {111: 1, 555: 2, 999: 3}
+    assert renumbering.encode(system) == [set([3, -1]), set([-2, 1])]
+    assert renumbering.decode(renumbering.encode(system)) == system
+    assert renumbering.encode_lit(-999) == -3 and renumbering.decode_lit(-3) == -999
+
+    db = renumbering.encode(ClauseDB(system))
+    assert db.to_system() == renumbering.encode(system)
+
+    model: Model = {111: True, 555: False}
+    assert renumbering.encode_model(model) == {1: True, 2: False}
+    assert renumbering.decode_model(renumbering.encode_model(model)) == model
+
+
+def test_dense_solver():
+    fname = os.path.join(ROOT_DIR, f"example_sudokus/sudoku1.cnf")
+    orig_system = dimacs.parse_file(fname) + dimacs.parse_file(RULES_9X9)
+    expected = None
+    for solver in [dpll.solver, strategy2.solver, cdcl.solver]:
+        system = copy.deepcopy(orig_system)
+        model: Model = {}
+        res, stats = dense_solver(solver)(system, model)
+        assert res
+        valid, reason = verify_model(orig_system, model)
+        assert valid, reason
+        # the model is mapped back to the original variables
+        output = dimacs.to_dimacs(model_to_system(model))
+        board = puzzle.visualize_sudoku_model(model, board_size=9)
+        assert expected is None or (output, board) == expected
+        expected = output, board
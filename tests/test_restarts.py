@@ -0,0 +1,98 @@
+import copy
+import os
+import random
+from satsolver import Model, verify_model, cdcl, dpll, restarts
+from satsolver import strategy_template, strategy_random, strategy3, watched
+from tests.conftest import ROOT_DIR, RULES_4X4
+from tests.test_cdcl import brute_force, random_system, pigeonhole
+from tests.test_dpll import sudoku_tester
+
+
+def test_luby():
+    expected = [1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8, 1]
+    assert [restarts.luby(i) for i in range(1, len(expected) + 1)] == expected
+
+
+def test_policies():
+    policy = restarts.make_policy("luby")
+    conflicts = []
+    for _ in range(4):
+        n = 1
+        while not policy.on_conflict(lbd=2):
+            n += 1
+        policy.on_restart()
+        conflicts.append(n)
+    assert conflicts == [100, 100, 200, 100]
+
+    policy = restarts.make_policy("geometric")
+    assert policy.limit() == 100
+    policy.on_restart()
+    assert policy.limit() == 150
+
+    # glucose restarts once the recent LBDs are worse than the overall average
+    policy = restarts.make_policy("glucose")
+    assert not any(policy.on_conflict(lbd=2) for _ in range(100))
+    assert not any(policy.on_conflict(lbd=3) for _ in range(5))
+    n = 1
+    while not policy.on_conflict(lbd=10):
+        n += 1
+    assert n < 50
+
+    assert restarts.make_policy(None) is None
+
+
+def test_restarting_solvers():
+    """Restarts shouldn't affect the correctness of the solvers."""
+    rng = random.Random(0)
+    for policy in restarts.POLICIES:
+        for _ in range(50):
+            system = random_system(rng)
+            model: Model = {}
+            res, stats = cdcl.solver(copy.deepcopy(system), model, restart=policy)
+            assert res == brute_force(system), system
+            if res:
+                valid, reason = verify_model(system, model)
+                assert valid, reason
+
+        res, stats = dpll.solver(pigeonhole(6, 5), {}, restart=policy)
+        assert not res
+        res, stats = cdcl.solver(pigeonhole(6, 5), {}, restart=policy)
+        assert not res
+    res, stats = dpll.solver(pigeonhole(6, 5), {}, restart="luby")
+    assert stats["restarts"] > 0
+
+    fname = os.path.join(ROOT_DIR, f"datasets/4x4.txt")
+    solver = strategy_template.strategy_template(
+        watched.WatchedSimplify(), strategy_random.select_random, restart="glucose"
+    )
+    sudoku_tester(RULES_4X4, fname, 4, solver=solver)
+
+
+def test_restarting_deterministic_strategy():
+    """
+    With a deterministic heuristic, each restart decides the variables which caused the most conflicts first
+    (rather than repeating the same search), which shouldn't affect correctness.
+    """
+    rng = random.Random(0)
+    for policy in restarts.POLICIES:
+        solver = strategy_template.strategy_template(
+            watched.CountingSimplify(), strategy3.dlis_split, restart=policy
+        )
+        for _ in range(50):
+            system = random_system(rng)
+            model: Model = {}
+            res, stats = solver(copy.deepcopy(system), model)
+            assert res == brute_force(system), system
+            if res:
+                # (variables which don't affect the system may be left unassigned)
+                for clause in system:
+                    for t in clause:
+                        model.setdefault(abs(t), False)
+                valid, reason = verify_model(system, model)
+                assert valid, reason
+
+    solver = strategy_template.strategy_template(
+        watched.CountingSimplify(), strategy3.dlis_split, restart="luby"
+    )
+    res, stats = solver(pigeonhole(6, 5), {})
+    assert not res and stats["restarts"] > 0
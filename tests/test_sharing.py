@@ -0,0 +1,55 @@
+import copy
+import random
+from multiprocessing import RawArray
+from satsolver import Model, verify_model
+from satsolver import sharing
+from satsolver.sharing import ClauseRing, SharingSolver
+from tests.test_cdcl import brute_force, random_system, pigeonhole
+
+
+def test_clause_ring():
+    ring = ClauseRing(slots=4, max_length=3)
+    ring.write([1, -2], source=0)
+    ring.write([3], source=1)
+    clauses, pos = ring.read(0, source=1)
+    assert [list(c) for c in clauses] == [[1, -2]] and pos == 2
+    assert ring.read(pos, source=1) == ([], 2)
+
+    # (a reader which falls behind misses the oldest clauses)
+    for i in range(1, 7):
+        ring.write([i, i + 1, i + 2], source=0)
+    clauses, pos = ring.read(2, source=1)
+    assert [list(c) for c in clauses] == [[i, i + 1, i + 2] for i in range(3, 7)]
+    assert pos == 8
+
+
+def test_sharing_solver__imports():
+    """Clauses exported by one worker are imported (at restarts) by the others."""
+    system = pigeonhole(6, 5)
+    ring = ClauseRing()
+    counters = RawArray("i", 2 * sharing.NUM_COUNTERS)
+    s0 = SharingSolver(copy.deepcopy(system), ring, 0, counters, restart="luby")
+    assert not s0.solve()
+    assert counters[sharing.EXPORTED] > 0
+
+    s1 = SharingSolver(copy.deepcopy(system), ring, 1, counters, restart="luby")
+    s1.on_restart()
+    assert counters[sharing.NUM_COUNTERS + sharing.IMPORTED] > 0
+    assert not s1.solve()
+
+
+def test_sharing__random_systems():
+    rng = random.Random(0)
+    for _ in range(20):
+        system = random_system(rng)
+        model: Model = {}
+        res, stats = sharing.solver(copy.deepcopy(system), model, cpus=2)
+        assert res == brute_force(system), system
+        if res:
+            valid, reason = verify_model(system, model)
+            assert valid, reason
+        assert stats["winner"] in [0, 1]
+
+    res, stats = sharing.solver(pigeonhole(7, 6), {}, cpus=3)
+    assert not res
+    assert stats["exported"] > 0 and stats["imported"] > 0
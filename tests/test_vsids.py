@@ -0,0 +1,55 @@
+import copy
+import os
+import random
+from satsolver import Model, dimacs, verify_model, strategy_template, watched
+from satsolver.vsids import ActivityHeap, VSIDS
+from tests.conftest import ROOT_DIR, RULES_4X4, RULES_9X9
+from tests.test_cdcl import pigeonhole
+from tests.test_dpll import sudoku_tester
+
+
+def test_activity_heap():
+    rng = random.Random(0)
+    heap = ActivityHeap()
+    for var in range(1, 101):
+        heap.push(var)
+    heap.push(7)  # (no duplicates)
+    assert len(heap) == 100 and 7 in heap
+
+    for _ in range(500):
+        heap.bump(rng.randint(1, 100))
+        if rng.random() < 0.3:
+            heap.decay()
+
+    popped = [heap.pop() for _ in range(50)]
+    assert not any(var in heap for var in popped)
+    activities = [heap.activity[var] for var in popped]
+    assert activities == sorted(activities, reverse=True)
+    assert heap.activity[popped[-1]] >= max(heap.activity[var] for var in heap.heap)
+
+    # bumping a variable moves it to the top of the heap
+    var = heap.heap[-1]
+    for _ in range(20):
+        heap.bump(var)
+    assert heap.pop() == var
+
+
+def test_vsids_strategy():
+    solver = strategy_template.strategy_template(watched.WatchedSimplify(), VSIDS())
+
+    fname = os.path.join(ROOT_DIR, f"datasets/4x4.txt")
+    sudoku_tester(RULES_4X4, fname, 4, solver=solver)
+
+    rules = dimacs.parse_file(RULES_9X9)
+    for n in range(1, 5 + 1):
+        fname = os.path.join(ROOT_DIR, f"example_sudokus/sudoku{n}.cnf")
+        system = dimacs.parse_file(fname) + rules
+        orig_system = copy.deepcopy(system)
+        model: Model = {}
+        res, stats = solver(system, model)
+        assert res
+        valid, reason = verify_model(orig_system, model)
+        assert valid, reason
+
+    res, stats = solver(pigeonhole(5, 4), {})
+    assert not res and stats["backtracks"] > 0
@@ -0,0 +1,131 @@
+from collections import Counter
+import copy
+import os
+import random
+from satsolver import Conjunction, Model, dimacs, verify_model
+from typing import Dict, Tuple
+from satsolver import strategy_template, strategy2
+from satsolver.trail import Trail
+from satsolver.watched import WatchedSimplify, CountingSimplify
+from tests.test_cdcl import brute_force, random_system
+from tests.conftest import ROOT_DIR, RULES_4X4, RULES_9X9
+from tests.test_dpll import sudoku_tester
+
+
+def test_propagate__unit_chain():
+    system: Conjunction = [
+        set([-111, 112, 114]),
+        set([111, 115]),
+        set([-115]),
+        set([-112, 113]),
+    ]
+    trail = Trail(system, {})
+    simplify = WatchedSimplify()
+    valid, literal_stats = simplify(trail.system, trail.model)
+    assert valid
+    assert trail.model == {115: False, 111: True}
+    assert trail.assigned == [115, 111]
+    assert literal_stats == {
+        112: {"clause_lengths": [2, 2], "cp": 1, "cn": 1},
+        114: {"clause_lengths": [2], "cp": 1, "cn": 0},
+        113: {"clause_lengths": [2], "cp": 1, "cn": 0},
+    }
+    assert trail.system == system, "system is left untouched"
+
+    # assigning a decision only propagates through the clauses watching it
+    trail.new_level()
+    trail.model[112] = True
+    valid, literal_stats = simplify(trail.system, trail.model)
+    assert valid and literal_stats == {}
+    assert trail.model == {115: False, 111: True, 112: True, 113: True}
+
+    # backtracking undoes the propagated assignments
+    trail.backtrack()
+    trail.new_level()
+    trail.model[112] = False
+    valid, literal_stats = simplify(trail.system, trail.model)
+    assert valid and literal_stats == {}
+    assert trail.model == {115: False, 111: True, 112: False, 114: True}
+
+
+def test_propagate__conflict():
+    system: Conjunction = [
+        set([111, 112]),
+        set([111, -112]),
+        set([-111, 113]),
+    ]
+    trail = Trail(system, {})
+    simplify = WatchedSimplify()
+    assert simplify(trail.system, trail.model)[0]
+
+    trail.new_level()
+    trail.model[111] = False
+    valid, _ = simplify(trail.system, trail.model)
+    assert not valid
+    trail.backtrack()
+    assert trail.model == {}
+
+    trail.new_level()
+    trail.model[111] = True
+    valid, _ = simplify(trail.system, trail.model)
+    assert valid and trail.model == {111: True, 113: True}
+
+
+def test_watched_strategies():
+    """Verify the watched literal simplify gives the same search as strategy_template.simplify."""
+    rules = dimacs.parse_file(RULES_9X9)
+    solvers = [
+        strategy_template.strategy_template(
+            strategy_template.simplify, strategy2.select_lowest_purity
+        ),
+        strategy_template.strategy_template(
+            WatchedSimplify(), strategy2.select_lowest_purity
+        ),
+    ]
+    for n in range(1, 5 + 1):
+        fname = os.path.join(ROOT_DIR, f"example_sudokus/sudoku{n}.cnf")
+        backtracks = []
+        for solver in solvers:
+            system = dimacs.parse_file(fname) + rules
+            orig_system = copy.deepcopy(system)
+            model: Model = {}
+            res, stats = solver(system, model)
+            assert res
+            valid, reason = verify_model(orig_system, model)
+            assert valid, reason
+            backtracks.append(stats["backtracks"])
+        assert backtracks[0] == backtracks[1]
+
+    fname = os.path.join(ROOT_DIR, f"datasets/4x4.txt")
+    sudoku_tester(RULES_4X4, fname, 4, solver=solvers[1])
+
+
+def test_counting_simplify():
+    """Verify the incrementally maintained literal_stats always match the stats computed from scratch."""
+    rng = random.Random(0)
+    simplify = CountingSimplify()
+    checks = 0
+
+    def heuristic(literal_stats: Dict) -> Tuple[int, bool]:
+        nonlocal checks
+        expected = WatchedSimplify.literal_stats(simplify, simplify.trail.model)
+        for var in expected:
+            lengths = expected[var]["clause_lengths"]
+            expected[var]["clause_lengths"] = dict(Counter(lengths))
+        assert literal_stats == expected
+        checks += 1
+        return rng.choice(list(literal_stats.keys())), rng.choice([True, False])
+
+    solver = strategy_template.strategy_template(simplify, heuristic, restart="luby")
+    for _ in range(300):
+        system = random_system(rng)
+        res, stats = solver(copy.deepcopy(system), {})
+        assert res == brute_force(system)
+    assert checks > 50
+
+    fname = os.path.join(ROOT_DIR, f"example_sudokus/sudoku1.cnf")
+    system = dimacs.parse_file(fname) + dimacs.parse_file(RULES_9X9)
+    orig_system = copy.deepcopy(system)
+    model: Model = {}
+    res, stats = solver(system, model)
+    assert res and verify_model(orig_system, model)[0]